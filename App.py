@@ -1,16 +1,77 @@
-from flask import Flask, jsonify, render_template, request, make_response, send_from_directory
+from flask import Flask, g, has_request_context, jsonify, render_template, request, make_response, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 import mariadb
+import cProfile
+import gzip
 import os
 import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
 from dotenv import load_dotenv
 
+import market_prices
+import price_guide
+from price_guide import fetch_dicts, json_default
+import scrape_metrics
+
+try:
+    import orjson
+except ImportError:     # optional: jsonify falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:     # optional: gzip only
+    brotli = None
+
 load_dotenv("credentials.env")
 
 log = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify() through orjson when it is installed.
+
+    orjson encodes the deal and outcome lists several times faster than the
+    stdlib and writes datetimes natively, and response() hands its bytes
+    straight to the Response instead of round-tripping through str.
+    """
+
+    default = staticmethod(json_default)
+
+    def encode(self, obj) -> bytes:
+        if orjson is None:
+            return super().dumps(obj).encode()
+        return orjson.dumps(obj, default=json_default)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs or orjson is None:
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj), mimetype=self.mimetype)
+
+
+app.json = FastJSONProvider(app)
+
+
 def get_connection():
+    if PROFILE_REQUESTS and has_request_context() and 'timings' in g:
+        start = time.perf_counter()
+        conn = _connect()
+        g.timings.add('db_connect', time.perf_counter() - start)
+        return _TimedConnection(conn, g.timings)
+    return _connect()
+
+
+def _connect():
     return mariadb.connect(
         user=os.environ["DB_USER"],
         password=os.environ["DB_PASSWORD"],
@@ -19,239 +80,279 @@ def get_connection():
         database=os.environ["DB_NAME"]
     )
 
-GPU_DEALS_QUERY = """
-WITH RawStats AS (
-    SELECT g.Model,
-           AVG(e.Price / 100)    AS RawAvg,
-           STDDEV(e.Price / 100) AS StdDev
-    FROM Scraper.GPU g
-    JOIN Scraper.EBAY e ON e.ID = g.ID
-    WHERE e.SoldDate IS NOT NULL AND g.Model IS NOT NULL
-    GROUP BY g.Model
-    HAVING COUNT(*) >= 5
-),
-ModelStats AS (
-    SELECT g.Model,
-           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
-           ROUND(MIN(e.Price / 100), 2) AS MinMarketPrice,
-           ROUND(MAX(e.Price / 100), 2) AS MaxMarketPrice
-    FROM   Scraper.GPU g
-    JOIN   Scraper.EBAY e ON e.ID = g.ID
-    JOIN   RawStats rs ON rs.Model = g.Model
-    WHERE  e.SoldDate IS NOT NULL AND g.Model IS NOT NULL AND e.Price IS NOT NULL
-      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
-                                AND rs.RawAvg + 2 * rs.StdDev
-    GROUP  BY g.Model
-)
-SELECT
-    e.ID,
-    g.Model,
-    g.Brand,
-    g.VRAM,
-    ROUND(e.Price / 100, 2)                              AS CurrentPrice,
-    ms.AvgPrice                                          AS AvgMarketPrice,
-    ms.MinMarketPrice,
-    ms.MaxMarketPrice,
-    ROUND(ms.AvgPrice - (e.Price / 100), 2)              AS PotentialGain,
-    ROUND((1 - (e.Price / 100) / ms.AvgPrice) * 100, 1) AS DiscountPct,
-    e.Bids,
-    e.EndTime,
-    e.URL
-FROM Scraper.EBAY e
-JOIN Scraper.GPU g ON g.ID = e.ID
-JOIN ModelStats ms ON ms.Model = g.Model
-WHERE
-    e.SoldDate IS NULL
-    AND (e.Price / 100) < ms.AvgPrice * 0.8
-    AND e.EndTime > NOW()
-    AND e.EndTime < NOW() + INTERVAL 2 HOUR
-ORDER BY PotentialGain DESC;
-"""
 
-CPU_DEALS_QUERY = """
-WITH RawStats AS (
-    SELECT c.Model,
-           AVG(e.Price / 100)    AS RawAvg,
-           STDDEV(e.Price / 100) AS StdDev
-    FROM Scraper.CPU c
-    JOIN Scraper.EBAY e ON e.ID = c.ID
-    WHERE e.SoldDate IS NOT NULL AND c.Model IS NOT NULL
-    GROUP BY c.Model
-    HAVING COUNT(*) >= 5
-),
-ModelStats AS (
-    SELECT c.Model,
-           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
-           ROUND(MIN(e.Price / 100), 2) AS MinMarketPrice,
-           ROUND(MAX(e.Price / 100), 2) AS MaxMarketPrice
-    FROM   Scraper.CPU c
-    JOIN   Scraper.EBAY e ON e.ID = c.ID
-    JOIN   RawStats rs ON rs.Model = c.Model
-    WHERE  e.SoldDate IS NOT NULL AND c.Model IS NOT NULL AND e.Price IS NOT NULL
-      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
-                                AND rs.RawAvg + 2 * rs.StdDev
-    GROUP  BY c.Model
-)
-SELECT
-    e.ID,
-    c.Model,
-    c.Brand,
-    c.Socket,
-    c.Cores,
-    ROUND(e.Price / 100, 2)                              AS CurrentPrice,
-    ms.AvgPrice                                          AS AvgMarketPrice,
-    ms.MinMarketPrice,
-    ms.MaxMarketPrice,
-    ROUND(ms.AvgPrice - (e.Price / 100), 2)              AS PotentialGain,
-    ROUND((1 - (e.Price / 100) / ms.AvgPrice) * 100, 1) AS DiscountPct,
-    e.Bids,
-    e.EndTime,
-    e.URL
-FROM Scraper.EBAY e
-JOIN Scraper.CPU c ON c.ID = e.ID
-JOIN ModelStats ms ON ms.Model = c.Model
-WHERE
-    e.SoldDate IS NULL
-    AND (e.Price / 100) < ms.AvgPrice * 0.8
-    AND e.EndTime > NOW()
-    AND e.EndTime < NOW() + INTERVAL 2 HOUR
-ORDER BY PotentialGain DESC;
-"""
+# ── Request profiling (opt-in) ───────────────────────────────────────────────
+# With PROFILE_REQUESTS=1 every request records where its time went —
+# db_connect, each SQL statement, fetch (rows → dicts), serialize (JSON) and
+# the remaining Python — and returns it in a Server-Timing header, which
+# browser dev tools show under the request's Timing tab.  Requests slower than
+# PROFILE_SLOW_MS are logged with the breakdown; a PROFILE_SAMPLE_RATE
+# fraction of requests also run under cProfile and, if slow, dump a .prof
+# file into PROFILE_DIR (open with `python -m pstats` or snakeviz).
+PROFILE_REQUESTS    = os.environ.get('PROFILE_REQUESTS', '0') == '1'
+PROFILE_SLOW_MS     = int(os.environ.get('PROFILE_SLOW_MS', '500'))
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_DIR         = os.environ.get('PROFILE_DIR', 'profiles')
 
-HDD_DEALS_QUERY = """
-WITH RawStats AS (
-    SELECT h.CapacityGB,
-           h.Interface,
-           AVG(e.Price / 100)    AS RawAvg,
-           STDDEV(e.Price / 100) AS StdDev
-    FROM Scraper.HDD h
-    JOIN Scraper.EBAY e ON e.ID = h.ID
-    WHERE e.SoldDate IS NOT NULL AND h.CapacityGB IS NOT NULL
-    GROUP BY h.CapacityGB, h.Interface
-    HAVING COUNT(*) >= 5
-),
-ModelStats AS (
-    SELECT h.CapacityGB,
-           h.Interface,
-           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
-           ROUND(MIN(e.Price / 100), 2) AS MinMarketPrice,
-           ROUND(MAX(e.Price / 100), 2) AS MaxMarketPrice
-    FROM   Scraper.HDD h
-    JOIN   Scraper.EBAY e ON e.ID = h.ID
-    JOIN   RawStats rs ON rs.CapacityGB = h.CapacityGB AND rs.Interface <=> h.Interface
-    WHERE  e.SoldDate IS NOT NULL AND h.CapacityGB IS NOT NULL AND e.Price IS NOT NULL
-      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
-                                AND rs.RawAvg + 2 * rs.StdDev
-    GROUP  BY h.CapacityGB, h.Interface
-)
-SELECT
-    e.ID,
-    h.Brand,
-    h.CapacityGB,
-    h.Interface,
-    h.FormFactor,
-    h.RPM,
-    ROUND(e.Price / 100, 2)                              AS CurrentPrice,
-    ms.AvgPrice                                          AS AvgMarketPrice,
-    ms.MinMarketPrice,
-    ms.MaxMarketPrice,
-    ROUND(ms.AvgPrice - (e.Price / 100), 2)              AS PotentialGain,
-    ROUND((1 - (e.Price / 100) / ms.AvgPrice) * 100, 1) AS DiscountPct,
-    e.Bids,
-    e.EndTime,
-    e.URL
-FROM Scraper.EBAY e
-JOIN Scraper.HDD h ON h.ID = e.ID
-JOIN ModelStats ms ON ms.CapacityGB = h.CapacityGB AND ms.Interface <=> h.Interface
-WHERE
-    e.SoldDate IS NULL
-    AND (e.Price / 100) < ms.AvgPrice * 0.8
-    AND e.EndTime > NOW()
-    AND e.EndTime < NOW() + INTERVAL 2 HOUR
-ORDER BY PotentialGain DESC;
-"""
+# Per-statement Server-Timing entries beyond this are only counted in `sql`.
+PROFILE_MAX_STATEMENTS = 20
 
-RAM_DEALS_QUERY = """
-WITH RawStats AS (
-    SELECT r.Type, r.CapacityGB,
-           AVG(e.Price / 100)    AS RawAvg,
-           STDDEV(e.Price / 100) AS StdDev
-    FROM Scraper.RAM r
-    JOIN Scraper.EBAY e ON e.ID = r.ID
-    WHERE e.SoldDate IS NOT NULL
-      AND r.Type IS NOT NULL AND r.CapacityGB IS NOT NULL
-    GROUP BY r.Type, r.CapacityGB
-    HAVING COUNT(*) >= 5
-),
-ModelStats AS (
-    SELECT r.Type, r.CapacityGB,
-           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
-           ROUND(MIN(e.Price / 100), 2) AS MinMarketPrice,
-           ROUND(MAX(e.Price / 100), 2) AS MaxMarketPrice
-    FROM   Scraper.RAM r
-    JOIN   Scraper.EBAY e ON e.ID = r.ID
-    JOIN   RawStats rs ON rs.Type = r.Type AND rs.CapacityGB = r.CapacityGB
-    WHERE  e.SoldDate IS NOT NULL
-      AND  r.Type IS NOT NULL AND r.CapacityGB IS NOT NULL
-      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
-                                AND rs.RawAvg + 2 * rs.StdDev
-    GROUP  BY r.Type, r.CapacityGB
-)
-SELECT
-    e.ID,
-    r.Brand,
-    r.CapacityGB,
-    r.Type,
-    r.Speed,
-    ROUND(e.Price / 100, 2)                              AS CurrentPrice,
-    ms.AvgPrice                                          AS AvgMarketPrice,
-    ms.MinMarketPrice,
-    ms.MaxMarketPrice,
-    ROUND(ms.AvgPrice - (e.Price / 100), 2)              AS PotentialGain,
-    ROUND((1 - (e.Price / 100) / ms.AvgPrice) * 100, 1) AS DiscountPct,
-    e.Bids,
-    e.EndTime,
-    e.URL
-FROM Scraper.EBAY e
-JOIN Scraper.RAM r ON r.ID = e.ID
-JOIN ModelStats ms ON ms.Type = r.Type AND ms.CapacityGB = r.CapacityGB
-WHERE
-    e.SoldDate IS NULL
-    AND (e.Price / 100) < ms.AvgPrice * 0.8
-    AND e.EndTime > NOW()
-    AND e.EndTime < NOW() + INTERVAL 2 HOUR
-ORDER BY PotentialGain DESC;
-"""
 
-def get_deals_query(product_type: str, window_hours: int = 2, min_discount: float = 20) -> str:
-    """Return deals query with parameterized time window and discount threshold."""
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}        # stage → [calls, seconds]
+        self.statements = []    # (first line of SQL, seconds)
+
+    def add(self, stage, seconds):
+        entry = self.stages.setdefault(stage, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def statement(self, sql, seconds):
+        self.add('sql', seconds)
+        self.statements.append((' '.join(sql.split())[:60], seconds))
+
+    def server_timing(self, total):
+        parts = []
+        accounted = 0.0
+        for stage, (calls, seconds) in self.stages.items():
+            accounted += seconds
+            parts.append(f'{stage};dur={seconds * 1000:.1f};desc="{calls} call{"s" if calls != 1 else ""}"')
+        for i, (sql, seconds) in enumerate(self.statements[:PROFILE_MAX_STATEMENTS], 1):
+            desc = sql.replace('\\', '').replace('"', "'")
+            parts.append(f'sql-{i};dur={seconds * 1000:.1f};desc="{desc}"')
+        parts.append(f'python;dur={max(total - accounted, 0) * 1000:.1f}')
+        parts.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(parts)
+
+
+class _TimedCursor:
+    """Cursor proxy charging execute to `sql` and fetches to `fetch`."""
+
+    def __init__(self, cur, timings):
+        self._cur = cur
+        self._timings = timings
+
+    def execute(self, sql, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cur.execute(sql, *args, **kwargs)
+        finally:
+            self._timings.statement(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._cur.executemany(sql, *args, **kwargs)
+        finally:
+            self._timings.statement(sql, time.perf_counter() - start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return self._cur.fetchall()
+        finally:
+            self._timings.add('fetch', time.perf_counter() - start)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return self._cur.fetchone()
+        finally:
+            self._timings.add('fetch', time.perf_counter() - start)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+class _TimedConnection:
+    def __init__(self, conn, timings):
+        self._conn = conn
+        self._timings = timings
+
+    def cursor(self, *args, **kwargs):
+        return _TimedCursor(self._conn.cursor(*args, **kwargs), self._timings)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class _TimedJSONProvider(FastJSONProvider):
+    def encode(self, obj) -> bytes:
+        if not (has_request_context() and 'timings' in g):
+            return super().encode(obj)
+        start = time.perf_counter()
+        try:
+            return super().encode(obj)
+        finally:
+            g.timings.add('serialize', time.perf_counter() - start)
+
+
+if PROFILE_REQUESTS:
+    app.json = _TimedJSONProvider(app)
+
+    @app.before_request
+    def _start_request_profile():
+        g.timings = RequestTimings()
+        if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+                g.profiler = profiler
+            except ValueError:
+                pass   # another profiler is already active in this thread
+
+    @app.after_request
+    def _finish_request_profile(resp):
+        timings = g.pop('timings', None)
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+        if timings is None:
+            return resp
+        total = time.perf_counter() - timings.started
+        resp.headers['Server-Timing'] = timings.server_timing(total)
+        if total * 1000 >= PROFILE_SLOW_MS:
+            breakdown = ', '.join(f"{stage}={seconds * 1000:.0f}ms" for stage, (_, seconds) in timings.stages.items())
+            log.warning("Slow request %s %s: %.0fms (%s)", request.method, request.full_path.rstrip('?'),
+                        total * 1000, breakdown or 'no db/serialize time')
+            if profiler is not None:
+                try:
+                    os.makedirs(PROFILE_DIR, exist_ok=True)
+                    path = os.path.join(
+                        PROFILE_DIR,
+                        f"{datetime.now():%Y%m%d-%H%M%S}-{request.endpoint or 'unknown'}-{total * 1000:.0f}ms.prof",
+                    )
+                    profiler.dump_stats(path)
+                    log.warning("Profile written to %s", path)
+                except OSError as e:
+                    log.warning("Could not write profile: %s", e)
+        return resp
+
+
+# ── Response compression ─────────────────────────────────────────────────────
+# HTML, JSON and JS responses are brotli- (when installed and accepted) or
+# gzip-compressed.  Each body gets a content-hash ETag and its compressed
+# variants are cached under (ETag, encoding), so the dashboard page, sw.js
+# and any API payload that hasn't changed since the last poll are compressed
+# once per worker, and an unchanged payload revalidates to a 304.
+COMPRESS_RESPONSES     = os.environ.get('COMPRESS_RESPONSES', '1') == '1'
+COMPRESS_MIN_BYTES     = 1024
+COMPRESS_CACHE_ENTRIES = 128
+GZIP_LEVEL             = 6
+BROTLI_QUALITY         = 6
+
+_COMPRESSIBLE = {'text/html', 'text/plain', 'text/css', 'application/json', 'application/javascript'}
+
+_compressed = OrderedDict()     # (etag, encoding) → bytes, least recently used first
+_compressed_lock = threading.Lock()
+
+
+def _encoding_weights(header: str) -> dict:
+    """Accept-Encoding header → {coding: q}; a coding with no q parameter has q=1."""
+    weights = {}
+    for part in header.lower().split(','):
+        coding, *params = [p.strip() for p in part.split(';')]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    return weights
+
+
+def _accepted_encoding(header: str):
+    """The coding to send for this Accept-Encoding header: 'br', 'gzip' or None.
+
+    Codings refused with q=0 are skipped; of the rest the highest q wins,
+    brotli on a tie.
+    """
+    weights = _encoding_weights(header)
+    supported = ('br', 'gzip') if brotli is not None else ('gzip',)
+    candidates = [c for c in supported if weights.get(c, 0) > 0]
+    return max(candidates, key=weights.get, default=None)
+
+
+def _compress(etag: str, encoding: str, body: bytes) -> bytes:
+    key = (etag, encoding)
+    with _compressed_lock:
+        data = _compressed.get(key)
+        if data is not None:
+            _compressed.move_to_end(key)
+            return data
+    if encoding == 'br':
+        data = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        data = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    with _compressed_lock:
+        _compressed[key] = data
+        while len(_compressed) > COMPRESS_CACHE_ENTRIES:
+            _compressed.popitem(last=False)
+    return data
+
+
+if COMPRESS_RESPONSES:
+    @app.after_request
+    def _compress_response(resp):
+        if (request.method != 'GET' or resp.status_code != 200
+                or resp.mimetype not in _COMPRESSIBLE or 'Content-Encoding' in resp.headers):
+            return resp
+        resp.vary.add('Accept-Encoding')
+        if resp.direct_passthrough:
+            resp.direct_passthrough = False     # send_from_directory (sw.js): small enough to buffer
+        body = resp.get_data()
+        if len(body) < COMPRESS_MIN_BYTES:
+            return resp
+
+        etag, _ = resp.get_etag()
+        if not etag:
+            resp.add_etag()
+            etag, _ = resp.get_etag()
+        resp.make_conditional(request)
+        encoding = _accepted_encoding(request.headers.get('Accept-Encoding', ''))
+        if resp.status_code != 200 or encoding is None:
+            return resp
+
+        resp.set_data(_compress(etag, encoding, body))
+        resp.headers['Content-Encoding'] = encoding
+        # Weak: the same ETag now covers every encoding of this body.
+        resp.set_etag(etag, weak=True)
+        return resp
+
+# Market-price estimator the deal queries compare against.  Estimates are
+# precomputed per model key by the scraper (market_prices.py) into
+# Scraper.MarketPrices; this maps the estimator name to its column.
+MARKET_ESTIMATORS = market_prices.ESTIMATORS
+MARKET_ESTIMATOR = os.environ.get('MARKET_ESTIMATOR', 'mean')
+if MARKET_ESTIMATOR not in MARKET_ESTIMATORS:
+    log.warning("Unknown MARKET_ESTIMATOR '%s' — using 'mean'", MARKET_ESTIMATOR)
+    MARKET_ESTIMATOR = 'mean'
+
+
+def get_deals_query(product_type: str, window_hours: int = 2, min_discount: float = 20,
+                    estimator: str = None) -> str:
+    """Return deals query with parameterized time window, discount threshold and
+    market-price estimator (a MarketPrices column, see MARKET_ESTIMATORS)."""
     interval = f"INTERVAL {max(1, min(window_hours, 24))} HOUR"
     threshold = (100 - max(0, min_discount)) / 100.0
+    price_col = MARKET_ESTIMATORS.get(estimator or MARKET_ESTIMATOR, 'MeanPrice')
 
     if product_type == 'gpu':
         return f"""
-WITH RawStats AS (
-    SELECT g.Model,
-           AVG(e.Price / 100)    AS RawAvg,
-           STDDEV(e.Price / 100) AS StdDev
-    FROM Scraper.GPU g
-    JOIN Scraper.EBAY e ON e.ID = g.ID
-    WHERE e.SoldDate IS NOT NULL AND g.Model IS NOT NULL
-    GROUP BY g.Model
-    HAVING COUNT(*) >= 5
-),
-ModelStats AS (
-    SELECT g.Model,
-           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
-           ROUND(MIN(e.Price / 100), 2) AS MinMarketPrice,
-           ROUND(MAX(e.Price / 100), 2) AS MaxMarketPrice
-    FROM   Scraper.GPU g
-    JOIN   Scraper.EBAY e ON e.ID = g.ID
-    JOIN   RawStats rs ON rs.Model = g.Model
-    WHERE  e.SoldDate IS NOT NULL AND g.Model IS NOT NULL AND e.Price IS NOT NULL
-      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
-                                AND rs.RawAvg + 2 * rs.StdDev
-    GROUP  BY g.Model
+WITH ModelStats AS (
+    SELECT Model,
+           {price_col}  AS AvgPrice,
+           MinPrice     AS MinMarketPrice,
+           MaxPrice     AS MaxMarketPrice
+    FROM   Scraper.MarketPrices
+    WHERE  Category = 'GPU'
 )
 SELECT
     e.ID,
@@ -279,28 +380,13 @@ ORDER BY PotentialGain DESC;
 """
     elif product_type == 'cpu':
         return f"""
-WITH RawStats AS (
-    SELECT c.Model,
-           AVG(e.Price / 100)    AS RawAvg,
-           STDDEV(e.Price / 100) AS StdDev
-    FROM Scraper.CPU c
-    JOIN Scraper.EBAY e ON e.ID = c.ID
-    WHERE e.SoldDate IS NOT NULL AND c.Model IS NOT NULL
-    GROUP BY c.Model
-    HAVING COUNT(*) >= 5
-),
-ModelStats AS (
-    SELECT c.Model,
-           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
-           ROUND(MIN(e.Price / 100), 2) AS MinMarketPrice,
-           ROUND(MAX(e.Price / 100), 2) AS MaxMarketPrice
-    FROM   Scraper.CPU c
-    JOIN   Scraper.EBAY e ON e.ID = c.ID
-    JOIN   RawStats rs ON rs.Model = c.Model
-    WHERE  e.SoldDate IS NOT NULL AND c.Model IS NOT NULL AND e.Price IS NOT NULL
-      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
-                                AND rs.RawAvg + 2 * rs.StdDev
-    GROUP  BY c.Model
+WITH ModelStats AS (
+    SELECT Model,
+           {price_col}  AS AvgPrice,
+           MinPrice     AS MinMarketPrice,
+           MaxPrice     AS MaxMarketPrice
+    FROM   Scraper.MarketPrices
+    WHERE  Category = 'CPU'
 )
 SELECT
     e.ID,
@@ -329,30 +415,14 @@ ORDER BY PotentialGain DESC;
 """
     elif product_type == 'hdd':
         return f"""
-WITH RawStats AS (
-    SELECT h.CapacityGB,
-           h.Interface,
-           AVG(e.Price / 100)    AS RawAvg,
-           STDDEV(e.Price / 100) AS StdDev
-    FROM Scraper.HDD h
-    JOIN Scraper.EBAY e ON e.ID = h.ID
-    WHERE e.SoldDate IS NOT NULL AND h.CapacityGB IS NOT NULL
-    GROUP BY h.CapacityGB, h.Interface
-    HAVING COUNT(*) >= 5
-),
-ModelStats AS (
-    SELECT h.CapacityGB,
-           h.Interface,
-           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
-           ROUND(MIN(e.Price / 100), 2) AS MinMarketPrice,
-           ROUND(MAX(e.Price / 100), 2) AS MaxMarketPrice
-    FROM   Scraper.HDD h
-    JOIN   Scraper.EBAY e ON e.ID = h.ID
-    JOIN   RawStats rs ON rs.CapacityGB = h.CapacityGB AND rs.Interface <=> h.Interface
-    WHERE  e.SoldDate IS NOT NULL AND h.CapacityGB IS NOT NULL AND e.Price IS NOT NULL
-      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
-                                AND rs.RawAvg + 2 * rs.StdDev
-    GROUP  BY h.CapacityGB, h.Interface
+WITH ModelStats AS (
+    SELECT CapacityGB,
+           Interface,
+           {price_col}  AS AvgPrice,
+           MinPrice     AS MinMarketPrice,
+           MaxPrice     AS MaxMarketPrice
+    FROM   Scraper.MarketPrices
+    WHERE  Category = 'HDD'
 )
 SELECT
     e.ID,
@@ -382,30 +452,13 @@ ORDER BY PotentialGain DESC;
 """
     elif product_type == 'ram':
         return f"""
-WITH RawStats AS (
-    SELECT r.Type, r.CapacityGB,
-           AVG(e.Price / 100)    AS RawAvg,
-           STDDEV(e.Price / 100) AS StdDev
-    FROM Scraper.RAM r
-    JOIN Scraper.EBAY e ON e.ID = r.ID
-    WHERE e.SoldDate IS NOT NULL
-      AND r.Type IS NOT NULL AND r.CapacityGB IS NOT NULL
-    GROUP BY r.Type, r.CapacityGB
-    HAVING COUNT(*) >= 5
-),
-ModelStats AS (
-    SELECT r.Type, r.CapacityGB,
-           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
-           ROUND(MIN(e.Price / 100), 2) AS MinMarketPrice,
-           ROUND(MAX(e.Price / 100), 2) AS MaxMarketPrice
-    FROM   Scraper.RAM r
-    JOIN   Scraper.EBAY e ON e.ID = r.ID
-    JOIN   RawStats rs ON rs.Type = r.Type AND rs.CapacityGB = r.CapacityGB
-    WHERE  e.SoldDate IS NOT NULL
-      AND  r.Type IS NOT NULL AND r.CapacityGB IS NOT NULL
-      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
-                                AND rs.RawAvg + 2 * rs.StdDev
-    GROUP  BY r.Type, r.CapacityGB
+WITH ModelStats AS (
+    SELECT Type, CapacityGB,
+           {price_col}  AS AvgPrice,
+           MinPrice     AS MinMarketPrice,
+           MaxPrice     AS MaxMarketPrice
+    FROM   Scraper.MarketPrices
+    WHERE  Category = 'RAM'
 )
 SELECT
     e.ID,
@@ -432,20 +485,21 @@ WHERE
     AND e.EndTime < NOW() + {interval}
 ORDER BY PotentialGain DESC;
 """
-    return GPU_DEALS_QUERY  # fallback
+    raise ValueError(f"Unknown product type '{product_type}'")
 
-def get_count_query(product_type: str, window_hours: int = 2, min_discount: float = 20) -> str:
-    """Return count query with parameterized time window and discount threshold."""
+def get_count_query(product_type: str, window_hours: int = 2, min_discount: float = 20,
+                    estimator: str = None) -> str:
+    """Return count query with parameterized time window, discount threshold and
+    market-price estimator."""
     interval = f"INTERVAL {max(1, min(window_hours, 24))} HOUR"
     threshold = (100 - max(0, min_discount)) / 100.0
+    price_col = MARKET_ESTIMATORS.get(estimator or MARKET_ESTIMATOR, 'MeanPrice')
 
     if product_type == 'gpu':
         return f"""
 WITH ModelStats AS (
-    SELECT g.Model, AVG(e.Price / 100) AS AvgPrice
-    FROM Scraper.GPU g JOIN Scraper.EBAY e ON e.ID = g.ID
-    WHERE e.SoldDate IS NOT NULL AND g.Model IS NOT NULL
-    GROUP BY g.Model HAVING COUNT(*) >= 5
+    SELECT Model, {price_col} AS AvgPrice
+    FROM Scraper.MarketPrices WHERE Category = 'GPU'
 )
 SELECT COUNT(*) AS cnt
 FROM Scraper.EBAY e
@@ -457,10 +511,8 @@ WHERE e.SoldDate IS NULL AND (e.Price / 100) < ms.AvgPrice * {threshold}
     elif product_type == 'cpu':
         return f"""
 WITH ModelStats AS (
-    SELECT c.Model, AVG(e.Price / 100) AS AvgPrice
-    FROM Scraper.CPU c JOIN Scraper.EBAY e ON e.ID = c.ID
-    WHERE e.SoldDate IS NOT NULL AND c.Model IS NOT NULL
-    GROUP BY c.Model HAVING COUNT(*) >= 5
+    SELECT Model, {price_col} AS AvgPrice
+    FROM Scraper.MarketPrices WHERE Category = 'CPU'
 )
 SELECT COUNT(*) AS cnt
 FROM Scraper.EBAY e
@@ -472,10 +524,8 @@ WHERE e.SoldDate IS NULL AND (e.Price / 100) < ms.AvgPrice * {threshold}
     elif product_type == 'hdd':
         return f"""
 WITH ModelStats AS (
-    SELECT h.CapacityGB, h.Interface, AVG(e.Price / 100) AS AvgPrice
-    FROM Scraper.HDD h JOIN Scraper.EBAY e ON e.ID = h.ID
-    WHERE e.SoldDate IS NOT NULL AND h.CapacityGB IS NOT NULL
-    GROUP BY h.CapacityGB, h.Interface HAVING COUNT(*) >= 5
+    SELECT CapacityGB, Interface, {price_col} AS AvgPrice
+    FROM Scraper.MarketPrices WHERE Category = 'HDD'
 )
 SELECT COUNT(*) AS cnt
 FROM Scraper.EBAY e
@@ -487,10 +537,8 @@ WHERE e.SoldDate IS NULL AND (e.Price / 100) < ms.AvgPrice * {threshold}
     elif product_type == 'ram':
         return f"""
 WITH ModelStats AS (
-    SELECT r.Type, r.CapacityGB, AVG(e.Price / 100) AS AvgPrice
-    FROM Scraper.RAM r JOIN Scraper.EBAY e ON e.ID = r.ID
-    WHERE e.SoldDate IS NOT NULL AND r.Type IS NOT NULL AND r.CapacityGB IS NOT NULL
-    GROUP BY r.Type, r.CapacityGB HAVING COUNT(*) >= 5
+    SELECT Type, CapacityGB, {price_col} AS AvgPrice
+    FROM Scraper.MarketPrices WHERE Category = 'RAM'
 )
 SELECT COUNT(*) AS cnt
 FROM Scraper.EBAY e
@@ -501,148 +549,6 @@ WHERE e.SoldDate IS NULL AND (e.Price / 100) < ms.AvgPrice * {threshold}
 """
     return ""
 
-PRICE_GUIDE_GPU_QUERY = """
-WITH RawStats AS (
-    SELECT g.Model,
-           AVG(e.Price / 100)    AS RawAvg,
-           STDDEV(e.Price / 100) AS StdDev,
-           COUNT(*)              AS SoldCount
-    FROM   Scraper.GPU g
-    JOIN   Scraper.EBAY e ON e.ID = g.ID
-    WHERE  e.SoldDate IS NOT NULL AND g.Model IS NOT NULL AND e.Price IS NOT NULL
-    GROUP  BY g.Model
-    HAVING COUNT(*) >= 3
-),
-CleanStats AS (
-    SELECT g.Model,
-           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
-           ROUND(MIN(e.Price / 100), 2) AS MinPrice,
-           ROUND(MAX(e.Price / 100), 2) AS MaxPrice
-    FROM   Scraper.GPU g
-    JOIN   Scraper.EBAY e ON e.ID = g.ID
-    JOIN   RawStats rs ON rs.Model = g.Model
-    WHERE  e.SoldDate IS NOT NULL AND g.Model IS NOT NULL AND e.Price IS NOT NULL
-      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
-                                AND rs.RawAvg + 2 * rs.StdDev
-    GROUP  BY g.Model
-)
-SELECT rs.Model,
-       cs.AvgPrice,
-       cs.MinPrice,
-       cs.MaxPrice,
-       rs.SoldCount
-FROM   RawStats rs
-JOIN   CleanStats cs ON cs.Model = rs.Model
-ORDER  BY cs.AvgPrice DESC;
-"""
-
-PRICE_GUIDE_CPU_QUERY = """
-WITH RawStats AS (
-    SELECT c.Model,
-           AVG(e.Price / 100)    AS RawAvg,
-           STDDEV(e.Price / 100) AS StdDev,
-           COUNT(*)              AS SoldCount
-    FROM   Scraper.CPU c
-    JOIN   Scraper.EBAY e ON e.ID = c.ID
-    WHERE  e.SoldDate IS NOT NULL AND c.Model IS NOT NULL AND e.Price IS NOT NULL
-    GROUP  BY c.Model
-    HAVING COUNT(*) >= 3
-),
-CleanStats AS (
-    SELECT c.Model,
-           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
-           ROUND(MIN(e.Price / 100), 2) AS MinPrice,
-           ROUND(MAX(e.Price / 100), 2) AS MaxPrice
-    FROM   Scraper.CPU c
-    JOIN   Scraper.EBAY e ON e.ID = c.ID
-    JOIN   RawStats rs ON rs.Model = c.Model
-    WHERE  e.SoldDate IS NOT NULL AND c.Model IS NOT NULL AND e.Price IS NOT NULL
-      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
-                                AND rs.RawAvg + 2 * rs.StdDev
-    GROUP  BY c.Model
-)
-SELECT rs.Model,
-       cs.AvgPrice,
-       cs.MinPrice,
-       cs.MaxPrice,
-       rs.SoldCount
-FROM   RawStats rs
-JOIN   CleanStats cs ON cs.Model = rs.Model
-ORDER  BY cs.AvgPrice DESC;
-"""
-
-PRICE_GUIDE_HDD_QUERY = """
-WITH RawStats AS (
-    SELECT h.CapacityGB, h.Interface,
-           AVG(e.Price / 100)    AS RawAvg,
-           STDDEV(e.Price / 100) AS StdDev,
-           COUNT(*)              AS SoldCount
-    FROM   Scraper.HDD h
-    JOIN   Scraper.EBAY e ON e.ID = h.ID
-    WHERE  e.SoldDate IS NOT NULL AND h.CapacityGB IS NOT NULL AND e.Price IS NOT NULL
-    GROUP  BY h.CapacityGB, h.Interface
-    HAVING COUNT(*) >= 3
-),
-CleanStats AS (
-    SELECT h.CapacityGB, h.Interface,
-           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
-           ROUND(MIN(e.Price / 100), 2) AS MinPrice,
-           ROUND(MAX(e.Price / 100), 2) AS MaxPrice
-    FROM   Scraper.HDD h
-    JOIN   Scraper.EBAY e ON e.ID = h.ID
-    JOIN   RawStats rs ON rs.CapacityGB = h.CapacityGB AND rs.Interface <=> h.Interface
-    WHERE  e.SoldDate IS NOT NULL AND h.CapacityGB IS NOT NULL AND e.Price IS NOT NULL
-      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
-                                AND rs.RawAvg + 2 * rs.StdDev
-    GROUP  BY h.CapacityGB, h.Interface
-)
-SELECT rs.CapacityGB, rs.Interface,
-       cs.AvgPrice,
-       cs.MinPrice,
-       cs.MaxPrice,
-       rs.SoldCount
-FROM   RawStats rs
-JOIN   CleanStats cs ON cs.CapacityGB = rs.CapacityGB AND cs.Interface <=> rs.Interface
-ORDER  BY rs.CapacityGB DESC, cs.AvgPrice DESC;
-"""
-
-PRICE_GUIDE_RAM_QUERY = """
-WITH RawStats AS (
-    SELECT r.Type, r.CapacityGB,
-           AVG(e.Price / 100)    AS RawAvg,
-           STDDEV(e.Price / 100) AS StdDev,
-           COUNT(*)              AS SoldCount
-    FROM   Scraper.RAM r
-    JOIN   Scraper.EBAY e ON e.ID = r.ID
-    WHERE  e.SoldDate IS NOT NULL AND r.Type IS NOT NULL AND r.CapacityGB IS NOT NULL
-      AND  e.Price IS NOT NULL
-    GROUP  BY r.Type, r.CapacityGB
-    HAVING COUNT(*) >= 3
-),
-CleanStats AS (
-    SELECT r.Type, r.CapacityGB,
-           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
-           ROUND(MIN(e.Price / 100), 2) AS MinPrice,
-           ROUND(MAX(e.Price / 100), 2) AS MaxPrice
-    FROM   Scraper.RAM r
-    JOIN   Scraper.EBAY e ON e.ID = r.ID
-    JOIN   RawStats rs ON rs.Type = r.Type AND rs.CapacityGB = r.CapacityGB
-    WHERE  e.SoldDate IS NOT NULL AND r.Type IS NOT NULL AND r.CapacityGB IS NOT NULL
-      AND  e.Price IS NOT NULL
-      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
-                                AND rs.RawAvg + 2 * rs.StdDev
-    GROUP  BY r.Type, r.CapacityGB
-)
-SELECT rs.Type, rs.CapacityGB,
-       cs.AvgPrice,
-       cs.MinPrice,
-       cs.MaxPrice,
-       rs.SoldCount
-FROM   RawStats rs
-JOIN   CleanStats cs ON cs.Type = rs.Type AND cs.CapacityGB = rs.CapacityGB
-ORDER  BY rs.Type, rs.CapacityGB;
-"""
-
 OUTCOMES_RESOLVED_QUERY = """
 SELECT
     d.EbayID,
@@ -662,11 +568,36 @@ SELECT
 FROM Scraper.DealOutcomes d
 JOIN Scraper.EBAY e ON e.ID = d.EbayID
 WHERE e.SoldDate IS NOT NULL
-ORDER BY d.SurfacedAt DESC
-LIMIT 200;
+  {keyset}
+ORDER BY d.SurfacedAt DESC, d.EbayID DESC
+LIMIT %s;
 """
 
-OUTCOMES_PENDING_QUERY = """
+# Keyset condition for the next page of resolved outcomes: rows strictly
+# after the (SurfacedAt, EbayID) of the last row already sent.  Walks
+# idx_surfaced_at backwards instead of OFFSET-scanning past earlier pages.
+OUTCOMES_KEYSET = "AND (d.SurfacedAt < %s OR (d.SurfacedAt = %s AND d.EbayID < %s))"
+
+OUTCOMES_PAGE_SIZE = 200
+OUTCOMES_MAX_PAGE_SIZE = 500
+
+# Items the scraper gave up verifying stay "pending" forever (SoldDate never
+# arrives); only show the recent ones so the list doesn't grow without bound.
+OUTCOMES_GAVE_UP_VISIBLE_DAYS = 30
+
+OUTCOMES_SUMMARY_QUERY = f"""
+SELECT
+    COALESCE(SUM(e.SoldDate IS NOT NULL), 0)                                             AS total_resolved,
+    COALESCE(SUM(e.SoldDate IS NOT NULL
+                 AND COALESCE(d.FinalPrice, e.Price) < d.AvgMarketPrice), 0)             AS beat_market,
+    COALESCE(SUM(e.SoldDate IS NULL
+                 AND (d.GaveUp = 0
+                      OR d.EndTime > NOW() - INTERVAL {OUTCOMES_GAVE_UP_VISIBLE_DAYS} DAY)), 0) AS total_pending
+FROM Scraper.DealOutcomes d
+JOIN Scraper.EBAY e ON e.ID = d.EbayID;
+"""
+
+OUTCOMES_PENDING_QUERY = f"""
 SELECT
     d.EbayID,
     d.Category,
@@ -683,6 +614,7 @@ SELECT
 FROM Scraper.DealOutcomes d
 JOIN Scraper.EBAY e ON e.ID = d.EbayID
 WHERE e.SoldDate IS NULL
+  AND (d.GaveUp = 0 OR d.EndTime > NOW() - INTERVAL {OUTCOMES_GAVE_UP_VISIBLE_DAYS} DAY)
 ORDER BY d.EndTime ASC;
 """
 
@@ -713,14 +645,15 @@ def ensure_outcomes_table():
             "ALTER TABLE Scraper.DealOutcomes ADD COLUMN GaveUp TINYINT(1) NOT NULL DEFAULT 0",
             "ALTER TABLE Scraper.DealOutcomes ADD COLUMN EndedUnsold TINYINT(1) NOT NULL DEFAULT 0",
             "ALTER TABLE Scraper.DealOutcomes ADD COLUMN FinalPrice INT NULL",
+            "ALTER TABLE Scraper.DealOutcomes ADD INDEX idx_surfaced_at (SurfacedAt, EbayID)",
         ]:
             try:
                 cur.execute(col_sql)
                 conn.commit()
-                col_name = col_sql.split("ADD COLUMN ")[1].split()[0]
-                log.info("DealOutcomes: added %s column", col_name)
+                what, name = col_sql.split("ADD ")[1].split()[:2]
+                log.info("DealOutcomes: added %s %s", name, what.lower())
             except Exception:
-                pass  # column already exists (MySQL error 1060) — safe to ignore
+                pass  # column/index already exists (MySQL error 1060/1061) — safe to ignore
         log.info("DealOutcomes table ready")
     except Exception as e:
         log.error("Could not create DealOutcomes table: %s", e)
@@ -780,6 +713,62 @@ def ensure_ram_table():
 ensure_ram_table()
 
 
+def ensure_market_prices_table():
+    # Populated by the scraper (market_prices.refresh); created here too so the
+    # deal queries have something to join against before the first refresh.
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(market_prices.CREATE_TABLE)
+        conn.commit()
+    except mariadb.Error as e:
+        log.error("Could not create MarketPrices table: %s", e)
+    finally:
+        if conn:
+            conn.close()
+
+
+ensure_market_prices_table()
+
+
+def ensure_scrape_metrics_tables():
+    # Written by the scheduler after each run (scrape_metrics.persist).
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(scrape_metrics.CREATE_RUNS_TABLE)
+        cur.execute(scrape_metrics.CREATE_STAGE_TABLE)
+        conn.commit()
+    except mariadb.Error as e:
+        log.error("Could not create scrape metrics tables: %s", e)
+    finally:
+        if conn:
+            conn.close()
+
+
+ensure_scrape_metrics_tables()
+
+
+def ensure_price_guide_table():
+    # Snapshots are published by the scheduler (price_guide.publish).
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(price_guide.CREATE_TABLE)
+        conn.commit()
+    except Exception:
+        pass
+    finally:
+        if conn:
+            conn.close()
+
+
+ensure_price_guide_table()
+
+
 @app.route('/sw.js')
 def service_worker():
     resp = make_response(send_from_directory('static', 'sw.js'))
@@ -812,13 +801,17 @@ def deals():
         min_discount = max(0, min_discount)
     except (ValueError, TypeError):
         min_discount = 20
+
+    estimator = request.args.get('estimator', MARKET_ESTIMATOR).lower()
+    if estimator not in MARKET_ESTIMATORS:
+        estimator = MARKET_ESTIMATOR
     
     conn = None
     try:
         conn = get_connection()
-        cur = conn.cursor(dictionary=True)
-        cur.execute(get_deals_query(product_type, window_hours, min_discount))
-        rows = cur.fetchall()
+        cur = conn.cursor()
+        cur.execute(get_deals_query(product_type, window_hours, min_discount, estimator))
+        rows = fetch_dicts(cur)
 
         # Record newly surfaced deals (INSERT IGNORE = only capture first sighting)
         if rows:
@@ -857,10 +850,6 @@ def deals():
             except Exception as e:
                 log.warning("Could not record surfaced deals: %s", e)
 
-        for row in rows:
-            if row.get("EndTime"):
-                row["EndTime"] = row["EndTime"].isoformat()
-
         return jsonify({"status": "ok", "deals": rows})
     except Exception as e:
         log.error("deals error: %s", e)
@@ -885,15 +874,19 @@ def deal_counts():
         min_discount = max(0, min_discount)
     except (ValueError, TypeError):
         min_discount = 20
+
+    estimator = request.args.get('estimator', MARKET_ESTIMATOR).lower()
+    if estimator not in MARKET_ESTIMATORS:
+        estimator = MARKET_ESTIMATOR
     
     conn = None
     try:
         conn = get_connection()
-        cur = conn.cursor(dictionary=True)
+        cur = conn.cursor()
         counts = {}
         for key in ('gpu', 'cpu', 'hdd', 'ram'):
-            cur.execute(get_count_query(key, window_hours, min_discount))
-            counts[key] = cur.fetchone()['cnt']
+            cur.execute(get_count_query(key, window_hours, min_discount, estimator))
+            counts[key] = cur.fetchone()[0]
         return jsonify({"status": "ok", "counts": counts})
     except Exception as e:
         log.error("deal_counts error: %s", e)
@@ -908,24 +901,24 @@ def stats():
     conn = None
     try:
         conn = get_connection()
-        cur = conn.cursor(dictionary=True)
+        cur = conn.cursor()
 
         cur.execute("SELECT COUNT(*) AS total FROM Scraper.EBAY WHERE SoldDate IS NULL")
-        active = cur.fetchone()["total"]
+        active = cur.fetchone()[0]
 
         cur.execute("SELECT COUNT(*) AS total FROM Scraper.EBAY WHERE SoldDate IS NOT NULL")
-        sold = cur.fetchone()["total"]
+        sold = cur.fetchone()[0]
 
         cur.execute("""
             SELECT LastScrapeAt FROM Scraper.ScrapeMeta WHERE id = 1
         """)
         row = cur.fetchone()
-        last_scrape = row["LastScrapeAt"] if row else None
+        last_scrape = row[0] if row else None
 
         return jsonify({
             "active_listings": active,
             "sold_listings": sold,
-            "last_scrape_at": last_scrape.isoformat() if last_scrape else None,
+            "last_scrape_at": last_scrape,
         })
     except Exception as e:
         log.error("stats error: %s", e)
@@ -937,42 +930,51 @@ def stats():
 
 @app.route("/api/outcomes")
 def outcomes():
+    """Resolved outcomes newest-first, one keyset page at a time.
+
+    The first request (no `cursor`) also returns the summary — computed in
+    SQL over the full history — and the pending list.  Follow-up requests
+    pass the previous response's `next_cursor` and get only the next page
+    of `resolved`; `next_cursor` is null on the last page.
+    """
+    try:
+        limit = int(request.args.get('limit', OUTCOMES_PAGE_SIZE))
+        limit = max(1, min(limit, OUTCOMES_MAX_PAGE_SIZE))
+    except (ValueError, TypeError):
+        limit = OUTCOMES_PAGE_SIZE
+
+    keyset, params = '', ()
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            surfaced_at, ebay_id = cursor.rsplit('|', 1)
+            surfaced_at, ebay_id = datetime.fromisoformat(surfaced_at), int(ebay_id)
+        except ValueError:
+            return jsonify({"status": "error", "message": "Invalid cursor"}), 400
+        keyset, params = OUTCOMES_KEYSET, (surfaced_at, surfaced_at, ebay_id)
+
     conn = None
     try:
         conn = get_connection()
-        cur = conn.cursor(dictionary=True)
+        cur = conn.cursor()
 
-        # Lazy-backfill: lock in FinalPrice for rows resolved before the column existed.
-        # Once written, d.FinalPrice is immutable — future re-listings of the sold item
-        # won't change e.Price in the DB but this guards against it anyway.
-        cur.execute("""
-            UPDATE Scraper.DealOutcomes d
-            JOIN Scraper.EBAY e ON e.ID = d.EbayID
-            SET d.FinalPrice = e.Price
-            WHERE e.SoldDate IS NOT NULL AND d.FinalPrice IS NULL AND d.EndedUnsold = 0
-        """)
-        if cur.rowcount > 0:
-            conn.commit()
+        # One extra row tells us whether another page exists.
+        cur.execute(OUTCOMES_RESOLVED_QUERY.format(keyset=keyset), (*params, limit + 1))
+        resolved = fetch_dicts(cur)
+        next_cursor = None
+        if len(resolved) > limit:
+            resolved = resolved[:limit]
+            last = resolved[-1]
+            next_cursor = f"{last['SurfacedAt'].isoformat()}|{last['EbayID']}"
 
-        cur.execute(OUTCOMES_RESOLVED_QUERY)
-        resolved = cur.fetchall()
+        if cursor:
+            return jsonify({"status": "ok", "resolved": resolved, "next_cursor": next_cursor})
 
         cur.execute(OUTCOMES_PENDING_QUERY)
-        pending = cur.fetchall()
+        pending = fetch_dicts(cur)
 
-        for row in resolved:
-            for col in ('EndTime', 'SoldDate', 'SurfacedAt'):
-                if row.get(col):
-                    row[col] = row[col].isoformat()
-
-        for row in pending:
-            for col in ('EndTime', 'SurfacedAt'):
-                if row.get(col):
-                    row[col] = row[col].isoformat()
-
-        beat_market = sum(1 for r in resolved if r['FinalPrice'] is not None
-                          and r['FinalPrice'] < r['AvgMarketPrice'])
-        total_resolved = len(resolved)
+        cur.execute(OUTCOMES_SUMMARY_QUERY)
+        total_resolved, beat_market, total_pending = (int(v) for v in cur.fetchone())
         win_rate = round(beat_market / total_resolved * 100, 1) if total_resolved > 0 else 0
 
         return jsonify({
@@ -981,10 +983,11 @@ def outcomes():
                 "total_resolved": total_resolved,
                 "beat_market": beat_market,
                 "win_rate": win_rate,
-                "total_pending": len(pending),
+                "total_pending": total_pending,
             },
             "resolved": resolved,
             "pending": pending,
+            "next_cursor": next_cursor,
         })
     except Exception as e:
         log.error("outcomes error: %s", e)
@@ -994,19 +997,48 @@ def outcomes():
             conn.close()
 
 
+# Browsers and proxies may reuse the newest snapshot this long before
+# revalidating (a 304 when the version hasn't changed).
+PRICE_GUIDE_MAX_AGE = int(os.environ.get('PRICE_GUIDE_MAX_AGE', '300'))
+
+
+def _snapshot_response(version, generated_at, payload, cache_control):
+    """Serve a stored price-guide snapshot, honouring If-None-Match and gzip."""
+    etag = f'"{version}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        resp = make_response('', 304)
+    elif _encoding_weights(request.headers.get('Accept-Encoding', '')).get('gzip', 0) > 0:
+        resp = make_response(payload)
+        resp.headers['Content-Encoding'] = 'gzip'
+    else:
+        resp = make_response(gzip.decompress(payload))
+    resp.headers['Content-Type'] = 'application/json'
+    resp.headers['ETag'] = etag
+    resp.headers['Cache-Control'] = cache_control
+    resp.headers['Vary'] = 'Accept-Encoding'
+    resp.headers['X-Price-Guide-Version'] = version
+    return resp
+
+
 @app.route("/api/price-guide")
-def price_guide():
+def price_guide_latest():
+    """Newest scheduler-built snapshot; live queries only until the first one lands."""
     conn = None
     try:
         conn = get_connection()
-        cur = conn.cursor(dictionary=True)
+        cur = conn.cursor()
+        try:
+            cur.execute(price_guide.LATEST_SQL)
+            snapshot = cur.fetchone()
+        except mariadb.Error:
+            snapshot = None     # table not created yet
+        if snapshot:
+            return _snapshot_response(*snapshot, f"public, max-age={PRICE_GUIDE_MAX_AGE}")
+
         result = {}
-        for cat, query in [('gpu', PRICE_GUIDE_GPU_QUERY),
-                            ('cpu', PRICE_GUIDE_CPU_QUERY),
-                            ('hdd', PRICE_GUIDE_HDD_QUERY),
-                            ('ram', PRICE_GUIDE_RAM_QUERY)]:
+        for cat, query in price_guide.QUERIES.items():
             cur.execute(query)
-            result[cat] = cur.fetchall()
+            result[cat] = fetch_dicts(cur)
         return jsonify({"status": "ok", "components": result})
     except Exception as e:
         log.error("price_guide error: %s", e)
@@ -1016,5 +1048,100 @@ def price_guide():
             conn.close()
 
 
+@app.route("/api/price-guide/<version>")
+def price_guide_version(version):
+    """One snapshot by content hash — immutable, so cacheable for a year."""
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute(price_guide.VERSION_SQL, (version,))
+        snapshot = cur.fetchone()
+        if not snapshot:
+            return jsonify({"status": "error", "message": f"Unknown price-guide version '{version}'"}), 404
+        return _snapshot_response(*snapshot, "public, max-age=31536000, immutable")
+    except Exception as e:
+        log.error("price_guide error: %s", e)
+        return jsonify({"status": "error", "message": "internal error"}), 500
+    finally:
+        if conn:
+            conn.close()
+
+
+def _prom_labels(**labels) -> str:
+    def esc(v):
+        return str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{esc(v)}"' for k, v in labels.items()) + '}'
+
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus text exposition of the latest scrape run of each kind.
+
+    Stage timings become dealfinder_stage_{seconds,calls,max_seconds} and
+    each counter becomes dealfinder_<name>, all labelled by run kind,
+    category and query (counters also by detail, e.g. skip reason).
+    """
+    conn = None
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT r.RunID, r.Kind, r.FinishedAt, r.DurationSec
+            FROM   Scraper.ScrapeRuns r
+            JOIN  (SELECT Kind, MAX(RunID) AS RunID FROM Scraper.ScrapeRuns GROUP BY Kind) l
+                   ON l.RunID = r.RunID
+        """)
+        runs = {run_id: (kind, finished, duration) for run_id, kind, finished, duration in cur.fetchall()}
+        cur.execute("SELECT Kind, COUNT(*) FROM Scraper.ScrapeRuns GROUP BY Kind")
+        run_totals = cur.fetchall()
+        rows = []
+        if runs:
+            cur.execute(f"""
+                SELECT RunID, Category, Query, Metric, Detail, Count, Seconds, MaxSeconds
+                FROM   Scraper.ScrapeStageMetrics
+                WHERE  RunID IN ({', '.join(['%s'] * len(runs))})
+            """, tuple(runs))
+            rows = cur.fetchall()
+    except Exception as e:
+        log.error("metrics error: %s", e)
+        return make_response("# metrics unavailable\n", 500, {'Content-Type': 'text/plain; version=0.0.4'})
+    finally:
+        if conn:
+            conn.close()
+
+    families = {}   # metric name → (type, help, [sample lines])
+
+    def sample(name, mtype, help_text, labels, value):
+        families.setdefault(name, (mtype, help_text, []))[2].append(
+            f"{name}{_prom_labels(**labels)} {value}"
+        )
+
+    for kind, total in run_totals:
+        sample('dealfinder_scrape_runs_total', 'counter', 'Scrape runs recorded.', {'kind': kind}, total)
+    for kind, finished, duration in runs.values():
+        sample('dealfinder_scrape_run_duration_seconds', 'gauge',
+               'Wall time of the latest scrape run.', {'kind': kind}, duration)
+        sample('dealfinder_scrape_run_finished_timestamp_seconds', 'gauge',
+               'Finish time of the latest scrape run.', {'kind': kind}, int(finished.timestamp()))
+    for run_id, category, query, metric, detail, count, seconds, max_seconds in rows:
+        labels = {'kind': runs[run_id][0], 'category': category, 'query': query}
+        if seconds is None:
+            name = 'dealfinder_' + ''.join(c if c.isalnum() else '_' for c in metric)
+            sample(name, 'gauge', f'{metric} in the latest run.', {**labels, 'detail': detail}, count)
+        else:
+            labels['stage'] = metric
+            sample('dealfinder_stage_seconds', 'gauge', 'Seconds spent per pipeline stage.', labels, seconds)
+            sample('dealfinder_stage_calls', 'gauge', 'Timed calls per pipeline stage.', labels, count)
+            sample('dealfinder_stage_max_seconds', 'gauge', 'Slowest single call per stage.', labels, max_seconds)
+
+    lines = []
+    for name, (mtype, help_text, samples) in families.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {mtype}", *samples]
+    resp = make_response("\n".join(lines) + "\n")
+    resp.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    return resp
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000, debug=False)
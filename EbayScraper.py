@@ -1,17 +1,31 @@
 import re
 import time
 import logging
-import requests
+import concurrent.futures
+import contextvars
+import multiprocessing
+import threading
 import urllib.parse
+import codecs
 from bs4 import BeautifulSoup
 import os.path
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import mariadb
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from typing import Optional
 
+import market_prices
+import price_guide
+import price_stats
+from keyword_matcher import KeywordMatcher
+import query_schedule
+import scheduler_state
+import scrape_metrics
+from title_cache import TitleCache
+from zyte_client import RetryPolicy, ZyteCancelled, ZyteClient
+
 log = logging.getLogger(__name__)
 
 load_dotenv("credentials.env")
@@ -58,6 +72,27 @@ typeDict = {
 # Call reset_direct_session() before each run to get a fresh identity.
 _direct_session = None
 
+# Seconds a hedged fetch waits for the direct fetch before also starting a Zyte
+# request.  Only used for deadline-sensitive fetches (see _fetch_hedged).
+ZYTE_HEDGE_DELAY = float(os.environ.get('ZYTE_HEDGE_DELAY', '3'))
+
+# How a page of prices is trimmed before upload: 'stdev' (mean ± 1σ, the
+# original behaviour), 'iqr' or 'mad'.  See price_stats for the details.
+PRICE_OUTLIER_METHOD = os.environ.get('PRICE_OUTLIER_METHOD', 'stdev')
+
+# Worker processes for the search-page parse stage.  0 parses in the scraper
+# process itself, card-by-card as each page streams in; with workers, pages are
+# fetched whole and parsed in a process pool while the next ones download and
+# the previous query uploads (see _scrape_pages).
+PARSE_WORKERS = int(os.environ.get('PARSE_WORKERS', '0'))
+
+# Real eBay search pages are >1 MB; a body smaller than this is a block or
+# CAPTCHA page.  Checked on the raw byte length, before anything is decoded.
+_BLOCK_PAGE_BYTES = 50_000
+
+# Browser whose TLS / HTTP2 fingerprint curl-cffi presents to Akamai.
+_IMPERSONATE = 'chrome120'
+
 # Full browser header set that Akamai inspects.  curl-cffi sets the TLS/HTTP2
 # fingerprint; we supply the application-layer headers to match.
 _DIRECT_HEADERS_BASE = {
@@ -86,29 +121,19 @@ def reset_direct_session() -> None:
     _direct_session = None
 
 
-def _fetch_direct(url: str) -> str | None:
-    """Fetch URL via a persistent curl-cffi session impersonating Chrome 131.
+def _get_direct_session(cffi_requests):
+    """Return the shared curl-cffi session, creating and warming it up if needed.
 
     On first call (or after reset_direct_session()), warms up by fetching the
     eBay homepage so Akamai bot-detection cookies (_abck, bm_sz, etc.) are
     established before any search request.
-
-    Returns HTML string on success, or None if the request fails or the
-    response looks like a bot-detection / block page.
     """
     global _direct_session
-
-    try:
-        from curl_cffi import requests as cffi_requests
-    except ImportError:
-        log.warning("curl_cffi not installed — skipping direct fetch")
-        return None
-
-    # Initialise session + homepage warmup once per scrape run.
-    if _direct_session is None:
-        _direct_session = cffi_requests.Session(impersonate='chrome120')
+    session = _direct_session
+    if session is None:
+        session = _direct_session = cffi_requests.Session(impersonate=_IMPERSONATE)
         try:
-            warmup = _direct_session.get(
+            warmup = session.get(
                 'https://www.ebay.co.uk/',
                 headers={
                     **_DIRECT_HEADERS_BASE,
@@ -119,13 +144,115 @@ def _fetch_direct(url: str) -> str | None:
             )
             log.info(
                 "Direct session warmed up (HTTP %s, %d cookies)",
-                warmup.status_code, len(_direct_session.cookies),
+                warmup.status_code, len(session.cookies),
             )
         except Exception as e:
             log.warning("Session warmup failed: %s", e)
+    return session
+
+
+# ── Block-page detection ──────────────────────────────────────────────────────
+# Checked as a response arrives, so a block is caught from the status line and
+# headers or the first few KB of body and the transfer is abandoned at once,
+# rather than after downloading (and size-checking) the whole page.
+
+# Body bytes buffered before the first chunk is handed on, so the markers
+# below can be looked for in one place.  Real pages are well past this.
+_BLOCK_SNIFF_BYTES = 16 * 1024
+
+# Lower-cased markers of Akamai deny / bot-manager and eBay CAPTCHA pages.
+_BLOCK_MARKERS = (
+    b'pardon our interruption',
+    b'please verify yourself',
+    b'splashui/captcha',
+    b'/_sec/cp_challenge',
+    b'<title>access denied</title>',
+    b'errors.edgesuite.net',
+)
+_BLOCK_URL_MARKERS = ('/splashui/captcha', '/_sec/')
+
+
+def _blocked_response(status: int, headers, url: str) -> str | None:
+    """Why a response is a block page, judged from its status and headers alone; else None."""
+    if any(m in (url or '') for m in _BLOCK_URL_MARKERS):
+        return f"redirected to {url}"
+    if status == 429:
+        return "HTTP 429 rate limited"
+    if status == 403 and 'akamai' in (headers.get('Server') or '').lower():
+        return "HTTP 403 from Akamai"
+    if status != 200:
+        return None     # an ordinary HTTP failure, not a block page
+    content_type = headers.get('Content-Type') or ''
+    if content_type and 'html' not in content_type.lower():
+        return f"Content-Type {content_type}"
+    length = headers.get('Content-Length')
+    # Only an uncompressed length is comparable with the page-size floor.
+    if length and length.isdigit() and not headers.get('Content-Encoding') and int(length) < _BLOCK_PAGE_BYTES:
+        return f"Content-Length {length}"
+    return None
+
+
+def _blocked_body(head: bytes) -> str | None:
+    """Why a page whose body starts with `head` is a block page; else None."""
+    head = head[:_BLOCK_SNIFF_BYTES].lower()
+    for marker in _BLOCK_MARKERS:
+        if marker in head:
+            return f"'{marker.decode()}' in body"
+    return None
+
+
+def _fetch_direct(url: str, cancel: threading.Event | None = None) -> bytes | None:
+    """Fetch URL via a persistent curl-cffi session impersonating Chrome 120.
+
+    The session is created and warmed up on first use (see _get_direct_session).
+    The body is streamed (see _stream_direct), so a block page is abandoned as
+    soon as it is recognised.
+
+    Returns the raw response body on success (decoded once, by whichever
+    parser consumes it), or None if the request fails, is cancelled via
+    `cancel`, or the response looks like a bot-detection / block page.
+    """
+    try:
+        return b''.join(_stream_direct(url, decode=False, cancel=cancel))
+    except RuntimeError as e:
+        log.warning("%s", e)
+        return None
 
+
+def _stream_direct(url: str, chunk_size: int = 64 * 1024, decode: bool = True,
+                   cancel: threading.Event | None = None):
+    """Stream URL via the shared curl-cffi session, yielding decoded text chunks.
+
+    Streaming counterpart of _fetch_direct for the search-page pipeline, so
+    cards can be parsed while the page downloads (see __StreamItems).  With
+    decode=False the raw body chunks are yielded instead.
+
+    The status and headers, then the first _BLOCK_SNIFF_BYTES of body, are
+    checked for a block page before anything is yielded; the size floor is
+    checked once the stream ends.
+
+    Raises RuntimeError if the request fails or turns out to be a block
+    page — the transfer is abandoned at that point and the caller discards
+    anything parsed from the stream and falls back to Zyte.  Setting `cancel`
+    (a hedged fetch that Zyte has already won) abandons it the same way at
+    the next chunk.
+    """
+    global _direct_session
+
+    try:
+        from curl_cffi import requests as cffi_requests
+    except ImportError:
+        raise RuntimeError("curl_cffi not installed — skipping direct fetch")
+
+    # A local reference is held so a concurrent reset (e.g. a hedged fetch
+    # abandoning this request) cannot swap the session out mid-request.
+    session = _get_direct_session(cffi_requests)
+    # Only time spent waiting on the network counts towards fetch_direct; the
+    # consumer's parse time between chunks is recorded separately as 'parse'.
+    elapsed = 0.0
+    start = time.perf_counter()
     try:
-        resp = _direct_session.get(
+        resp = session.get(
             url,
             headers={
                 **_DIRECT_HEADERS_BASE,
@@ -133,464 +260,996 @@ def _fetch_direct(url: str) -> str | None:
                 'Sec-Fetch-Site': 'same-origin',
             },
             timeout=30,
+            stream=True,
         )
-        if resp.status_code != 200:
-            log.warning("Direct fetch: HTTP %s for %s", resp.status_code, url)
-            return None
-        html = resp.text
-        # Real eBay search pages are >1 MB; block/CAPTCHA pages are tiny.
-        if len(html) < 50_000:
-            log.warning(
-                "Direct fetch: response too small (%d chars) — possible block page", len(html)
-            )
-            _direct_session = None  # session may be flagged; reset for next call
-            return None
-        log.info("Direct fetch OK (curl-cffi/chrome131, %d chars)", len(html))
-        return html
     except Exception as e:
-        log.warning("Direct fetch failed: %s", e)
         _direct_session = None
+        scrape_metrics.observe('fetch_direct', time.perf_counter() - start)
+        scrape_metrics.incr('fetch_failures', detail='direct')
+        raise RuntimeError(f"Direct fetch failed: {e}") from e
+    elapsed += time.perf_counter() - start
+
+    def blocked(reason):
+        global _direct_session
+        _direct_session = None  # session may be flagged; reset for next call
+        scrape_metrics.incr('block_pages', detail='direct')
+        return RuntimeError(f"Direct fetch: {reason} — block page")
+
+    nbytes = 0
+    ok = cancelled = False
+    try:
+        reason = _blocked_response(resp.status_code, resp.headers, resp.url)
+        if reason:
+            raise blocked(reason)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Direct fetch: HTTP {resp.status_code} for {url}")
+        decoder = codecs.getincrementaldecoder(resp.encoding or 'utf-8')(errors='replace') if decode else None
+        head = b''
+        sniffed = False
+        chunks = resp.iter_content(chunk_size=chunk_size)
+        try:
+            while True:
+                start = time.perf_counter()
+                chunk = next(chunks, None)
+                elapsed += time.perf_counter() - start
+                if chunk is None:
+                    break
+                if cancel is not None and cancel.is_set():
+                    cancelled = True
+                    raise RuntimeError("Direct fetch: cancelled — another fetch won")
+                nbytes += len(chunk)
+                if not sniffed:
+                    head += chunk
+                    if len(head) < _BLOCK_SNIFF_BYTES:
+                        continue
+                    sniffed = True
+                    reason = _blocked_body(head)
+                    if reason:
+                        raise blocked(reason)
+                    chunk, head = head, b''
+                text = decoder.decode(chunk) if decode else chunk
+                if text:
+                    yield text
+        except RuntimeError:
+            raise
+        except Exception as e:
+            _direct_session = None
+            raise RuntimeError(f"Direct fetch failed mid-stream: {e}") from e
+        # A body shorter than the sniff window is checked (and handed on) here.
+        if head:
+            reason = _blocked_body(head)
+            if reason:
+                raise blocked(reason)
+        if nbytes < _BLOCK_PAGE_BYTES:
+            raise blocked(f"response too small ({nbytes} bytes)")
+        if decode:
+            text = decoder.decode(head, final=True)
+            if text:
+                yield text
+        elif head:
+            yield head
+        log.info("Direct fetch OK (curl-cffi/%s, streamed %d bytes)", _IMPERSONATE, nbytes)
+        ok = True
+    finally:
+        resp.close()
+        scrape_metrics.observe('fetch_direct', elapsed)
+        scrape_metrics.incr('bytes_fetched', nbytes, detail='direct')
+        if not ok and not cancelled:
+            scrape_metrics.incr('fetch_failures', detail='direct')
+
+
+# Shared Zyte client, rebuilt only if its configuration changes (see _get_zyte_client).
+_zyte_client: ZyteClient | None = None
+_zyte_config: tuple | None = None
+
+
+def _get_zyte_client() -> ZyteClient | None:
+    """The pooled Zyte client for the current ZYTE_* settings, or None without an API key.
+
+    Settings are read on each call rather than at import, so credentials.env
+    (loaded after the imports) is honoured.
+    """
+    global _zyte_client, _zyte_config
+    api_key = os.environ.get("ZYTE_API_KEY")
+    if not api_key:
         return None
+    config = (
+        api_key,
+        int(os.environ.get('ZYTE_MAX_RETRIES', '3')),
+        int(os.environ.get('ZYTE_CONCURRENCY', '4')),
+    )
+    if config != _zyte_config:
+        if _zyte_client is not None:
+            _zyte_client.close()
+        _, max_retries, concurrency = config
+        _zyte_client = ZyteClient(api_key, concurrency=concurrency,
+                                  retry=RetryPolicy(max_attempts=max_retries))
+        _zyte_config = config
+    return _zyte_client
 
 
-def _fetch_zyte(url: str) -> str | None:
+def _fetch_zyte(url: str, cancel: threading.Event | None = None) -> bytes | None:
     """Fetch URL via Zyte API — pay-per-use fallback when direct fetch is blocked.
 
     Uses httpResponseBody mode (raw HTTP response, no JS rendering).
     eBay search pages are server-rendered HTML so JS execution is not required.
     Approx cost: $1.8 per 1,000 successful requests (no monthly fee).
 
-    HTTP 520 (Zyte transient error) is retried with exponential back-off up to
-    ZYTE_MAX_RETRIES attempts (default 3, sleeps 2 s / 4 s / 8 s between tries).
+    Requests go through one pooled keep-alive client (zyte_client), at most
+    ZYTE_CONCURRENCY at a time.  HTTP 520 / 429 are retried with exponential
+    back-off up to ZYTE_MAX_RETRIES attempts (default 3, sleeps 2 s / 4 s
+    between tries).
 
     If Akamai still blocks via Zyte (response too small), switch the payload to:
         {"url": url, "browserHtml": True, "geolocation": "GB"}
     and decode with resp.json()["browserHtml"] (no base64). Cost ~$9/1k.
+
+    Returns the decoded-from-base64 response body as bytes, like _fetch_direct.
+    A set `cancel` stops any further retries (see ZyteClient.extract).
     """
-    import base64
-    api_key = os.environ.get("ZYTE_API_KEY")
-    if not api_key:
+    client = _get_zyte_client()
+    if client is None:
         log.warning("Zyte API key not configured — skipping Zyte fetch")
         return None
 
-    max_retries = int(os.environ.get('ZYTE_MAX_RETRIES', '3'))
+    with scrape_metrics.timer('fetch_zyte'):
+        body = _fetch_zyte_body(client, url, cancel)
+    if body is None and not (cancel is not None and cancel.is_set()):
+        scrape_metrics.incr('fetch_failures', detail='zyte')
+    return body
 
-    for attempt in range(max_retries):
-        try:
-            log.info("Fetching via Zyte API: %s", url)
-            resp = requests.post(
-                "https://api.zyte.com/v1/extract",
-                auth=(api_key, ""),
-                json={
-                    "url": url,
-                    "httpResponseBody": True,
-                    "geolocation": "GB",
-                },
-                timeout=60,
-            )
 
-            if resp.status_code == 520:
-                backoff = 2 ** (attempt + 1)
-                log.warning(
-                    "Zyte HTTP 520 (attempt %d/%d) — backing off %ds before retry",
-                    attempt + 1, max_retries, backoff,
-                )
-                if attempt < max_retries - 1:
-                    time.sleep(backoff)
-                continue
+def _fetch_zyte_body(client: ZyteClient, url: str, cancel: threading.Event | None = None) -> bytes | None:
+    """One Zyte fetch (retries included) with its logging and page checks."""
+    try:
+        log.info("Fetching via Zyte API: %s", url)
+        body = client.fetch_body(url, cancel=cancel)
+    except ZyteCancelled:
+        log.info("Zyte fetch cancelled — another fetch won")
+        return None
+    except Exception as e:
+        log.error("Zyte fetch failed: %s", e)
+        return None
+
+    scrape_metrics.incr('bytes_fetched', len(body), detail='zyte')
+    reason = _blocked_body(body)
+    if reason is None and len(body) < _BLOCK_PAGE_BYTES:
+        reason = f"response too small ({len(body)} bytes)"
+    if reason:
+        log.warning("Zyte fetch: %s — block page", reason)
+        scrape_metrics.incr('block_pages', detail='zyte')
+        return None
+    log.info("Fetched via Zyte (%d bytes)", len(body))
+    return body
+
+
+# Threads shared by every hedged fetch.  Each fetch uses two; a cancelled
+# loser can hold one until its request returns, so there are spares.
+HEDGE_WORKERS = 8
+
+_hedge_pool = None
+
+
+def _get_hedge_pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _hedge_pool
+    if _hedge_pool is None:
+        _hedge_pool = concurrent.futures.ThreadPoolExecutor(HEDGE_WORKERS, thread_name_prefix='hedge')
+    return _hedge_pool
+
+
+def _fetch_hedged(url: str, delay: float | None = None) -> bytes | None:
+    """Race the direct fetch against Zyte for deadline-sensitive requests.
 
-            resp.raise_for_status()
-            html = base64.b64decode(resp.json()["httpResponseBody"]).decode("utf-8", errors="replace")
-            if len(html) < 50_000:
-                log.warning("Zyte response too small (%d chars) — possible block page", len(html))
-                return None
-            log.info("Fetched via Zyte (%d chars)", len(html))
-            return html
+    The direct fetch starts immediately.  If it has not returned a valid page
+    within `delay` seconds (default ZYTE_HEDGE_DELAY), or fails before then,
+    a Zyte request is started alongside it and whichever returns a valid page
+    first wins.  The loser is cancelled: a streaming direct fetch closes its
+    response at the next chunk, and Zyte makes no further retries (a Zyte
+    request already in flight runs to completion, result discarded).
 
+    Returns the page body on success, or None if both fetches fail.
+    """
+    if delay is None:
+        delay = ZYTE_HEDGE_DELAY
+
+    def _result(future):
+        try:
+            return future.result()
         except Exception as e:
-            log.error("Zyte fetch failed: %s", e)
+            log.warning("Hedged fetch leg failed: %s", e)
             return None
 
-    log.error("Zyte fetch failed: HTTP 520 persisted after %d attempt(s)", max_retries)
-    return None
+    pool = _get_hedge_pool()
+    cancel = threading.Event()
+    legs = []
+    try:
+        # Run each leg in a copy of this context so its metrics keep our labels.
+        direct = pool.submit(contextvars.copy_context().run, _fetch_direct, url, cancel)
+        legs.append(direct)
+        done, _ = concurrent.futures.wait([direct], timeout=delay)
+        if direct in done:
+            body = _result(direct)
+            if body is not None:
+                return body
+            log.info("Hedged fetch: direct failed — starting Zyte")
+            pending = set()
+        else:
+            log.info("Hedged fetch: no direct response after %.1fs — starting Zyte", delay)
+            pending = {direct}
+
+        zyte = pool.submit(contextvars.copy_context().run, _fetch_zyte, url, cancel)
+        legs.append(zyte)
+        pending.add(zyte)
+        while pending:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED,
+            )
+            for future in done:
+                body = _result(future)
+                if body is None:
+                    continue
+                if future is zyte and direct in pending:
+                    # Direct is still hanging — drop the session so the next
+                    # fetch starts a fresh identity instead of sharing it.
+                    reset_direct_session()
+                log.info("Hedged fetch won by %s", 'Zyte' if future is zyte else 'direct')
+                return body
+        return None
+    finally:
+        cancel.set()
+        for leg in legs:
+            leg.cancel()        # not started yet (pool busy): never runs
 
 
-def __GetHTML(query, country, condition='', listing_type='all', alreadySold=True, cache=False):
+def __SoldFilter(alreadySold):
     # alreadySold values:
     #   True        → sold listings only       (&LH_Complete=1&LH_Sold=1)
     #   'completed' → all completed listings   (&LH_Complete=1)   sold + ended-unsold
     #   False       → active listings          (&_sop=1)
+    # Returns (cache_suffix, url_params).
     if alreadySold == 'completed':
-        cache_suffix = 'completed'
-        alreadySoldString = '&LH_Complete=1'
+        return 'completed', '&LH_Complete=1'
     elif alreadySold:
-        cache_suffix = 'sold'
-        alreadySoldString = '&LH_Complete=1&LH_Sold=1'
+        return 'sold', '&LH_Complete=1&LH_Sold=1'
     else:
-        cache_suffix = 'active'
-        alreadySoldString = '&_sop=1'
+        return 'active', '&_sop=1'
+
+def __SearchURL(query, country, condition, listing_type, alreadySold):
+    _, alreadySoldString = __SoldFilter(alreadySold)
+    parsedQuery = urllib.parse.quote(query).replace('%20', '+')
+    return (
+        f'https://www.ebay{countryDict[country]}/sch/i.html?_from=R40&_nkw={parsedQuery}'
+        f'{alreadySoldString}{conditionDict[condition]}{typeDict[listing_type]}'
+    )
+
+_META_CHARSET_RE = re.compile(rb'<meta[^>]*?charset=["\']?([\w.:-]+)', re.IGNORECASE)
 
+
+def _page_encoding(body: bytes) -> str:
+    """The charset a page declares in a <meta> tag near its start, else UTF-8."""
+    m = _META_CHARSET_RE.search(body, 0, 4096)
+    if m:
+        try:
+            return codecs.lookup(m.group(1).decode('ascii')).name
+        except LookupError:
+            pass
+    return 'utf-8'
+
+
+def _page_text(body: bytes) -> str:
+    """Decode a fetched page once, with its declared encoding."""
+    return str(body, _page_encoding(body), 'replace')
+
+
+def __GetHTML(query, country, condition='', listing_type='all', alreadySold=True, cache=False, hedge=False):
+    # hedge=True races direct against Zyte (see _fetch_hedged) instead of
+    # waiting for the direct fetch to fail before falling back.
+    cache_suffix, _ = __SoldFilter(alreadySold)
     cache_file = f"{query}_{cache_suffix}.txt"
 
     if cache and os.path.isfile(cache_file):
-        with open(cache_file, "r", encoding="utf-8") as f:
-            responseHTML = f.read()
+        with open(cache_file, "rb") as f:
+            body = f.read()
     else:
-        parsedQuery = urllib.parse.quote(query).replace('%20', '+')
-        url = (
-            f'https://www.ebay{countryDict[country]}/sch/i.html?_from=R40&_nkw={parsedQuery}'
-            f'{alreadySoldString}{conditionDict[condition]}{typeDict[listing_type]}'
-        )
+        url = __SearchURL(query, country, condition, listing_type, alreadySold)
         log.debug("Fetching: %s", url)
 
-        responseHTML = _fetch_direct(url) or _fetch_zyte(url)
-        if responseHTML is None:
+        if hedge:
+            body = _fetch_hedged(url)
+        else:
+            body = _fetch_direct(url) or _fetch_zyte(url)
+        if body is None:
             raise RuntimeError(f"All fetch methods failed for: {url}")
 
         if cache:
-            with open(cache_file, "w", encoding='utf-8') as f:
-                f.write(responseHTML)
+            with open(cache_file, "wb") as f:
+                f.write(body)
+
+    # The bytes go straight to BeautifulSoup, which decodes them once.
+    return BeautifulSoup(body, 'html.parser', from_encoding=_page_encoding(body))
+
+_CARD_ID_RE = re.compile(r'/itm/(\d+)')
+
 
-    return BeautifulSoup(responseHTML, 'html.parser')
+def _card_id(markup: str) -> str | None:
+    """Item ID from a search card's markup (its first /itm/ link), without parsing it."""
+    m = _CARD_ID_RE.search(markup)
+    return m.group(1) if m else None
 
-def __ParseItems(soup, query, productType):
+
+class RunDedup:
+    """Item IDs already kept in one scrape run, shared across queries and categories.
+
+    The query lists overlap heavily ("16gb ddr4 ram" and "32gb ddr4 ram", i5
+    listings in i7 results), so without this the same listing is parsed and
+    upserted once per query that returns it.  A page's items are claimed by
+    ID only once they have survived parsing and the outlier filter, so the
+    first query to keep a listing uploads it; a card skipped or dropped as an
+    outlier by one query is still kept by the query it belongs to.  Later
+    pages skip already-claimed cards before parsing them.  `cards` and
+    `duplicates` let callers work out each query's overlap ratio.
+    """
+
+    def __init__(self):
+        self.ids: set[str] = set()
+        self.cards = 0
+        self.duplicates = 0
+
+    def seen(self, item_id: str | None) -> bool:
+        """True if a card can be skipped unparsed: an earlier page already kept its listing."""
+        self.cards += 1
+        if item_id is not None and item_id in self.ids:
+            self._duplicate()
+            return True
+        return False   # unparseable URLs are left for __ParseCard to log and count
+
+    def claim(self, items: list) -> list:
+        """Claim the IDs of a page's kept items, returning those not already claimed this run."""
+        kept = []
+        for item in items:
+            item_id = str(item.id)
+            if item_id in self.ids:
+                self._duplicate()       # listed twice on the page, or claimed since a worker's snapshot
+                continue
+            self.ids.add(item_id)
+            kept.append(item)
+        return kept
+
+    def _duplicate(self) -> None:
+        self.duplicates += 1
+        scrape_metrics.incr('items_duplicate')
+
+    def mark(self) -> tuple[int, int]:
+        return self.cards, self.duplicates
+
+    def rollback(self, mark: tuple[int, int]) -> None:
+        """Forget the cards counted since `mark` (a discarded, to-be-refetched page)."""
+        self.cards, self.duplicates = mark
+
+    def adopt(self, items: list, cards: int, duplicates: int) -> list:
+        """Fold in the counts of a page parsed elsewhere, returning the items to filter and claim.
+
+        A parse worker skips cards against a snapshot of `ids` taken when its
+        page was submitted.  Items whose IDs another page claimed since then
+        count as duplicates here and are dropped, as if skipped unparsed.
+        """
+        self.cards += cards
+        self.duplicates += duplicates
+        fresh = []
+        for item in items:
+            if str(item.id) in self.ids:
+                self._duplicate()
+            else:
+                fresh.append(item)
+        return fresh
+
+
+# Recorded while parsing a page (see __StreamItems, __ParseCard, RunDedup,
+# TitleCache) — discarded with the items when a streamed page is refetched.
+_PARSE_METRICS = ('parse', 'items_parsed', 'items_skipped', 'items_duplicate', 'title_cache')
+
+
+def __FetchItems(query, country, condition, listing_type, productType, alreadySold=True, cache=False,
+                 dedup=None):
+    """Fetch one search results page and return its parsed, outlier-filtered items.
+
+    Cached runs read the saved page through __GetHTML.  Live runs stream the
+    direct fetch straight into the card parser (see __StreamItems); if the
+    stream fails or turns out to be a block page, anything parsed from it is
+    discarded and the page is refetched via Zyte and parsed from the body.
+
+    With a RunDedup, cards whose listing an earlier page already kept are
+    skipped before parsing, and the items returned are claimed for this one.
+    """
+    if cache:
+        soup = __GetHTML(query, country, condition, listing_type, alreadySold=alreadySold, cache=True)
+        items = __ParseItems(soup, query, productType, dedup=dedup)
+        return dedup.claim(items) if dedup else items
+
+    url = __SearchURL(query, country, condition, listing_type, alreadySold)
+    log.debug("Fetching: %s", url)
+    mark = dedup.mark() if dedup else None
+    try:
+        # Parse metrics count only if the streamed items are kept; the failed
+        # fetch's own time, bytes and block page are recorded either way.
+        with scrape_metrics.deferred(*_PARSE_METRICS) as attempt:
+            items = list(__StreamItems(_stream_direct(url), query, productType, dedup=dedup))
+        scrape_metrics.merge(attempt.stages, attempt.counters)
+    except RuntimeError as e:
+        log.warning("%s", e)
+        if dedup:
+            dedup.rollback(mark)   # the refetch counts the page's cards afresh
+        body = _fetch_zyte(url)
+        if body is None:
+            raise RuntimeError(f"All fetch methods failed for: {url}")
+        items = list(__StreamItems([_page_text(body)], query, productType, dedup=dedup))
+    items = __DropPriceOutliers(items)
+    return dedup.claim(items) if dedup else items
+
+# ── Title classification ──────────────────────────────────────────────────────
+# Keyword tables and patterns used by __ParseCard, compiled once at import.
+# Each category's brand / system / keyword checks run as a single
+# KeywordMatcher scan over the title; list order is match priority.
+
+GPU_BRANDS = [
+    "ASUS", "MSI", "GIGABYTE", "ZOTAC", "PALIT",
+    "EVGA", "PNY", "SAPPHIRE", "XFX", "INNO3D",
+    "GAINWARD", "AORUS"
+]
+
+# Complete-system listings (mini PCs etc.) that mention a CPU or RAM
+SYSTEM_KEYWORDS = [
+    'mini pc', 'mini-pc', ' nuc', 'barebones',
+    'desktop pc', 'all-in-one', 'laptop', 'notebook',
+    'gaming pc', 'gaming computer', 'custom pc',
+    'full pc', 'complete pc', 'pc bundle', 'pc build',
+]
+
+CPU_CORE_NAMES = {'dual': 2, 'triple': 3, 'quad': 4, 'hexa': 6, 'octa': 8, 'deca': 10, 'dodeca': 12}
+
+HDD_BRANDS = ['SEAGATE', 'TOSHIBA', 'SAMSUNG', 'HITACHI', 'HGST', 'FUJITSU', 'MAXTOR']
+
+RAM_BRAND_MAP = {
+    'CORSAIR': 'Corsair', 'G.SKILL': 'G.Skill', 'GSKILL': 'G.Skill',
+    'KINGSTON': 'Kingston', 'SAMSUNG': 'Samsung', 'CRUCIAL': 'Crucial',
+    'HYPERX': 'HyperX', 'PATRIOT': 'Patriot', 'TEAMGROUP': 'TeamGroup',
+    'TEAM GROUP': 'TeamGroup', 'ADATA': 'ADATA', 'PNY': 'PNY',
+    'SK HYNIX': 'Hynix', 'HYNIX': 'Hynix', 'MICRON': 'Micron',
+    'LEXAR': 'Lexar', 'BALLISTIX': 'Ballistix',
+}
+
+_GPU_KEYWORDS = KeywordMatcher({
+    'brand': {b: b.title() for b in GPU_BRANDS},
+    'amd':   ['RX', 'RADEON', 'XT', 'XTX'],
+})
+_CPU_KEYWORDS = KeywordMatcher({
+    'system': SYSTEM_KEYWORDS,
+    'brand':  {'AMD': 'AMD', 'INTEL': 'Intel'},
+    'cores':  CPU_CORE_NAMES,
+})
+# Scanned over ' ' + title, so ' WD ' also catches a title starting "WD ".
+_HDD_KEYWORDS = KeywordMatcher({
+    'brand': {'WESTERN DIGITAL': 'Western Digital', ' WD ': 'Western Digital',
+              **{b: b.title() for b in HDD_BRANDS}},
+    'sas':   ['SAS'],
+})
+_RAM_KEYWORDS = KeywordMatcher({
+    'system': SYSTEM_KEYWORDS,
+    'brand':  RAM_BRAND_MAP,
+})
+
+# Flexible GPU model pattern
+_GPU_MODEL_RE = re.compile(
+    r'(?P<series>RTX|GTX|TITAN|RX)\s*'      # series
+    r'(?P<number>\d{2,4})\s*'               # number
+    r'(?P<variant>Ti|SUPER|Ti\s*SUPER|XT|XTX)?',  # optional variant
+    re.IGNORECASE
+)
+_VRAM_RE = re.compile(r'(\d{1,2})\s*GB', re.IGNORECASE)
+
+# A title listing both RAM and storage is a whole system, not a CPU
+_SYSTEM_RAM_RE     = re.compile(r'\d+\s*gb\s*(ddr\d?|ram)')
+_SYSTEM_STORAGE_RE = re.compile(r'\d+\s*(tb|gb)\s*(ssd|nvme|hdd|m\.2)')
+
+# AMD: "Ryzen 5 3400G", "Ryzen 9 7940HS", "Ryzen R9 7940HS" (R-prefix variant)
+_AMD_MODEL_RE = re.compile(
+    r'Ryzen\s*(?:Threadripper\s*(?:PRO\s*)?)?R?(\d+)\s+(\d+[A-Z0-9]*)',
+    re.IGNORECASE
+)
+# Intel: handles all of:
+#   "Core i5-6600K"  "i5 9400F"  "I5-6600K"  "i5 CPU 6500"  "i5 650"
+_INTEL_MODEL_RE = re.compile(
+    r'[iI]([3579])[\s\-](?:CPU\s+)?(\d{3,5}[A-Z0-9]*)',
+    re.IGNORECASE
+)
+_SOCKET_RE    = re.compile(r'(LGA\s*\d{3,4}|AM\s*[2345]|FM[12]|TR[X]?\d+)', re.IGNORECASE)
+_CORES_NUM_RE = re.compile(r'(\d+)\s*[Cc]ore')
+
+_HDD_CAPACITY_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(TB|GB)', re.IGNORECASE)
+_FORM_FACTOR_RE  = re.compile(r'(3\.5|2\.5)\s*["\']?')
+_RPM_NUM_RE      = re.compile(r'(\d{4,5})\s*rpm', re.IGNORECASE)
+_RPM_K_RE        = re.compile(r'(\d+(?:\.\d+)?)\s*[Kk](?:\s*rpm|\b)', re.IGNORECASE)
+
+_RAM_TYPE_RE     = re.compile(r'\b(DDR[345])\b', re.IGNORECASE)
+_RAM_KIT_RE      = re.compile(r'(\d+)\s*[xX×]\s*(\d+)\s*GB')
+_RAM_GB_RE       = re.compile(r'(\d+)\s*GB')
+_RAM_SPEED_RE    = re.compile(r'(\d{3,5})\s*[Mm][Hh][Zz]')
+
+
+# What _classify_title returns after the skip reason, in order.
+_TITLE_FIELDS = ('brand', 'model', 'vram', 'socket', 'cores', 'capacity_gb',
+                 'interface', 'form_factor', 'rpm', 'ram_type', 'speed')
+
+
+def _skipped(reason: str) -> tuple:
+    return (reason,) + (None,) * len(_TITLE_FIELDS)
+
+
+def _classify_title(category: str, title: str) -> tuple:
+    """Category-specific attributes extracted from a listing title.
+
+    Returns (skip_reason, *_TITLE_FIELDS).  skip_reason is None for a listing
+    to keep, else why it's dropped ('system', 'ram_type', 'ram_capacity').
+    Depends on nothing but its arguments, so results are cached per title.
+    """
+    socket = cores = capacity_gb = interface = form_factor = rpm = ram_type = speed = None
+
+    if category == 'GPU':
+
+        keywords = _GPU_KEYWORDS.scan(title)
+
+        def extract_model(title: str):
+            match = _GPU_MODEL_RE.search(title)
+            if match:
+                series = match.group('series').upper()
+                number = match.group('number')
+                variant = match.group('variant').upper().replace("  ", " ") if match.group('variant') else ""
+                return f"{series} {number} {variant}".strip()
+            return None
+
+        def extract_vram(title: str):
+            match = _VRAM_RE.search(title)
+            if match:
+                return int(match.group(1))
+            return None
+
+        def extract_brand(title: str):
+            if 'brand' in keywords:
+                return keywords['brand']
+            # AMD detection
+            if 'amd' in keywords:
+                return "AMD"
+            return "NVIDIA"
+
+        model = extract_model(title)
+        vram  = extract_vram(title)
+        brand = extract_brand(title)
+    elif category == 'CPU':
+
+        keywords = _CPU_KEYWORDS.scan(title)
+
+        # Drop complete-system listings (mini PCs etc.) that mention a CPU
+        _tl = title.lower()
+        _is_system = (
+            'system' in keywords
+            or (bool(_SYSTEM_RAM_RE.search(_tl)) and bool(_SYSTEM_STORAGE_RE.search(_tl)))
+        )
+        if _is_system:
+            return _skipped('system')
+
+        def extract_cpu_brand(title: str):
+            return keywords.get('brand', '')
+
+        def extract_cpu_model(title: str):
+            # AMD — normalise to "Ryzen 9 7940HS"
+            m = _AMD_MODEL_RE.search(title)
+            if m:
+                return f"Ryzen {m.group(1)} {m.group(2).upper()}"
+            # Intel — normalise to "i5-6600K"
+            m = _INTEL_MODEL_RE.search(title)
+            if m:
+                return f"i{m.group(1)}-{m.group(2).upper()}"
+            return None
+
+        def extract_socket(title: str):
+            m = _SOCKET_RE.search(title)
+            if m:
+                return re.sub(r'\s+', '', m.group(0)).upper()
+            return None
+
+        def extract_cores(title: str):
+            m = _CORES_NUM_RE.search(title)
+            if m:
+                return int(m.group(1))
+            return keywords.get('cores')
+
+        brand  = extract_cpu_brand(title)
+        model  = extract_cpu_model(title)
+        vram   = None
+        socket = extract_socket(title)
+        cores  = extract_cores(title)
+
+    elif category == 'HDD':
+
+        keywords = _HDD_KEYWORDS.scan(' ' + title)
+
+        def extract_hdd_brand(title: str):
+            return keywords.get('brand', '')
+
+        def extract_capacity_gb(title: str):
+            m = _HDD_CAPACITY_RE.search(title)
+            if m:
+                val, unit = float(m.group(1)), m.group(2).upper()
+                return int(val * 1000) if unit == 'TB' else int(val)
+            return None
+
+        def extract_interface(title: str):
+            return 'SAS' if 'sas' in keywords else 'SATA'
+
+        def extract_form_factor(title: str):
+            m = _FORM_FACTOR_RE.search(title)
+            return f'{m.group(1)}"' if m else '3.5"'
+
+        def extract_rpm(title: str):
+            m = _RPM_NUM_RE.search(title)
+            if m:
+                return int(m.group(1))
+            m = _RPM_K_RE.search(title)
+            if m:
+                return int(float(m.group(1)) * 1000)
+            return None
+
+        brand       = extract_hdd_brand(title)
+        model       = None
+        vram        = None
+        socket      = None
+        cores       = None
+        capacity_gb = extract_capacity_gb(title)
+        interface   = extract_interface(title)
+        form_factor = extract_form_factor(title)
+        rpm         = extract_rpm(title)
+
+    elif category == 'RAM':
+
+        keywords = _RAM_KEYWORDS.scan(title)
+        if 'system' in keywords:
+            return _skipped('system')
+
+        # Type — DDR3 / DDR4 / DDR5 (mandatory; skip if absent)
+        type_m = _RAM_TYPE_RE.search(title)
+        if not type_m:
+            return _skipped('ram_type')
+        ram_type = type_m.group(1).upper()
+
+        # Capacity — total kit GB
+        title_up = title.upper()
+        kit_m = _RAM_KIT_RE.search(title_up)
+        if kit_m:
+            capacity_gb = int(kit_m.group(1)) * int(kit_m.group(2))
+        else:
+            all_gb = [int(m) for m in _RAM_GB_RE.findall(title_up)]
+            capacity_gb = max(all_gb) if all_gb else None
+
+        if capacity_gb is None or capacity_gb < 2 or capacity_gb > 256:
+            return _skipped('ram_capacity')
+
+        # Speed — optional MHz
+        spd_m = _RAM_SPEED_RE.search(title)
+        speed = int(spd_m.group(1)) if spd_m else None
+
+        brand = keywords.get('brand')
+        model = None
+        vram  = None
+
+    else:
+        brand = ''
+        model = ''
+        vram  = None
+
+    return (None, brand, model, vram, socket, cores, capacity_gb, interface, form_factor, rpm, ram_type, speed)
+
+
+_title_cache: TitleCache | None = None
+
+
+def _get_title_cache() -> TitleCache:
+    """This process's title-classification cache, built on first use.
+
+    Built lazily so TITLE_CACHE_SIZE from credentials.env (loaded after the
+    imports) is honoured.
+    """
+    global _title_cache
+    if _title_cache is None:
+        _title_cache = TitleCache()
+    return _title_cache
+
+
+def __ParseCard(item, query, productType):
+    """Parse one su-card-container into a Product.
+
+    Returns None when the card should be skipped (unparseable title, price or
+    ID, or a listing filtered out by the category rules).
+    """
+    # Get item data — skip item entirely if critical fields can't be parsed
+    try:
+        spans = item.find(class_="s-card__title").find_all('span')
+        if spans[0].get_text(strip=True) == "New listing":
+            title = spans[1].get_text(strip=True)
+        else:
+            title = spans[0].get_text(strip=True)
+    except (AttributeError, IndexError) as e:
+        log.warning("[%s] Skipping item - could not parse title: %s", query, e)
+        scrape_metrics.incr('items_skipped', detail='title')
+        return None
+
+    try:
+        price = __ParseRawPrice(item.find('span', {'class': 's-card__price'}).get_text(strip=True))
+        if price is None:
+            raise ValueError("Price pattern not found in text")
+    except (AttributeError, TypeError, ValueError) as e:
+        log.warning("[%s] Skipping item '%s...' - could not parse price: %s", query, title[:40], e)
+        scrape_metrics.incr('items_skipped', detail='price')
+        return None
+
+    try:
+        shipping = __ParseRawPrice(item.find('span', {'class': 'su-styled-text secondary large'}).find('span').get_text(strip=True))
+    except (AttributeError, TypeError):
+        shipping = 0
+
+    try:
+        timeLeft = item.find(class_="s-card__time-left").get_text(strip=True)
+    except AttributeError:
+        timeLeft = ""
+
+    try:
+        timeEnd = item.find(class_="s-card__time-end").get_text(strip=True)
+        timeEnd = parse_ebay_endtime(timeEnd)
+    except (AttributeError, TypeError):
+        timeEnd = None
+
+    try:
+        soldDate = item.find(class_="su-styled-text positive default").get_text(strip=True)
+        soldDate = soldDate.lstrip('Sold ')
+        soldDate = parse_soldDate(soldDate)
+    except AttributeError:
+        soldDate = None
+
+    try:
+        bidcount = item.find(class_="su-styled-text secondary large", string=re.compile("bid")).get_text(strip=True)
+        bidCount = int("".join(filter(str.isdigit, bidcount)))
+    except (AttributeError, TypeError, ValueError):
+        bidCount = 0
+
+    try:
+        reviewCount = int("".join(filter(str.isdigit, item.find(class_="s-item__reviews-count").find('span').get_text(strip=True))))
+    except (AttributeError, TypeError, ValueError):
+        reviewCount = 0
+
+    try:
+        a_tag = item.find('a')
+        if a_tag is None:
+            raise ValueError("No anchor tag found")
+        url = a_tag['href']
+        id_match = re.search(r'/itm/(\d+)', url)
+        if id_match is None:
+            raise ValueError(f"Could not extract item ID from URL: {url}")
+        id = id_match.group(1)
+    except (TypeError, KeyError, ValueError) as e:
+        log.warning("[%s] Skipping item '%s...' - could not parse URL/ID: %s", query, title[:40], e)
+        scrape_metrics.incr('items_skipped', detail='url')
+        return None
+
+    skip, *attrs = _get_title_cache().get(productType, title, _classify_title)
+    if skip is not None:
+        if skip == 'system':
+            log.debug("[%s] Skipping system listing: %s", query, title[:60])
+        scrape_metrics.incr('items_skipped', detail=skip)
+        return None
+    attrs = dict(zip(_TITLE_FIELDS, attrs))
+
+    log.debug("Parsed: brand=%s model=%s vram=%s", attrs['brand'], attrs['model'], attrs['vram'])
+
+    return Product(
+        id=int(id), title=title, price=price, shipping=shipping,
+        time_left=timeLeft, time_end=timeEnd, sold_date=soldDate,
+        bid_count=bidCount, reviews_count=reviewCount, url=url, **attrs,
+    )
+
+
+def __ParseItems(soup, query, productType, drop_outliers=True, dedup=None):
     rawItems = soup.find_all('div', {'class': 'su-card-container su-card-container--horizontal'})
     if not rawItems:
         log.warning("No items found for query '%s' - eBay may have changed their HTML structure", query)
-    data = []
-    for item in rawItems[1:]:
-        
-        # Get item data — skip item entirely if critical fields can't be parsed
-        try:
-            spans = item.find(class_="s-card__title").find_all('span')
-            if spans[0].get_text(strip=True) == "New listing":
-                title = spans[1].get_text(strip=True)
-            else:
-                title = spans[0].get_text(strip=True)
-        except (AttributeError, IndexError) as e:
-            log.warning("[%s] Skipping item - could not parse title: %s", query, e)
-            continue
+    with scrape_metrics.timer('parse'):
+        cards = rawItems[1:]
+        if dedup is not None:
+            cards = [item for item in cards if not dedup.seen(_card_id(str(item.find('a', href=True) or '')))]
+        data = [__ParseCard(item, query, productType) for item in cards]
+    data = [item for item in data if item is not None]
+    scrape_metrics.incr('items_parsed', len(data))
+    return __DropPriceOutliers(data) if drop_outliers else data
 
-        try:
-            price = __ParseRawPrice(item.find('span', {'class': 's-card__price'}).get_text(strip=True))
-            if price is None:
-                raise ValueError("Price pattern not found in text")
-        except (AttributeError, TypeError, ValueError) as e:
-            log.warning("[%s] Skipping item '%s...' - could not parse price: %s", query, title[:40], e)
-            continue
 
-        try:
-            shipping = __ParseRawPrice(item.find('span', {'class': 'su-styled-text secondary large'}).find('span').get_text(strip=True))
-        except (AttributeError, TypeError):
-            shipping = 0
+def __DropPriceOutliers(data):
+    # Remove item with prices too high or too low (also drop any items with unparsed prices)
+    data = [item for item in data if item.price is not None]
+    if not data:
+        return data
+    low, high = price_stats.bounds([item.price for item in data], PRICE_OUTLIER_METHOD)
+    kept = [item for item in data if high >= item.price >= low]
+    scrape_metrics.incr('items_skipped', len(data) - len(kept), detail='outlier')
+    return kept
 
-        try:
-            timeLeft = item.find(class_="s-card__time-left").get_text(strip=True)
-        except AttributeError:
-            timeLeft = ""
 
-        try:
-            timeEnd = item.find(class_="s-card__time-end").get_text(strip=True)
-            timeEnd = parse_ebay_endtime(timeEnd)
-        except (AttributeError, TypeError):
-            timeEnd = None
 
-        try:
-            soldDate = item.find(class_="su-styled-text positive default").get_text(strip=True)
-            soldDate = soldDate.lstrip('Sold ')
-            soldDate = parse_soldDate(soldDate)
-        except AttributeError:
-            soldDate = None
+class _CardSplitter:
+    """Incremental splitter for eBay search result pages.
 
-        try:
-            bidcount = item.find(class_="su-styled-text secondary large", string=re.compile("bid")).get_text(strip=True)
-            bidCount = int("".join(filter(str.isdigit, bidcount)))
-        except (AttributeError, TypeError, ValueError):
-            bidCount = 0
+    Fed arbitrary chunks of HTML, it cuts out the markup of each
+    su-card-container as soon as the card's closing </div> arrives, so cards
+    can be parsed while the rest of the page is still downloading.  Cards are
+    found by their opening tag and ended by counting <div> / </div> tags, so
+    the rest of the page is never tokenised; only the card currently being
+    read (or a marker's length of text between cards) is buffered.
+    """
 
-        try:
-            reviewCount = int("".join(filter(str.isdigit, item.find(class_="s-item__reviews-count").find('span').get_text(strip=True))))
-        except (AttributeError, TypeError, ValueError):
-            reviewCount = 0
-        
-        try:
-            a_tag = item.find('a')
-            if a_tag is None:
-                raise ValueError("No anchor tag found")
-            url = a_tag['href']
-            id_match = re.search(r'/itm/(\d+)', url)
-            if id_match is None:
-                raise ValueError(f"Could not extract item ID from URL: {url}")
-            id = id_match.group(1)
-        except (TypeError, KeyError, ValueError) as e:
-            log.warning("[%s] Skipping item '%s...' - could not parse URL/ID: %s", query, title[:40], e)
-            continue
+    CARD_START = '<div class="su-card-container su-card-container--horizontal"'
+    _DIV_TAG_RE = re.compile(r'<(/?)div[\s/>]', re.IGNORECASE)
+
+    def __init__(self):
+        self.card_count = 0
+        self._cards = []      # completed card fragments not yet collected
+        self._buf = ''        # unscanned text: an open card, or a possible split marker
+
+    def feed(self, text: str) -> None:
+        buf = self._buf + text
+        pos = 0
+        while True:
+            start = buf.find(self.CARD_START, pos)
+            if start < 0:
+                # Keep just enough to find a card start split across chunks.
+                pos = max(pos, len(buf) - len(self.CARD_START) + 1)
+                break
+            end = self._card_end(buf, start)
+            if end is None:
+                pos = start     # card still open — wait for more text
+                break
+            self._cards.append(buf[start:end])
+            self.card_count += 1
+            pos = end
+        self._buf = buf[pos:]
+
+    def _card_end(self, buf: str, start: int) -> int | None:
+        """Index just past the </div> closing the card opened at `start`, if it has arrived."""
+        depth = 0
+        for m in self._DIV_TAG_RE.finditer(buf, start):
+            depth += -1 if m.group(1) else 1
+            if depth == 0:
+                close = buf.find('>', m.end() - 1)
+                return close + 1 if close >= 0 else None
+        return None
 
-        socket = cores = capacity_gb = interface = form_factor = rpm = ram_type = speed = None
+    def close(self) -> None:
+        """End of page: a card left unclosed is dropped."""
+        self._buf = ''
 
-        if productType == 'GPU':
+    def pop_cards(self) -> list[str]:
+        """Return and clear the card fragments completed since the last call."""
+        cards, self._cards = self._cards, []
+        return cards
 
-            BRANDS = [
-                "ASUS", "MSI", "GIGABYTE", "ZOTAC", "PALIT",
-                "EVGA", "PNY", "SAPPHIRE", "XFX", "INNO3D",
-                "GAINWARD", "AORUS"
-            ]
 
-            # Flexible GPU model pattern
-            model_pattern = re.compile(
-                r'(?P<series>RTX|GTX|TITAN|RX)\s*'      # series
-                r'(?P<number>\d{2,4})\s*'               # number
-                r'(?P<variant>Ti|SUPER|Ti\s*SUPER|XT|XTX)?',  # optional variant
-                re.IGNORECASE
-            )
+def __StreamItems(chunks, query, productType, dedup=None):
+    """Yield parsed Products card-by-card from an iterable of HTML text chunks.
 
-            # VRAM pattern
-            vram_pattern = re.compile(r'(\d{1,2})\s*GB', re.IGNORECASE)
-
-            def extract_model(title: str):
-                match = model_pattern.search(title)
-                if match:
-                    series = match.group('series').upper()
-                    number = match.group('number')
-                    variant = match.group('variant').upper().replace("  ", " ") if match.group('variant') else ""
-                    return f"{series} {number} {variant}".strip()
-                return None
-
-            def extract_vram(title: str):
-                match = vram_pattern.search(title)
-                if match:
-                    return int(match.group(1))
-                return None
-
-            def extract_brand(title: str):
-                title_upper = title.upper()
-                for brand in BRANDS:
-                    if brand in title_upper:
-                        return brand.title()
-                # AMD detection
-                if "RX" in title_upper or "RADEON" in title_upper or "XT" in title_upper or "XTX" in title_upper:
-                    return "AMD"
-                return "NVIDIA"
-
-            model = extract_model(title)
-            vram  = extract_vram(title)
-            brand = extract_brand(title)
-        elif productType == 'CPU':
-
-            # Drop complete-system listings (mini PCs etc.) that mention a CPU
-            _tl = title.lower()
-            _is_system = (
-                any(k in _tl for k in ['mini pc', 'mini-pc', ' nuc', 'barebones',
-                                        'desktop pc', 'all-in-one', 'laptop', 'notebook',
-                                        'gaming pc', 'gaming computer', 'custom pc',
-                                        'full pc', 'complete pc', 'pc bundle', 'pc build'])
-                or (bool(re.search(r'\d+\s*gb\s*(ddr\d?|ram)', _tl))
-                    and bool(re.search(r'\d+\s*(tb|gb)\s*(ssd|nvme|hdd|m\.2)', _tl)))
-            )
-            if _is_system:
-                log.debug("[%s] Skipping system listing: %s", query, title[:60])
+    Streaming counterpart of __ParseItems: the cards completed by each chunk
+    are parsed as soon as it arrives, so the first items are available before
+    the page has finished downloading and the whole page is never built into
+    one tree.  The price-outlier filter needs every price, so callers apply
+    __DropPriceOutliers to the collected items.
+
+    With a RunDedup, a card whose listing was already claimed this run is
+    dropped straight from its markup, before any soup is built for it.  The
+    items are not claimed here: that waits until the caller has dropped the
+    page's outliers.
+    """
+    splitter = _CardSplitter()
+    # Parse time excludes waiting on `chunks`, which is the fetcher's own stage.
+    parse_seconds = 0.0
+    parsed = 0
+
+    def batches():
+        nonlocal parse_seconds
+        for chunk in chunks:
+            start = time.perf_counter()
+            splitter.feed(chunk)
+            parse_seconds += time.perf_counter() - start
+            yield splitter.pop_cards()
+        splitter.close()
+
+    try:
+        first = True
+        for fragments in batches():
+            if first and fragments:
+                fragments, first = fragments[1:], False  # mirrors rawItems[1:] in __ParseItems
+            if dedup is not None:
+                fragments = [f for f in fragments if not dedup.seen(_card_id(f))]
+            if not fragments:
                 continue
+            # One soup per chunk's worth of cards: building a BeautifulSoup
+            # per card costs more than the extraction itself.
+            start = time.perf_counter()
+            soup = BeautifulSoup(''.join(fragments), 'html.parser')
+            items = [__ParseCard(card, query, productType)
+                     for card in soup.find_all('div', {'class': 'su-card-container su-card-container--horizontal'})]
+            parse_seconds += time.perf_counter() - start
+            for item in items:
+                if item is not None:
+                    parsed += 1
+                    yield item
+    finally:
+        scrape_metrics.observe('parse', parse_seconds)
+        scrape_metrics.incr('items_parsed', parsed)
 
-            def extract_cpu_brand(title: str):
-                t = title.upper()
-                if 'AMD' in t:
-                    return 'AMD'
-                if 'INTEL' in t:
-                    return 'Intel'
-                return ''
-
-            # AMD: "Ryzen 5 3400G", "Ryzen 9 7940HS", "Ryzen R9 7940HS" (R-prefix variant)
-            amd_model_pattern = re.compile(
-                r'Ryzen\s*(?:Threadripper\s*(?:PRO\s*)?)?R?(\d+)\s+(\d+[A-Z0-9]*)',
-                re.IGNORECASE
-            )
+    if splitter.card_count == 0:
+        log.warning("No items found for query '%s' - eBay may have changed their HTML structure", query)
 
-            # Intel: handles all of:
-            #   "Core i5-6600K"  "i5 9400F"  "I5-6600K"  "i5 CPU 6500"  "i5 650"
-            intel_model_pattern = re.compile(
-                r'[iI]([3579])[\s\-](?:CPU\s+)?(\d{3,5}[A-Z0-9]*)',
-                re.IGNORECASE
-            )
+# ── Parse pool ────────────────────────────────────────────────────────────────
+# BeautifulSoup parsing is CPU-bound and holds the GIL, so with PARSE_WORKERS
+# set, pages are parsed in worker processes.  A worker gets the raw page bytes
+# and returns compact rows plus everything it recorded: metrics and dedup
+# counts, which the scraper process folds back into its own.  Each worker
+# keeps its own title cache.
 
-            def extract_cpu_model(title: str):
-                # AMD — normalise to "Ryzen 9 7940HS"
-                m = amd_model_pattern.search(title)
-                if m:
-                    return f"Ryzen {m.group(1)} {m.group(2).upper()}"
-                # Intel — normalise to "i5-6600K"
-                m = intel_model_pattern.search(title)
-                if m:
-                    return f"i{m.group(1)}-{m.group(2).upper()}"
-                return None
-
-            socket_pattern = re.compile(r'(LGA\s*\d{3,4}|AM\s*[2345]|FM[12]|TR[X]?\d+)', re.IGNORECASE)
-
-            def extract_socket(title: str):
-                m = socket_pattern.search(title)
-                if m:
-                    return re.sub(r'\s+', '', m.group(0)).upper()
-                return None
-
-            cores_num_pattern = re.compile(r'(\d+)\s*[Cc]ore')
-            cores_named_map   = {'dual':2,'triple':3,'quad':4,'hexa':6,'octa':8,'deca':10,'dodeca':12}
-
-            def extract_cores(title: str):
-                m = cores_num_pattern.search(title)
-                if m:
-                    return int(m.group(1))
-                t = title.lower()
-                for name, count in cores_named_map.items():
-                    if name in t:
-                        return count
-                return None
-
-            brand  = extract_cpu_brand(title)
-            model  = extract_cpu_model(title)
-            vram   = None
-            socket = extract_socket(title)
-            cores  = extract_cores(title)
-
-        elif productType == 'HDD':
-
-            HDD_BRANDS = ['SEAGATE','TOSHIBA','SAMSUNG','HITACHI','HGST','FUJITSU','MAXTOR']
-
-            def extract_hdd_brand(title: str):
-                t = title.upper()
-                if 'WESTERN DIGITAL' in t or t.startswith('WD ') or ' WD ' in t:
-                    return 'Western Digital'
-                for b in HDD_BRANDS:
-                    if b in t:
-                        return b.title()
-                return ''
-
-            cap_pattern = re.compile(r'(\d+(?:\.\d+)?)\s*(TB|GB)', re.IGNORECASE)
-
-            def extract_capacity_gb(title: str):
-                m = cap_pattern.search(title)
-                if m:
-                    val, unit = float(m.group(1)), m.group(2).upper()
-                    return int(val * 1000) if unit == 'TB' else int(val)
-                return None
-
-            def extract_interface(title: str):
-                return 'SAS' if 'SAS' in title.upper() else 'SATA'
-
-            ff_pattern = re.compile(r'(3\.5|2\.5)\s*["\']?')
-
-            def extract_form_factor(title: str):
-                m = ff_pattern.search(title)
-                return f'{m.group(1)}"' if m else '3.5"'
-
-            rpm_num_pattern = re.compile(r'(\d{4,5})\s*rpm', re.IGNORECASE)
-            rpm_k_pattern   = re.compile(r'(\d+(?:\.\d+)?)\s*[Kk](?:\s*rpm|\b)', re.IGNORECASE)
-
-            def extract_rpm(title: str):
-                m = rpm_num_pattern.search(title)
-                if m:
-                    return int(m.group(1))
-                m = rpm_k_pattern.search(title)
-                if m:
-                    return int(float(m.group(1)) * 1000)
-                return None
-
-            brand       = extract_hdd_brand(title)
-            model       = None
-            vram        = None
-            socket      = None
-            cores       = None
-            capacity_gb = extract_capacity_gb(title)
-            interface   = extract_interface(title)
-            form_factor = extract_form_factor(title)
-            rpm         = extract_rpm(title)
-
-        elif productType == 'RAM':
-
-            _tl = title.lower()
-            _is_system_ram = any(k in _tl for k in [
-                'mini pc', 'mini-pc', ' nuc', 'barebones',
-                'desktop pc', 'all-in-one', 'laptop', 'notebook',
-                'gaming pc', 'gaming computer', 'custom pc',
-                'full pc', 'complete pc', 'pc bundle', 'pc build',
-            ])
-            if _is_system_ram:
-                log.debug("[%s] Skipping system listing: %s", query, title[:60])
-                continue
+_parse_pool = None
 
-            # Type — DDR3 / DDR4 / DDR5 (mandatory; skip if absent)
-            type_m = re.search(r'\b(DDR[345])\b', title, re.IGNORECASE)
-            if not type_m:
-                continue
-            ram_type = type_m.group(1).upper()
 
-            # Capacity — total kit GB
-            title_up = title.upper()
-            kit_m = re.search(r'(\d+)\s*[xX×]\s*(\d+)\s*GB', title_up)
-            if kit_m:
-                capacity_gb = int(kit_m.group(1)) * int(kit_m.group(2))
-            else:
-                all_gb = [int(m) for m in re.findall(r'(\d+)\s*GB', title_up)]
-                capacity_gb = max(all_gb) if all_gb else None
+@dataclass
+class _ParsedPage:
+    rows: list              # tuple(getattr(p, f) for f in _PRODUCT_FIELDS) per item
+    cards: int
+    duplicates: int
+    stages: dict            # the worker's scrape_metrics run
+    counters: dict
 
-            if capacity_gb is None or capacity_gb < 2 or capacity_gb > 256:
-                continue
 
-            # Speed — optional MHz
-            spd_m = re.search(r'(\d{3,5})\s*[Mm][Hh][Zz]', title)
-            speed = int(spd_m.group(1)) if spd_m else None
-
-            # Brand
-            RAM_BRAND_MAP = {
-                'CORSAIR': 'Corsair', 'G.SKILL': 'G.Skill', 'GSKILL': 'G.Skill',
-                'KINGSTON': 'Kingston', 'SAMSUNG': 'Samsung', 'CRUCIAL': 'Crucial',
-                'HYPERX': 'HyperX', 'PATRIOT': 'Patriot', 'TEAMGROUP': 'TeamGroup',
-                'TEAM GROUP': 'TeamGroup', 'ADATA': 'ADATA', 'PNY': 'PNY',
-                'SK HYNIX': 'Hynix', 'HYNIX': 'Hynix', 'MICRON': 'Micron',
-                'LEXAR': 'Lexar', 'BALLISTIX': 'Ballistix',
-            }
-            brand = next((v for k, v in RAM_BRAND_MAP.items() if k in title_up), None)
-            model = None
-            vram  = None
+def _parse_page(body: bytes, query: str, product_type: str, seen: frozenset) -> _ParsedPage:
+    """Parse one search page in a pool worker.
+
+    Cards whose ID is in `seen` (already claimed this run when the page was
+    submitted) are skipped unparsed, as __StreamItems does in-process.  Price
+    outliers are left for the caller to drop, and the items to claim, once it
+    has deduplicated (see _adopt_page).
+    """
+    run = scrape_metrics.start_run('parse')
+    dedup = RunDedup()
+    dedup.ids = set(seen)
+    with scrape_metrics.scope(category=product_type, query=query):
+        items = list(__StreamItems([_page_text(body)], query, product_type, dedup=dedup))
+    scrape_metrics.finish_run()
+    return _ParsedPage(
+        rows=[tuple(getattr(p, n) for n in _PRODUCT_FIELDS) for p in items],
+        cards=dedup.cards, duplicates=dedup.duplicates,
+        stages=run.stages, counters=run.counters,
+    )
+
+
+def _get_parse_pool() -> concurrent.futures.Executor:
+    global _parse_pool
+    if _parse_pool is None:
+        # spawn, not fork: the scraper process has fetch threads running.
+        _parse_pool = concurrent.futures.ProcessPoolExecutor(
+            PARSE_WORKERS, mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _parse_pool
+
+
+def _adopt_page(page: _ParsedPage, dedup: RunDedup) -> list:
+    """Products from a worker's page: metrics merged, deduplicated, outliers dropped, claimed."""
+    scrape_metrics.merge(page.stages, page.counters)
+    items = dedup.adopt([Product(*row) for row in page.rows], page.cards, page.duplicates)
+    return dedup.claim(__DropPriceOutliers(items))
 
-        else:
-            brand = ''
-            model = ''
-            vram  = None
-
-        log.debug("Parsed: brand=%s model=%s vram=%s", brand, model, vram)
-
-        itemData = {
-            'id': id,
-            'title': title,
-            'price': price,
-            'shipping': shipping,
-            'time-left': timeLeft,
-            'time-end': timeEnd,
-            'sold-date': soldDate,
-            'bid-count': bidCount,
-            'reviews-count': reviewCount,
-            'url': url,
-            'brand': brand,
-            'model': model,
-            'vram': vram,
-            'socket': socket,
-            'cores': cores,
-            'capacity-gb': capacity_gb,
-            'interface': interface,
-            'form-factor': form_factor,
-            'rpm': rpm,
-            'ram-type': ram_type,
-            'speed': speed,
-        }
-        
-        data.append(itemData)
-    
-    # Remove item with prices too high or too low (also drop any items with unparsed prices)
-    data = [item for item in data if item['price'] is not None]
-    priceList = [item['price'] for item in data]
-    parsedPriceList = __StDevParse(priceList)
-    data = [item for item in data if item['price'] in parsedPriceList]
-    
-    return data
 
 def __ParsePrices(soup):
     
@@ -604,8 +1263,8 @@ def __ParsePrices(soup):
     shippingList = [0 if price == None else price for price in shippingList]
 
     # Remove prices too high or too low
-    priceList = __StDevParse(priceList)
-    shippingList = __StDevParse(shippingList)
+    priceList = price_stats.filter_outliers(priceList, PRICE_OUTLIER_METHOD)
+    shippingList = price_stats.filter_outliers(shippingList, PRICE_OUTLIER_METHOD)
 
     data = {
         'price-list': priceList,
@@ -620,29 +1279,9 @@ def __ParseRawPrice(string):
     else:
         return None
 
-def __Average(numberList):
-
-    if len(list(numberList)) == 0: return 0
-    return sum(numberList) / len(list(numberList))
-
-def __StDev(numberList):
-    
-    if len(list(numberList)) <= 1: return 0
-    
-    nominator = sum(map(lambda x: (x - sum(numberList) / len(numberList)) ** 2, numberList))
-    stdev = (nominator / ( len(numberList) - 1)) ** 0.5
-
-    return stdev
-
 def __StDevParse(numberList):
-    
-    avg = __Average(numberList)
-    stdev = __StDev(numberList)
-    
     # Remove prices too high or too low; Accept Between -1 StDev to +1 StDev
-    numberList = [nmbr for nmbr in numberList if (avg + stdev >= nmbr >= avg - stdev)]
-
-    return numberList
+    return price_stats.filter_outliers(numberList, 'stdev', 1)
 
 def parse_ebay_endtime(endtime_str: str, reference_date: datetime = None):
 
@@ -710,11 +1349,13 @@ def parse_soldDate(date_str: str):
         # fallback for weird formats
         return None
 
-@dataclass
+@dataclass(slots=True)
 class Product:
+    """One parsed listing — produced by __ParseCard and consumed by the uploaders."""
     id: int
     title: str
     price: float
+    shipping: float
     time_left: Optional[str]
     time_end: Optional[datetime]
     sold_date: Optional[datetime]
@@ -736,6 +1377,34 @@ class Product:
     ram_type: Optional[str] = None
     speed: Optional[int] = None
 
+
+_PRODUCT_FIELDS = tuple(f.name for f in fields(Product))
+
+
+class ProductBatch:
+    """Column-oriented form of a list of Products for bulk upload.
+
+    Holds one list per Product field (plus price_pence), so each table's
+    executemany() parameters are a zip over just the columns it needs.
+    """
+
+    __slots__ = ('columns', '_len')
+
+    def __init__(self, products: list[Product]):
+        names = _PRODUCT_FIELDS
+        rows = [tuple(getattr(p, n) for n in names) for p in products]
+        self.columns = dict(zip(names, map(list, zip(*rows)))) if rows else {n: [] for n in names}
+        self.columns['price_pence'] = [p * 100 for p in self.columns['price']]
+        self._len = len(rows)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def rows(self, *names: str) -> list[tuple]:
+        """Row tuples over the named columns, in executemany() parameter order."""
+        return list(zip(*(self.columns[n] for n in names)))
+
+
 def _get_connection():
     return mariadb.connect(
         user=os.environ["DB_USER"],
@@ -745,102 +1414,181 @@ def _get_connection():
         database=os.environ["DB_NAME"]
     )
 
+_EBAY_UPSERT = ("""
+    INSERT INTO EBAY (ID, Title, Price, Bids, EndTime, SoldDate, URL)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        Title = VALUES(Title),
+        Price = VALUES(Price),
+        Bids = VALUES(Bids),
+        EndTime = VALUES(EndTime),
+        SoldDate = VALUES(SoldDate),
+        URL = VALUES(URL);
+    """, ('id', 'title', 'price_pence', 'bid_count', 'time_end', 'sold_date', 'url'))
+
+# Per-category detail table upserts: product_type → (SQL, Product columns).
+_CATEGORY_UPSERTS = {
+    'GPU': ("""
+        INSERT INTO GPU (ID, Brand, Model, VRAM)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            Brand = VALUES(Brand),
+            Model = VALUES(Model),
+            VRAM = VALUES(VRAM);
+        """, ('id', 'brand', 'model', 'vram')),
+    'CPU': ("""
+        INSERT INTO CPU (ID, Brand, Model, Socket, Cores)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            Brand = VALUES(Brand),
+            Model = VALUES(Model),
+            Socket = VALUES(Socket),
+            Cores = VALUES(Cores);
+        """, ('id', 'brand', 'model', 'socket', 'cores')),
+    'HDD': ("""
+        INSERT INTO HDD (ID, Brand, CapacityGB, Interface, FormFactor, RPM)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            Brand = VALUES(Brand),
+            CapacityGB = VALUES(CapacityGB),
+            Interface = VALUES(Interface),
+            FormFactor = VALUES(FormFactor),
+            RPM = VALUES(RPM);
+        """, ('id', 'brand', 'capacity_gb', 'interface', 'form_factor', 'rpm')),
+    'RAM': ("""
+        INSERT INTO RAM (ID, Brand, CapacityGB, Type, Speed)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            Brand      = VALUES(Brand),
+            CapacityGB = VALUES(CapacityGB),
+            Type       = VALUES(Type),
+            Speed      = VALUES(Speed);
+        """, ('id', 'brand', 'capacity_gb', 'ram_type', 'speed')),
+}
+
 def _upload(cur, p: Product, product_type: str) -> int:
     """Returns the EBAY rowcount: 1 = inserted, 2 = updated, 0 = no change."""
-    cur.execute("""
-        INSERT INTO EBAY (ID, Title, Price, Bids, EndTime, SoldDate, URL)
-        VALUES (%s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            Title = VALUES(Title),
-            Price = VALUES(Price),
-            Bids = VALUES(Bids),
-            EndTime = VALUES(EndTime),
-            SoldDate = VALUES(SoldDate),
-            URL = VALUES(URL);
-        """, (p.id, p.title, p.price * 100, p.bid_count, p.time_end, p.sold_date, p.url)
-    )
+    row = ProductBatch([p])
+    sql, cols = _EBAY_UPSERT
+    cur.execute(sql, row.rows(*cols)[0])
     ebay_rc = cur.rowcount
-    if product_type == 'GPU':
-        cur.execute("""
-            INSERT INTO GPU (ID, Brand, Model, VRAM)
-            VALUES (%s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                Brand = VALUES(Brand),
-                Model = VALUES(Model),
-                VRAM = VALUES(VRAM);
-            """, (p.id, p.brand, p.model, p.vram)
-        )
-    elif product_type == 'CPU':
-        cur.execute("""
-            INSERT INTO CPU (ID, Brand, Model, Socket, Cores)
-            VALUES (%s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                Brand = VALUES(Brand),
-                Model = VALUES(Model),
-                Socket = VALUES(Socket),
-                Cores = VALUES(Cores);
-            """, (p.id, p.brand, p.model, p.socket, p.cores)
-        )
-    elif product_type == 'HDD':
-        cur.execute("""
-            INSERT INTO HDD (ID, Brand, CapacityGB, Interface, FormFactor, RPM)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                Brand = VALUES(Brand),
-                CapacityGB = VALUES(CapacityGB),
-                Interface = VALUES(Interface),
-                FormFactor = VALUES(FormFactor),
-                RPM = VALUES(RPM);
-            """, (p.id, p.brand, p.capacity_gb, p.interface, p.form_factor, p.rpm)
-        )
-    elif product_type == 'RAM':
-        cur.execute("""
-            INSERT INTO RAM (ID, Brand, CapacityGB, Type, Speed)
-            VALUES (%s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                Brand      = VALUES(Brand),
-                CapacityGB = VALUES(CapacityGB),
-                Type       = VALUES(Type),
-                Speed      = VALUES(Speed);
-            """, (p.id, p.brand, p.capacity_gb, p.ram_type, p.speed)
-        )
+    if product_type in _CATEGORY_UPSERTS:
+        sql, cols = _CATEGORY_UPSERTS[product_type]
+        cur.execute(sql, row.rows(*cols)[0])
     return ebay_rc
 
-def _scrape_item_by_id(ebay_id: int, category: str, *, sold: bool) -> dict | None:
+def _upload_batch(cur, products: list[Product], product_type: str) -> tuple[int, int]:
+    """Bulk-upsert products with one executemany() per table.
+
+    Returns (inserted, updated) with the same meaning as _upload's rowcount:
+    new EBAY rows vs existing rows whose values changed.  If the batch fails
+    (e.g. one bad row), falls back to per-item _upload so the rest still land.
+    """
+    if not products:
+        return 0, 0
+    batch = ProductBatch(products)
+    ids = sorted(set(batch.columns['id']))
+    try:
+        cur.execute(
+            f"SELECT ID FROM EBAY WHERE ID IN ({', '.join(['%s'] * len(ids))})", tuple(ids)
+        )
+        existing = {row[0] for row in cur.fetchall()}
+        sql, cols = _EBAY_UPSERT
+        cur.executemany(sql, batch.rows(*cols))
+        affected = cur.rowcount
+        if product_type in _CATEGORY_UPSERTS:
+            sql, cols = _CATEGORY_UPSERTS[product_type]
+            cur.executemany(sql, batch.rows(*cols))
+    except mariadb.Error as e:
+        log.warning("Bulk upload of %d item(s) failed (%s) — retrying per item", len(batch), e)
+        inserted = updated = 0
+        for p in products:
+            try:
+                rc = _upload(cur, p, product_type)
+                if rc == 1:
+                    inserted += 1
+                elif rc >= 2:
+                    updated += 1
+            except mariadb.Error as e:
+                log.error("DB error uploading item %s: %s", p.id, e)
+        return inserted, updated
+
+    # ON DUPLICATE KEY UPDATE reports 1 per inserted row and 2 per changed row.
+    inserted = len(set(ids) - existing)
+    updated = max(0, (affected - inserted) // 2)
+    return inserted, updated
+
+def _scrape_item_by_id(ebay_id: int, category: str, *, sold: bool, hedge: bool = False) -> Product | None:
     """Fetch a single eBay listing by its item ID.
 
     sold=True  → searches completed/sold results  (for outcome verification)
     sold=False → searches active listing results  (for targeted price refresh)
+    hedge=True → race direct against Zyte (for items about to end)
 
     Uses the numeric item ID as the search term so eBay returns only that
-    specific item.  Returns the parsed item dict on a match, None if not found.
+    specific item.  Returns the parsed Product on a match, None if not found.
     """
-    soup = __GetHTML(str(ebay_id), 'uk', 'all', 'all', alreadySold=sold)
+    soup = __GetHTML(str(ebay_id), 'uk', 'all', 'all', alreadySold=sold, hedge=hedge)
     items = __ParseItems(soup, str(ebay_id), category)
     for item in items:
-        if str(item['id']) == str(ebay_id):
+        if str(item.id) == str(ebay_id):
             return item
     return None
 
 
-def _scrape_item_completed(ebay_id: int, category: str) -> dict | None:
+def _search_active(query: str, category: str, *, hedge: bool = False) -> dict[str, Product]:
+    """Run one active-listings search and return its items keyed by str(ID).
+
+    Active searches are sorted ending soonest (&_sop=1), so a model-level
+    query puts the auctions the targeted tiers care about on the first page.
+    Outliers are kept: a tracked deal is, by definition, priced well under
+    the rest of the page.
+    """
+    soup = __GetHTML(query, 'uk', 'all', 'all', alreadySold=False, hedge=hedge)
+    return {str(item.id): item for item in __ParseItems(soup, query, category, drop_outliers=False)}
+
+
+def _targeted_groups(items: list) -> tuple[dict, list]:
+    """Plan a targeted run: model-level search groups plus per-ID leftovers.
+
+    Items sharing a category and model label (case and spacing ignored) are
+    grouped so one search can refresh all of them.  Items with no model, or
+    alone in their group, come back as singles — a search by item ID is just
+    as cheap and can't miss.
+
+    Returns ({(category, model_key): [item, ...]}, [single_item, ...]).
+    """
+    groups: dict[tuple[str, str], list] = {}
+    singles = []
+    for item in items:
+        model = item[3] if len(item) > 3 else None
+        if not model or not model.strip():
+            singles.append(item)
+            continue
+        groups.setdefault((item[1], ' '.join(model.split()).lower()), []).append(item)
+    for key in [k for k, group in groups.items() if len(group) < 2]:
+        singles.extend(groups.pop(key))
+    return groups, singles
+
+
+def _scrape_item_completed(ebay_id: int, category: str) -> Product | None:
     """Fetch a single eBay listing from all-completed results (sold + ended-unsold).
 
     Used as a fallback in VerifyPendingOutcomes when _scrape_item_by_id(sold=True)
     finds nothing.  Items that ended without selling appear in LH_Complete=1 results
     but NOT in LH_Complete=1&LH_Sold=1 results — this function catches those.
 
-    Returns the parsed item dict on a match, None if not found.
+    Returns the parsed Product on a match, None if not found.
     """
     soup = __GetHTML(str(ebay_id), 'uk', 'all', 'all', alreadySold='completed')
     items = __ParseItems(soup, str(ebay_id), category)
     for item in items:
-        if str(item['id']) == str(ebay_id):
+        if str(item.id) == str(ebay_id):
             return item
     return None
 
 
-def Scrape(query, product_type, country='us', condition='all', listing_type='all', cache=False):
+def _check_search_options(country, condition, listing_type):
     if country not in countryDict:
         raise Exception('Country not supported, please use one of the following: ' + ', '.join(countryDict.keys()))
     if condition not in conditionDict:
@@ -848,18 +1596,94 @@ def Scrape(query, product_type, country='us', condition='all', listing_type='all
     if listing_type not in typeDict:
         raise Exception('Type not supported, please use one of the following: ' + ', '.join(typeDict.keys()))
 
-    sold_soup = __GetHTML(query, country, condition, listing_type, alreadySold=True, cache=cache)
-    active_soup = __GetHTML(query, country, condition, listing_type, alreadySold=False, cache=cache)
 
-    sold_items = __ParseItems(sold_soup, query, product_type)
-    active_items = __ParseItems(active_soup, query, product_type)
+def Scrape(query, product_type, country='us', condition='all', listing_type='all', cache=False, dedup=None):
+    _check_search_options(country, condition, listing_type)
+
+    sold_items = __FetchItems(query, country, condition, listing_type, product_type, alreadySold=True,
+                              cache=cache, dedup=dedup)
+    active_items = __FetchItems(query, country, condition, listing_type, product_type, alreadySold=False,
+                                cache=cache, dedup=dedup)
 
     return sold_items + active_items
 
+
+def _scrape_pages(query_list, product_type, country, condition, listing_type, cache, dedup):
+    """Yield (query, items, cards, duplicates) for each query in `query_list`, in order.
+
+    `cards` and `duplicates` are the query's share of the RunDedup counts.
+    Without PARSE_WORKERS (or for cached pages) each query is scraped by
+    Scrape() before it is yielded.  With them, this process only fetches: each
+    page goes to the parse pool as soon as it arrives, and a query is yielded
+    once the next query's pages are fetched and submitted — so the caller
+    uploads one query while the pool parses the next and its successor
+    downloads.
+    """
+    if cache or PARSE_WORKERS <= 0:
+        for query in query_list:
+            cards, duplicates = dedup.cards, dedup.duplicates
+            with scrape_metrics.scope(category=product_type, query=query):
+                items = Scrape(query, product_type, country, condition, listing_type, cache=cache, dedup=dedup)
+            yield query, items, dedup.cards - cards, dedup.duplicates - duplicates
+        return
+
+    _check_search_options(country, condition, listing_type)
+    pool = _get_parse_pool()
+
+    def submit(query):
+        futures = []
+        with scrape_metrics.scope(category=product_type, query=query):
+            for sold in (True, False):
+                url = __SearchURL(query, country, condition, listing_type, sold)
+                log.debug("Fetching: %s", url)
+                body = _fetch_direct(url) or _fetch_zyte(url)
+                if body is None:
+                    raise RuntimeError(f"All fetch methods failed for: {url}")
+                futures.append(pool.submit(_parse_page, body, query, product_type, frozenset(dedup.ids)))
+        return query, futures
+
+    def collect(query, futures):
+        cards, duplicates = dedup.cards, dedup.duplicates
+        items = []
+        with scrape_metrics.scope(category=product_type, query=query):
+            for future in futures:
+                items += _adopt_page(future.result(), dedup)
+        return query, items, dedup.cards - cards, dedup.duplicates - duplicates
+
+    pending = None
+    for query in query_list:
+        submitted = submit(query)
+        if pending:
+            yield collect(*pending)
+        pending = submitted
+    if pending:
+        yield collect(*pending)
+
+def _backfill_final_prices(cur) -> int:
+    """Copy the sold price into DealOutcomes.FinalPrice where it is still NULL.
+
+    Once written, FinalPrice is immutable — a later re-listing of the same
+    item can't move a recorded outcome.  Returns the number of rows filled.
+    """
+    cur.execute("""
+        UPDATE Scraper.DealOutcomes d
+        JOIN   Scraper.EBAY e ON e.ID = d.EbayID
+        SET    d.FinalPrice = e.Price
+        WHERE  e.SoldDate IS NOT NULL AND d.FinalPrice IS NULL AND d.EndedUnsold = 0
+          AND  e.Price IS NOT NULL
+    """)
+    if cur.rowcount:
+        log.info("Outcome verification: locked in final price for %d outcome(s)", cur.rowcount)
+    return cur.rowcount
+
 def VerifyPendingOutcomes(hours_after: int = 6, give_up_days: int = 7) -> int:
     """Search eBay sold listings for DealOutcomes past their end time that
     still have SoldDate IS NULL in the EBAY table.
 
+    Also locks in DealOutcomes.FinalPrice for every outcome whose listing
+    has sold (whether resolved here or picked up by a regular scrape), so
+    App.py's outcome queries never have to write.
+
     Two-phase logic:
       Phase 1 — mark give-up: any item past `give_up_days` that is still
                 unresolved is flagged GaveUp=1 and will never be retried.
@@ -888,6 +1712,8 @@ def VerifyPendingOutcomes(hours_after: int = 6, give_up_days: int = 7) -> int:
                 gave_up, give_up_days,
             )
 
+        _backfill_final_prices(cur)
+
         # ── Phase 2: verify in-window items ──────────────────────────────────
         cur.execute("""
             SELECT o.EbayID, o.Category, e.Title, o.EndTime
@@ -911,8 +1737,14 @@ def VerifyPendingOutcomes(hours_after: int = 6, give_up_days: int = 7) -> int:
         for ebay_id, category, title, end_time in pending:
             try:
                 # ── Pass 1: sold-only search ──────────────────────────────────
-                item = _scrape_item_by_id(ebay_id, category, sold=True)
-                if item and item.get('sold-date'):
+                with scrape_metrics.scope(category=category, query='verify'):
+                    item = _scrape_item_by_id(ebay_id, category, sold=True)
+                if item and item.sold_date:
+                    cur.execute("""
+                        UPDATE Scraper.DealOutcomes
+                        SET    FinalPrice = %s
+                        WHERE  EbayID = %s AND FinalPrice IS NULL
+                    """, (int(item.price * 100), ebay_id))
                     cur.execute("""
                         UPDATE Scraper.EBAY
                         SET    SoldDate = %s,
@@ -920,16 +1752,17 @@ def VerifyPendingOutcomes(hours_after: int = 6, give_up_days: int = 7) -> int:
                                Bids     = %s
                         WHERE  ID       = %s
                           AND  SoldDate IS NULL
-                    """, (item['sold-date'], int(item['price'] * 100), item['bid-count'], ebay_id))
+                    """, (item.sold_date, int(item.price * 100), item.bid_count, ebay_id))
                     log.info(
                         "Outcome verified: ID=%s sold for £%.2f on %s",
-                        ebay_id, item['price'], item['sold-date'],
+                        ebay_id, item.price, item.sold_date,
                     )
                     resolved += 1
                     continue
 
                 # ── Pass 2: all-completed search (sold + ended-unsold) ────────
-                completed_item = _scrape_item_completed(ebay_id, category)
+                with scrape_metrics.scope(category=category, query='verify'):
+                    completed_item = _scrape_item_completed(ebay_id, category)
                 if completed_item:
                     # Found in completed results but NOT in sold results →
                     # the auction ended without a buyer.  Record the end time
@@ -974,42 +1807,72 @@ def VerifyPendingOutcomes(hours_after: int = 6, give_up_days: int = 7) -> int:
         conn.close()
 
 
-def ScrapeAndUpload(query_list: list[str], product_type: str, country='us', condition='all', listing_type='all', cache=False):
+# MarketPrices key column → Product field, for matching scraped items to estimates.
+_MARKET_KEY_FIELDS = {'Model': 'model', 'CapacityGB': 'capacity_gb', 'Interface': 'interface', 'Type': 'ram_type'}
+
+
+def _market_index(cur, product_type: str) -> dict[str, float]:
+    """ModelKey → MeanPrice for one category; {} before MarketPrices exists."""
+    try:
+        cur.execute("SELECT ModelKey, MeanPrice FROM Scraper.MarketPrices WHERE Category = %s",
+                    (product_type,))
+        return {key: float(price) for key, price in cur.fetchall()}
+    except mariadb.Error:
+        return {}
+
+
+def _query_yield(items: list[Product], inserted: int, product_type: str,
+                 market: dict[str, float], now: datetime) -> query_schedule.QueryYield:
+    """Measure one query's run for the adaptive query schedule."""
+    keys = market_prices.CATEGORIES[product_type][1]
+    cutoff = now + timedelta(hours=query_schedule.DEAL_WINDOW_HOURS)
+    threshold = 1 - query_schedule.DEAL_DISCOUNT / 100
+    ending = deals = 0
+    for p in items:
+        if p.sold_date is not None or p.time_end is None or not now < p.time_end <= cutoff:
+            continue
+        ending += 1
+        avg = market.get(market_prices.model_key(tuple(getattr(p, _MARKET_KEY_FIELDS[k]) for k in keys)))
+        if avg and p.price < avg * threshold:
+            deals += 1
+    return query_schedule.QueryYield(new_ids=inserted, deals=deals, ending_soon=ending)
+
+
+def ScrapeAndUpload(query_list: list[str], product_type: str, country='us', condition='all', listing_type='all', cache=False,
+                    dedup: RunDedup | None = None) -> dict[str, query_schedule.QueryYield]:
+    """Scrape and upsert each query in `query_list`; returns each query's yield.
+
+    Each listing is parsed and written once per `dedup` — pass the same
+    RunDedup to every call in a run to dedup across categories as well.
+    """
+    if dedup is None:
+        dedup = RunDedup()
     conn = _get_connection()
     cur = conn.cursor()
 
     try:
         inserted = updated = 0
-        for query in query_list:
-            items = Scrape(query, product_type, country, condition, listing_type, cache=cache)
-
-            products = [
-                Product(
-                    id=d["id"], title=d["title"], price=d["price"],
-                    time_left=d["time-left"], time_end=d["time-end"],
-                    sold_date=d["sold-date"], bid_count=d["bid-count"],
-                    reviews_count=d["reviews-count"], url=d["url"],
-                    brand=d["brand"], model=d["model"], vram=d["vram"],
-                    socket=d["socket"], cores=d["cores"],
-                    capacity_gb=d["capacity-gb"], interface=d["interface"],
-                    form_factor=d["form-factor"], rpm=d["rpm"],
-                    ram_type=d["ram-type"], speed=d["speed"],
-                )
-                for d in items
-            ]
-
-            for p in products:
-                try:
-                    rc = _upload(cur, p, product_type)
-                    if rc == 1:
-                        inserted += 1
-                    elif rc >= 2:
-                        updated += 1
-                except mariadb.Error as e:
-                    log.error("DB error uploading item %s: %s", p.id, e)
-
-        conn.commit()
+        yields = {}
+        market = _market_index(cur, product_type)
+        pages = _scrape_pages(query_list, product_type, country, condition, listing_type, cache, dedup)
+        for query, items, cards, duplicates in pages:
+            with scrape_metrics.scope(category=product_type, query=query):
+                if duplicates:
+                    log.info("[%s] %d/%d card(s) (%.0f%%) already parsed by an earlier query this run",
+                             query, duplicates, cards, 100 * duplicates / cards)
+
+                with scrape_metrics.timer('upload'):
+                    ins, upd = _upload_batch(cur, items, product_type)
+                scrape_metrics.incr('items_inserted', ins)
+                scrape_metrics.incr('items_updated', upd)
+                inserted += ins
+                updated += upd
+                yields[query] = _query_yield(items, ins, product_type, market, datetime.now())
+
+        with scrape_metrics.scope(category=product_type), scrape_metrics.timer('commit'):
+            conn.commit()
         log.info("Scrape complete [%s]: %d new, %d updated", product_type, inserted, updated)
+        return yields
 
     except Exception as e:
         conn.rollback()
@@ -1038,11 +1901,117 @@ def RecordScrapeCompleted():
         conn.close()
 
 
+def RefreshMarketPrices(full: bool = False) -> int:
+    """Recompute MarketPrices estimates for model keys with new sales.
+
+    Runs a full rebuild instead when `full` is set or the table is stale
+    (see market_prices.refresh).  Returns the number of keys written.
+    """
+    conn = _get_connection()
+    try:
+        cur = conn.cursor()
+        start = time.time()
+        written = market_prices.refresh(cur, full=full)
+        conn.commit()
+        log.info("Market prices refreshed: %d key(s) in %.1fs", written, time.time() - start)
+        return written
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def PublishPriceGuide() -> str:
+    """Store a fresh price-guide snapshot for App.py to serve (price_guide.publish).
+
+    Returns the snapshot version.
+    """
+    conn = _get_connection()
+    try:
+        cur = conn.cursor()
+        version, created = price_guide.publish(cur)
+        conn.commit()
+        log.info("Price guide snapshot %s (%s)", version, "published" if created else "unchanged")
+        return version
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def RecordScrapeMetrics(run: scrape_metrics.RunMetrics) -> int | None:
+    """Persist a finished metrics run to ScrapeRuns / ScrapeStageMetrics.
+
+    Returns the RunID, or None on any error — metrics must never break a scrape.
+    """
+    try:
+        conn = _get_connection()
+        try:
+            cur = conn.cursor()
+            run_id = scrape_metrics.persist(cur, run)
+            conn.commit()
+            return run_id
+        finally:
+            conn.close()
+    except Exception as e:
+        log.error("Failed to record scrape metrics: %s", e)
+        return None
+
+
+def LoadSchedulerState() -> scheduler_state.SchedulerState:
+    """Read the scheduler state saved by a previous process (scheduler_state.load).
+
+    Returns an empty state on any error, so the scheduler starts cold rather
+    than not at all.
+    """
+    try:
+        conn = _get_connection()
+        try:
+            cur = conn.cursor()
+            state = scheduler_state.load(cur)
+            conn.commit()
+            return state
+        finally:
+            conn.close()
+    except Exception as e:
+        log.error("Failed to load scheduler state: %s", e)
+        return scheduler_state.SchedulerState()
+
+
+def SaveSchedulerState(queries: list = (), targeted: list = ()) -> bool:
+    """Persist changed query cursors and targeted-scrape times (scheduler_state.save_*).
+
+    `queries` are (category, query, score, last_run) rows; `targeted` are
+    (ebay_id, last_targeted, end_time) rows.  Targeted rows for ended
+    auctions are evicted on every save.  Returns False on any error — losing this state
+    only costs some redundant scraping after a restart.
+    """
+    try:
+        conn = _get_connection()
+        try:
+            cur = conn.cursor()
+            scheduler_state.save_queries(cur, list(queries))
+            # Evicts ended auctions even when nothing was targeted this time.
+            evicted = scheduler_state.save_targeted(cur, list(targeted))
+            if evicted:
+                log.debug("Evicted %d ended auction(s) from TargetedScrapes", evicted)
+            conn.commit()
+            return True
+        finally:
+            conn.close()
+    except Exception as e:
+        log.error("Failed to save scheduler state: %s", e)
+        return False
+
+
 def GetActiveDeals() -> list:
     """Return active tracked deals that haven't sold and haven't ended yet.
 
-    Returns a list of (ebay_id, category, title, end_time) tuples, one per
-    row in DealOutcomes that is still live.  Returns [] on any error so a
+    Returns a list of (ebay_id, category, title, end_time, model) tuples, one
+    per row in DealOutcomes that is still live.  `model` is the label App
+    recorded when the deal was surfaced (may be None).  Returns [] on any error so a
     transient DB failure never breaks the scheduler loop.
     """
     try:
@@ -1050,7 +2019,7 @@ def GetActiveDeals() -> list:
         cur = conn.cursor()
         try:
             cur.execute("""
-                SELECT o.EbayID, o.Category, e.Title, o.EndTime
+                SELECT o.EbayID, o.Category, e.Title, o.EndTime, o.Model
                 FROM   DealOutcomes o
                 JOIN   EBAY e ON e.ID = o.EbayID
                 WHERE  o.EndTime > NOW()
@@ -1067,12 +2036,21 @@ def GetActiveDeals() -> list:
         return []
 
 
-def ScrapeTargeted(items: list) -> int:
-    """Scrape specific tracked items by title and upsert results to the DB.
+def ScrapeTargeted(items: list, hedge: bool = False) -> int:
+    """Scrape specific tracked items and upsert results to the DB.
+
+    `items` is a list of (ebay_id, category, title[, model]) tuples — the
+    GetActiveDeals columns with end_time dropped by the caller.
 
-    `items` is a list of (ebay_id, category, title) tuples — the same
-    three-element prefix returned by GetActiveDeals (end_time is dropped
-    by the caller before passing here).
+    Items of the same category and model are coalesced into a single
+    active-listings search for the model (see _targeted_groups), and every
+    tracked ID found in its results is updated from that one page.  Only
+    misses, and items with no model to share, fall back to a search by item
+    ID — so requests scale with distinct models rather than tracked items.
+
+    hedge=True races direct against Zyte for every fetch — used for items in
+    their final minutes, where a slow direct failure would otherwise cost
+    the last price update.
 
     Returns the number of items successfully found and upserted.
     """
@@ -1083,48 +2061,46 @@ def ScrapeTargeted(items: list) -> int:
     cur = conn.cursor()
     updated = 0
 
+    groups, _ = _targeted_groups(items)
+    found: dict[str, Product] = {}
+    for (category, _), group in groups.items():
+        query = ' '.join(group[0][3].split())
+        try:
+            with scrape_metrics.scope(category=category, query='targeted'):
+                results = _search_active(query, category, hedge=hedge)
+        except Exception as e:
+            log.warning("Targeted search for '%s' failed: %s", query, e)
+            continue
+        hits = [str(i[0]) for i in group if str(i[0]) in results]
+        found.update((ebay_id, results[ebay_id]) for ebay_id in hits)
+        log.info("Targeted search '%s' [%s]: %d/%d tracked item(s) found",
+                 query, category, len(hits), len(group))
+
     try:
-        for ebay_id, category, title in items:
+        for ebay_id, category, title, *_ in items:
             try:
-                item = _scrape_item_by_id(ebay_id, category, sold=False)
-                if item:
-                    product = Product(
-                        id=item['id'],
-                        title=item['title'],
-                        price=item['price'],
-                        time_left=item['time-left'],
-                        time_end=item['time-end'],
-                        sold_date=item['sold-date'],
-                        bid_count=item['bid-count'],
-                        reviews_count=item['reviews-count'],
-                        url=item['url'],
-                        brand=item['brand'],
-                        model=item['model'],
-                        vram=item['vram'],
-                        socket=item['socket'],
-                        cores=item['cores'],
-                        capacity_gb=item['capacity-gb'],
-                        interface=item['interface'],
-                        form_factor=item['form-factor'],
-                        rpm=item['rpm'],
-                        ram_type=item['ram-type'],
-                        speed=item['speed'],
-                    )
-                    _upload(cur, product, category)
-                    log.info(
-                        "Targeted scrape updated: ID=%s '%.50s' price=£%.2f bids=%d",
-                        ebay_id, title, item['price'], item['bid-count'],
-                    )
-                    updated += 1
-                else:
-                    log.debug(
-                        "Targeted scrape: ID=%s not found in active results (may have ended)",
-                        ebay_id,
-                    )
+                with scrape_metrics.scope(category=category, query='targeted'):
+                    item = found.get(str(ebay_id))
+                    if item is None:
+                        item = _scrape_item_by_id(ebay_id, category, sold=False, hedge=hedge)
+                    if item:
+                        with scrape_metrics.timer('upload'):
+                            _upload(cur, item, category)
+                        log.info(
+                            "Targeted scrape updated: ID=%s '%.50s' price=£%.2f bids=%d",
+                            ebay_id, title, item.price, item.bid_count,
+                        )
+                        updated += 1
+                    else:
+                        log.debug(
+                            "Targeted scrape: ID=%s not found in active results (may have ended)",
+                            ebay_id,
+                        )
             except Exception as e:
                 log.warning("Targeted scrape failed for item %s: %s", ebay_id, e)
 
-        conn.commit()
+        with scrape_metrics.scope(query='targeted'), scrape_metrics.timer('commit'):
+            conn.commit()
         log.info("Targeted scrape complete: %d/%d item(s) updated", updated, len(items))
         return updated
 
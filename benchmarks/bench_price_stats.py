@@ -0,0 +1,85 @@
+"""Benchmark price-outlier filtering on large result pages.
+
+Compares the original O(n²) __StDevParse (kept here verbatim for reference)
+and its list-membership item filter against price_stats, for each outlier
+method and — when NumPy is installed — both backends.
+
+    python benchmarks/bench_price_stats.py [--sizes 60,240,1000,10000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import price_stats
+
+
+# ── Original implementation (pre price_stats) ────────────────────────────────
+
+def legacy_average(numberList):
+    if len(list(numberList)) == 0: return 0
+    return sum(numberList) / len(list(numberList))
+
+def legacy_stdev(numberList):
+    if len(list(numberList)) <= 1: return 0
+    nominator = sum(map(lambda x: (x - sum(numberList) / len(numberList)) ** 2, numberList))
+    return (nominator / (len(numberList) - 1)) ** 0.5
+
+def legacy_stdev_parse(numberList):
+    avg = legacy_average(numberList)
+    stdev = legacy_stdev(numberList)
+    return [nmbr for nmbr in numberList if (avg + stdev >= nmbr >= avg - stdev)]
+
+def legacy_drop_outliers(prices):
+    kept = legacy_stdev_parse(prices)
+    return [p for p in prices if p in kept]
+
+
+# ── Harness ──────────────────────────────────────────────────────────────────
+
+def page_prices(n: int, seed: int = 0) -> list[float]:
+    """Realistic-ish page: log-normal prices around £300 plus a few junk listings."""
+    rng = random.Random(seed)
+    prices = [round(rng.lognormvariate(5.7, 0.35), 2) for _ in range(n)]
+    for i in range(0, n, 25):
+        prices[i] = rng.choice([0.99, 1.50, 4999.0])   # boxes-only / typo listings
+    return prices
+
+
+def timed(fn, *args, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='60,240,1000,10000')
+    args = parser.parse_args()
+
+    backends = ['python'] + (['numpy'] if price_stats.np is not None else [])
+    print(f"{'n':>7}  {'variant':<22} {'ms':>10}")
+    for n in (int(s) for s in args.sizes.split(',')):
+        prices = page_prices(n)
+        if n <= 2000:   # legacy is quadratic — skip the sizes that take minutes
+            print(f"{n:>7}  {'legacy stdev':<22} {timed(legacy_drop_outliers, prices) * 1e3:>10.3f}")
+        for backend in backends:
+            saved = price_stats.NUMPY_MIN_SIZE
+            price_stats.NUMPY_MIN_SIZE = 0 if backend == 'numpy' else float('inf')
+            try:
+                for method in price_stats.METHODS:
+                    ms = timed(price_stats.filter_outliers, prices, method) * 1e3
+                    print(f"{n:>7}  {method + ' (' + backend + ')':<22} {ms:>10.3f}")
+            finally:
+                price_stats.NUMPY_MIN_SIZE = saved
+
+
+if __name__ == '__main__':
+    main()
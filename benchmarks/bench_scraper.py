@@ -0,0 +1,252 @@
+"""Offline benchmark suite for the scrape → parse → upload hot path.
+
+Runs every page in benchmarks/corpus/ (recorded with record_corpus.py) plus
+synthetic pages for each category, and times:
+
+  get_html      __GetHTML from a cached page (file read + BeautifulSoup tree)
+  parse_items   __ParseItems on the prebuilt tree (card scan + extraction + outliers)
+  stream_items  __StreamItems over 64 KB chunks (the live direct-fetch path;
+                it replaces get_html + parse_items, so compare it with their sum)
+  parse_card    __ParseCard on pre-split cards — isolates the title/field
+                extractors (_classify_title) with an empty title cache
+  parse_card_warm
+                the same with every title already cached, as when an hourly
+                run re-scrapes listings it has seen
+  stdev_parse   __StDevParse over the page's prices
+  upload_insert _upload_batch into empty tables
+  upload_update _upload_batch again over the same rows (the upsert path)
+
+Uploads go to an in-memory SQLite stand-in (sqlite_db.py) by default, or to a
+scratch MariaDB database with --mariadb (needs BENCH_DB_NAME; never the
+production DB_NAME).  Results are written as JSON so runs can be compared
+across commits:
+
+    python benchmarks/bench_scraper.py                    # full run
+    python benchmarks/bench_scraper.py --quick            # 240-item pages only
+    python benchmarks/bench_scraper.py --compare benchmarks/results/<base>.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import logging
+logging.disable(logging.WARNING)   # per-item skip warnings would swamp the timings
+
+from bs4 import BeautifulSoup
+
+import EbayScraper
+import synthetic
+import sqlite_db
+
+_GetHTML      = vars(EbayScraper)["__GetHTML"]
+_ParseItems   = vars(EbayScraper)["__ParseItems"]
+_StreamItems  = vars(EbayScraper)["__StreamItems"]
+_ParseCard    = vars(EbayScraper)["__ParseCard"]
+_StDevParse   = vars(EbayScraper)["__StDevParse"]
+
+CARD_CLASS = 'su-card-container su-card-container--horizontal'
+CORPUS_DIR = HERE / 'corpus'
+RESULTS_DIR = HERE / 'results'
+
+
+# ── Pages ────────────────────────────────────────────────────────────────────
+
+def corpus_pages():
+    """Yield (name, category, sold, html) for recorded pages.
+
+    Layout: corpus/<CATEGORY>/<query>_<sold|active>.html[.gz]
+    """
+    for path in sorted(CORPUS_DIR.glob('*/*.html*')):
+        opener = gzip.open if path.suffix == '.gz' else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            html = f.read()
+        stem = path.name.split('.html')[0]
+        yield f"corpus/{path.parent.name}/{stem}", path.parent.name, stem.endswith('_sold'), html
+
+
+def synthetic_pages(sizes, categories):
+    for n in sizes:
+        for category in categories:
+            for sold in ((True, False) if n <= 1000 else (True,)):
+                name = f"synthetic/{category}_{'sold' if sold else 'active'}_{n}"
+                yield name, category, sold, synthetic.search_page(category, n, sold=sold)
+
+
+# ── Timing ───────────────────────────────────────────────────────────────────
+
+def best_of(fn, repeat, setup=None):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_page(name, category, sold, html, repeat, db):
+    results = []
+    query = 'bench'
+    page_bytes = len(html.encode('utf-8'))
+
+    def record(bench, seconds, items):
+        results.append({
+            'bench': bench, 'page': name, 'category': category,
+            'items': items, 'bytes': page_bytes, 'seconds': round(seconds, 6),
+            'items_per_sec': round(items / seconds, 1) if seconds > 0 else None,
+        })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            suffix = 'sold' if sold else 'active'
+            with open(f"{query}_{suffix}.txt", 'w', encoding='utf-8') as f:
+                f.write(html)
+            seconds, soup = best_of(lambda: _GetHTML(query, 'uk', alreadySold=sold, cache=True), repeat)
+        finally:
+            os.chdir(cwd)
+    cards = soup.find_all('div', {'class': CARD_CLASS})[1:]
+    record('get_html', seconds, len(cards))
+
+    # Parse stages run cold unless named _warm: every title classified afresh.
+    cold = EbayScraper._get_title_cache().clear
+    seconds, items = best_of(lambda: _ParseItems(soup, query, category), repeat, cold)
+    record('parse_items', seconds, len(cards))
+
+    chunks = [html[i:i + 65536] for i in range(0, len(html), 65536)]
+    seconds, _ = best_of(lambda: list(_StreamItems(chunks, query, category)), repeat, cold)
+    record('stream_items', seconds, len(cards))
+
+    seconds, _ = best_of(lambda: [_ParseCard(c, query, category) for c in cards], repeat, cold)
+    record('parse_card', seconds, len(cards))
+
+    seconds, _ = best_of(lambda: [_ParseCard(c, query, category) for c in cards], repeat)
+    record('parse_card_warm', seconds, len(cards))
+
+    prices = [i.price for i in items]
+    seconds, _ = best_of(lambda: _StDevParse(prices), repeat)
+    record('stdev_parse', seconds, len(prices))
+
+    conn, cur = db
+    insert_best = update_best = float('inf')
+    for _ in range(repeat):
+        sqlite_db.reset(conn)
+        start = time.perf_counter()
+        EbayScraper._upload_batch(cur, items, category)
+        conn.commit()
+        insert_best = min(insert_best, time.perf_counter() - start)
+        start = time.perf_counter()
+        EbayScraper._upload_batch(cur, items, category)
+        conn.commit()
+        update_best = min(update_best, time.perf_counter() - start)
+    record('upload_insert', insert_best, len(items))
+    record('upload_update', update_best, len(items))
+    return results
+
+
+def open_db(use_mariadb):
+    if not use_mariadb:
+        conn = sqlite_db.connect()
+        return conn, sqlite_db.Cursor(conn)
+    bench_db = os.environ.get('BENCH_DB_NAME')
+    if not bench_db or bench_db == os.environ.get('DB_NAME'):
+        sys.exit("--mariadb needs BENCH_DB_NAME set to a scratch database (not DB_NAME)")
+    import mariadb
+    conn = mariadb.connect(
+        user=os.environ["DB_USER"], password=os.environ["DB_PASSWORD"],
+        host=os.environ["DB_HOST"], port=int(os.environ.get("DB_PORT", 3305)),
+        database=bench_db,
+    )
+    cur = conn.cursor()
+    for ddl in sqlite_db.SCHEMA:
+        cur.execute(ddl)
+    conn.commit()
+    return conn, cur
+
+
+# ── Reporting ────────────────────────────────────────────────────────────────
+
+def git_commit():
+    try:
+        sha = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, text=True).strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain'], cwd=HERE, text=True).strip())
+        return sha, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def compare(base_path, results):
+    with open(base_path, encoding='utf-8') as f:
+        base = {(r['bench'], r['page']): r for r in json.load(f)['results']}
+    print(f"\n{'bench':<14} {'page':<34} {'base ms':>10} {'now ms':>10} {'speedup':>8}")
+    for r in results:
+        b = base.get((r['bench'], r['page']))
+        if not b:
+            continue
+        speedup = b['seconds'] / r['seconds'] if r['seconds'] else float('inf')
+        print(f"{r['bench']:<14} {r['page']:<34} {b['seconds'] * 1e3:>10.2f} "
+              f"{r['seconds'] * 1e3:>10.2f} {speedup:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='240,10000', help='synthetic page sizes (items)')
+    parser.add_argument('--categories', default=','.join(synthetic.CATEGORIES))
+    parser.add_argument('--repeat', type=int, default=3, help='best-of runs (pages >1000 items run once)')
+    parser.add_argument('--quick', action='store_true', help='240-item synthetic pages only, no corpus')
+    parser.add_argument('--mariadb', action='store_true', help='upload to BENCH_DB_NAME instead of SQLite')
+    parser.add_argument('--out', help='results JSON path (default benchmarks/results/<time>-<sha>.json)')
+    parser.add_argument('--compare', metavar='BASE_JSON', help='print speedups against an earlier run')
+    args = parser.parse_args()
+
+    sizes = [240] if args.quick else [int(s) for s in args.sizes.split(',')]
+    categories = [c.strip().upper() for c in args.categories.split(',')]
+    pages = list(synthetic_pages(sizes, categories))
+    if not args.quick:
+        pages = list(corpus_pages()) + pages
+
+    db = open_db(args.mariadb)
+    results = []
+    print(f"{'bench':<14} {'page':<34} {'items':>6} {'ms':>10} {'items/s':>10}")
+    for name, category, sold, html in pages:
+        cards = html.count(CARD_CLASS) - 1
+        repeat = 1 if cards > 1000 else args.repeat
+        for r in bench_page(name, category, sold, html, repeat, db):
+            results.append(r)
+            print(f"{r['bench']:<14} {r['page']:<34} {r['items']:>6} "
+                  f"{r['seconds'] * 1e3:>10.2f} {r['items_per_sec'] or 0:>10.0f}")
+    db[0].close()
+
+    sha, dirty = git_commit()
+    report = {
+        'commit': sha, 'dirty': dirty,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(), 'platform': platform.platform(),
+        'db': 'mariadb' if args.mariadb else 'sqlite',
+        'results': results,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{sha}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"\nResults written to {out}")
+
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == '__main__':
+    main()
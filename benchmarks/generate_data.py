@@ -0,0 +1,207 @@
+"""Fill a local MariaDB with synthetic listings for load-testing App.py.
+
+Writes --rows listings (default 1M) spread evenly over the four categories
+into EBAY and the GPU/CPU/HDD/RAM detail tables, plus a slice of
+DealOutcomes, then rebuilds MarketPrices so the deal queries have market
+estimates to compare against:
+
+  sold     ~90% of rows, SoldDate spread over the last --days days
+  active   the rest, EndTime spread over the next 24 hours; --deal-fraction
+           of them are priced 30-60% under the category's typical level
+  outcomes about --outcomes rows, mostly resolved against sold listings,
+           with the active deals over-sampled so /api/outcomes has pending rows
+
+App.py reads the Scraper schema by name, so this needs a scratch server
+whose DB_NAME is Scraper — never the production one.  It refuses hosts other
+than localhost unless --allow-host is given, and refuses non-empty tables
+unless --truncate is given:
+
+    python benchmarks/generate_data.py --truncate
+    python benchmarks/generate_data.py --rows 200000 --truncate
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import mariadb
+from dotenv import load_dotenv
+
+import market_prices
+import synthetic
+import sqlite_db
+
+# Well above real eBay item IDs so synthetic rows are easy to spot and purge.
+ID_BASE = 900_000_000_000
+
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '::1', 'host.docker.internal')
+
+# Mirrors App.ensure_outcomes_table (including the migrated column and index).
+CREATE_OUTCOMES = """
+    CREATE TABLE IF NOT EXISTS DealOutcomes (
+        EbayID         BIGINT       PRIMARY KEY,
+        Category       VARCHAR(10)  NOT NULL,
+        Model          VARCHAR(150),
+        SurfacedPrice  INT          NOT NULL,
+        AvgMarketPrice INT          NOT NULL,
+        DiscountPct    FLOAT        NOT NULL,
+        BidCount       INT          NOT NULL DEFAULT 0,
+        EndTime        DATETIME     NOT NULL,
+        SurfacedAt     DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        GaveUp         TINYINT(1)   NOT NULL DEFAULT 0,
+        EndedUnsold    TINYINT(1)   NOT NULL DEFAULT 0,
+        FinalPrice     INT          NULL,
+        INDEX idx_surfaced_at (SurfacedAt, EbayID)
+    )
+"""
+
+_DETAIL_COLUMNS = {
+    'GPU': ('Brand', 'Model', 'VRAM'),
+    'CPU': ('Brand', 'Model', 'Socket', 'Cores'),
+    'HDD': ('Brand', 'CapacityGB', 'Interface', 'FormFactor', 'RPM'),
+    'RAM': ('Brand', 'CapacityGB', 'Type', 'Speed'),
+}
+
+
+def outcome_label(category: str, fields: dict) -> str:
+    """The DealOutcomes.Model label App.deals() would record for this listing."""
+    if category == 'HDD':
+        return f"{fields['CapacityGB'] // 1000}TB {fields['Interface']}"
+    if category == 'RAM':
+        return f"{fields['CapacityGB']}GB {fields['Type']}"
+    return fields['Model']
+
+
+def generate(category: str, n: int, id_base: int, now: datetime, args, rng: random.Random):
+    """Yield (ebay_row, detail_row | None, outcome_row | None) for one category."""
+    outcome_rate = args.outcomes / max(args.rows, 1)
+    for i in range(n):
+        ebay_id = id_base + i
+        title, fields = synthetic.item(category, rng)
+        price = synthetic.price(category, rng)
+        sold = rng.random() >= args.active_fraction
+        deal = not sold and rng.random() < args.deal_fraction
+        if deal:
+            price = round(price * rng.uniform(0.4, 0.7), 2)
+        if sold:
+            sold_on = (now - timedelta(days=rng.randint(0, args.days))).date()
+            end_time = datetime.combine(sold_on, datetime.min.time()) + timedelta(minutes=rng.randint(0, 1439))
+        else:
+            sold_on = None
+            end_time = now + timedelta(minutes=rng.randint(1, 24 * 60))
+        pence = int(round(price * 100))
+        bids = rng.randint(0, 30)
+        ebay_row = (ebay_id, title, pence, bids, end_time, sold_on,
+                    f"https://www.ebay.co.uk/itm/{ebay_id}")
+        detail_row = (ebay_id, *(fields[c] for c in _DETAIL_COLUMNS[category])) if fields else None
+
+        outcome_row = None
+        if fields and (deal or sold) and rng.random() < outcome_rate * (4 if deal else 1):
+            discount = rng.uniform(20, 60)
+            surfaced = int(pence * rng.uniform(0.7, 1.0)) if sold else pence
+            outcome_row = (
+                ebay_id, category, outcome_label(category, fields), surfaced,
+                int(surfaced / (1 - discount / 100)), round(discount, 1), rng.randint(0, bids),
+                end_time, (end_time - timedelta(hours=rng.uniform(0.5, 6))).replace(microsecond=0),
+                pence if sold else None,
+            )
+        yield ebay_row, detail_row, outcome_row
+
+
+def insert(cur, table: str, columns: tuple, rows: list) -> None:
+    if rows:
+        marks = ', '.join(['%s'] * len(columns))
+        cur.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({marks})", rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='total listings across all categories')
+    parser.add_argument('--days', type=int, default=180, help='spread of sold dates')
+    parser.add_argument('--active-fraction', type=float, default=0.1)
+    parser.add_argument('--deal-fraction', type=float, default=0.05, help='share of active rows priced as deals')
+    parser.add_argument('--outcomes', type=int, default=20_000, help='approximate DealOutcomes rows')
+    parser.add_argument('--batch', type=int, default=5000, help='rows per executemany')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--truncate', action='store_true', help='empty the tables first')
+    parser.add_argument('--allow-host', action='store_true', help=f'allow a DB_HOST outside {LOCAL_HOSTS}')
+    args = parser.parse_args()
+
+    load_dotenv(HERE.parent / "credentials.env")
+    host = os.environ["DB_HOST"]
+    if host not in LOCAL_HOSTS and not args.allow_host:
+        sys.exit(f"DB_HOST={host} is not local; pass --allow-host if this really is a scratch server")
+    conn = mariadb.connect(
+        user=os.environ["DB_USER"], password=os.environ["DB_PASSWORD"],
+        host=host, port=int(os.environ.get("DB_PORT", 3305)),
+        database=os.environ["DB_NAME"],
+    )
+    cur = conn.cursor()
+    for ddl in (*sqlite_db.SCHEMA, CREATE_OUTCOMES):
+        cur.execute(ddl)
+    if args.truncate:
+        for table in (*sqlite_db.TABLES, 'DealOutcomes', 'MarketPrices'):
+            try:
+                cur.execute(f"TRUNCATE TABLE {table}")
+            except mariadb.Error:
+                pass   # MarketPrices doesn't exist until the first refresh
+    else:
+        cur.execute("SELECT COUNT(*) FROM EBAY")
+        if cur.fetchone()[0]:
+            sys.exit("EBAY is not empty; pass --truncate to replace its contents")
+    conn.commit()
+
+    rng = random.Random(args.seed)
+    now = datetime.now().replace(microsecond=0)
+    per_category = args.rows // len(synthetic.CATEGORIES)
+    ebay_cols = ('ID', 'Title', 'Price', 'Bids', 'EndTime', 'SoldDate', 'URL')
+    outcome_cols = ('EbayID', 'Category', 'Model', 'SurfacedPrice', 'AvgMarketPrice', 'DiscountPct',
+                    'BidCount', 'EndTime', 'SurfacedAt', 'FinalPrice')
+    start = time.perf_counter()
+    written = outcomes = 0
+    for c, category in enumerate(synthetic.CATEGORIES):
+        detail_cols = ('ID', *_DETAIL_COLUMNS[category])
+        ebay, detail, outcome = [], [], []
+        for ebay_row, detail_row, outcome_row in generate(
+                category, per_category, ID_BASE + c * 100_000_000, now, args, rng):
+            ebay.append(ebay_row)
+            if detail_row:
+                detail.append(detail_row)
+            if outcome_row:
+                outcome.append(outcome_row)
+            if len(ebay) >= args.batch:
+                insert(cur, 'EBAY', ebay_cols, ebay)
+                insert(cur, category, detail_cols, detail)
+                insert(cur, 'DealOutcomes', outcome_cols, outcome)
+                conn.commit()
+                written += len(ebay)
+                outcomes += len(outcome)
+                ebay, detail, outcome = [], [], []
+                print(f"\r{written:>10,} rows  {written / (time.perf_counter() - start):>8,.0f} rows/s",
+                      end='', flush=True)
+        insert(cur, 'EBAY', ebay_cols, ebay)
+        insert(cur, category, detail_cols, detail)
+        insert(cur, 'DealOutcomes', outcome_cols, outcome)
+        conn.commit()
+        written += len(ebay)
+        outcomes += len(outcome)
+    print(f"\r{written:>10,} listings, {outcomes:,} outcomes in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    keys = market_prices.refresh(cur, full=True)
+    cur.execute("ANALYZE TABLE EBAY, GPU, CPU, HDD, RAM, DealOutcomes")
+    cur.fetchall()
+    conn.commit()
+    print(f"MarketPrices rebuilt: {keys} keys in {time.perf_counter() - start:.1f}s")
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+"""Concurrent load driver for the Flask API with latency SLOs.
+
+Runs --clients threads against a running App.py (gunicorn or flask run) for
+--duration seconds.  Each request picks an endpoint by weight and then one of
+its query-string variants; latencies are reported per endpoint as
+p50/p95/p99/max alongside throughput and error rate:
+
+    python benchmarks/generate_data.py --truncate        # 1M-row database first
+    python benchmarks/load_test.py --base-url http://localhost:5000
+    python benchmarks/load_test.py --clients 32 --duration 60 --only deals,outcomes
+
+Exits non-zero when any endpoint misses its SLO (p95/p99 in SLOS, or more than
+MAX_ERROR_RATE errors), so it can gate a change.  Results are written as JSON
+next to the parse benchmarks in benchmarks/results/.
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+HERE = Path(__file__).resolve().parent
+RESULTS_DIR = HERE / 'results'
+
+# name → (path, weight, query-string variants)
+ENDPOINTS = {
+    'deals':       ('/api/deals', 6, [
+        {'type': t, 'window': w} for t in ('gpu', 'cpu', 'hdd', 'ram') for w in (2, 6, 24)
+    ]),
+    'deal-counts': ('/api/deal-counts', 3, [{'window': w} for w in (2, 6, 24)]),
+    'outcomes':    ('/api/outcomes', 1, [{}]),
+    'price-guide': ('/api/price-guide', 1, [{}]),
+}
+
+# name → (p95 ms, p99 ms) against the generate_data.py 1M-row database.
+SLOS = {
+    'deals':       (300, 600),
+    'deal-counts': (500, 1000),
+    'outcomes':    (300, 600),
+    'price-guide': (500, 1000),
+}
+
+MAX_ERROR_RATE = 0.01
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list (0 for an empty one)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(len(sorted_values) * q / 100))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Per-endpoint latencies (seconds) and error counts, shared by the client threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+
+    def record(self, name: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.latencies.setdefault(name, []).append(seconds)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def client(base_url: str, names: list[str], weights: list[int], deadline: float,
+           recorder: Recorder | None, seed: int, timeout: float) -> None:
+    rng = random.Random(seed)
+    session = requests.Session()
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        path, _, variants = ENDPOINTS[name]
+        start = time.perf_counter()
+        try:
+            resp = session.get(base_url + path, params=rng.choice(variants), timeout=timeout)
+            resp.content   # include body transfer in the latency
+            ok = resp.status_code == 200
+        except requests.RequestException:
+            ok = False
+        if recorder is not None:
+            recorder.record(name, time.perf_counter() - start, ok)
+
+
+def run(base_url: str, names: list[str], clients: int, seconds: float,
+        recorder: Recorder | None, timeout: float, seed: int) -> float:
+    weights = [ENDPOINTS[n][1] for n in names]
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=client, daemon=True,
+                         args=(base_url, names, weights, deadline, recorder, seed + i, timeout))
+        for i in range(clients)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def summarise(recorder: Recorder, elapsed: float) -> list[dict]:
+    rows = []
+    for name, lat in sorted(recorder.latencies.items()):
+        lat = sorted(lat)
+        errors = recorder.errors.get(name, 0)
+        p95_slo, p99_slo = SLOS.get(name, (None, None))
+        row = {
+            'endpoint': name, 'requests': len(lat), 'errors': errors,
+            'rps': round(len(lat) / elapsed, 2),
+            'p50_ms': round(percentile(lat, 50) * 1e3, 1),
+            'p95_ms': round(percentile(lat, 95) * 1e3, 1),
+            'p99_ms': round(percentile(lat, 99) * 1e3, 1),
+            'max_ms': round(lat[-1] * 1e3, 1),
+            'slo_p95_ms': p95_slo, 'slo_p99_ms': p99_slo,
+        }
+        row['slo_ok'] = (
+            errors / len(lat) <= MAX_ERROR_RATE
+            and (p95_slo is None or row['p95_ms'] <= p95_slo)
+            and (p99_slo is None or row['p99_ms'] <= p99_slo)
+        )
+        rows.append(row)
+    return rows
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--clients', type=int, default=16, help='concurrent client threads')
+    parser.add_argument('--duration', type=float, default=30, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='unmeasured seconds first (fills caches/pools)')
+    parser.add_argument('--only', help=f"comma-separated subset of {','.join(ENDPOINTS)}")
+    parser.add_argument('--timeout', type=float, default=30, help='per-request timeout (s)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='results JSON path (default benchmarks/results/load-<time>-<sha>.json)')
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.only.split(',')] if args.only else list(ENDPOINTS)
+    unknown = set(names) - set(ENDPOINTS)
+    if unknown:
+        sys.exit(f"Unknown endpoint(s): {', '.join(sorted(unknown))}")
+    base_url = args.base_url.rstrip('/')
+
+    if args.warmup > 0:
+        run(base_url, names, args.clients, args.warmup, None, args.timeout, args.seed + 10_000)
+    recorder = Recorder()
+    elapsed = run(base_url, names, args.clients, args.duration, recorder, args.timeout, args.seed)
+    rows = summarise(recorder, elapsed)
+
+    total = sum(r['requests'] for r in rows)
+    print(f"{'endpoint':<12} {'reqs':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} "
+          f"{'p99':>8} {'max':>8}  SLO p95/p99")
+    for r in rows:
+        slo = f"{r['slo_p95_ms']}/{r['slo_p99_ms']}" if r['slo_p95_ms'] else '-'
+        print(f"{r['endpoint']:<12} {r['requests']:>7} {r['errors']:>5} {r['rps']:>8.1f} "
+              f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['max_ms']:>8.1f}  "
+              f"{slo} {'ok' if r['slo_ok'] else 'MISSED'}")
+    print(f"\n{total} requests in {elapsed:.1f}s — {total / elapsed:.1f} req/s with {args.clients} clients")
+
+    sha = git_commit()
+    report = {
+        'commit': sha, 'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(), 'base_url': base_url,
+        'clients': args.clients, 'duration': round(elapsed, 2), 'results': rows,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"load-{datetime.now():%Y%m%d-%H%M%S}-{sha}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"Results written to {out}")
+
+    if not all(r['slo_ok'] for r in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
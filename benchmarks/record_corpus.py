@@ -0,0 +1,69 @@
+"""Record live eBay search pages into benchmarks/corpus/ for offline benchmarks.
+
+Fetches the sold and active results page for each query with the scraper's
+own fetchers (curl-cffi, then Zyte) and stores them gzipped as
+corpus/<CATEGORY>/<query>_<sold|active>.html.gz, the layout bench_scraper.py
+reads.  Defaults to the first query of each category in scheduler.py.
+
+    python benchmarks/record_corpus.py
+    python benchmarks/record_corpus.py --category GPU --query "NVIDIA RTX 30"
+"""
+
+import argparse
+import gzip
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+
+import EbayScraper
+import scheduler
+
+_SearchURL = vars(EbayScraper)["__SearchURL"]
+
+DEFAULT_QUERIES = {
+    'GPU': scheduler.GPU_QUERY_LIST[:1],
+    'CPU': scheduler.CPU_QUERY_LIST[:1],
+    'HDD': scheduler.HDD_QUERY_LIST[:1],
+    'RAM': scheduler.RAM_QUERY_LIST[:1],
+}
+
+
+def record(category: str, query: str) -> None:
+    for sold in (True, False):
+        url = _SearchURL(query, 'uk', 'used', 'auction', sold)
+        body = EbayScraper._fetch_direct(url) or EbayScraper._fetch_zyte(url)
+        if body is None:
+            print(f"FAILED  {category} '{query}' ({'sold' if sold else 'active'})")
+            continue
+        path = HERE / 'corpus' / category / f"{query.replace(' ', '_')}_{'sold' if sold else 'active'}.html.gz"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, 'wb') as f:
+            f.write(body)
+        print(f"saved   {path.relative_to(HERE)} ({len(body):,} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--category', choices=sorted(DEFAULT_QUERIES))
+    parser.add_argument('--query', help='search query (requires --category)')
+    args = parser.parse_args()
+
+    if args.query:
+        if not args.category:
+            parser.error('--query requires --category')
+        targets = {args.category: [args.query]}
+    elif args.category:
+        targets = {args.category: DEFAULT_QUERIES[args.category]}
+    else:
+        targets = DEFAULT_QUERIES
+
+    EbayScraper.reset_direct_session()
+    for category, queries in targets.items():
+        for query in queries:
+            record(category, query)
+
+
+if __name__ == '__main__':
+    main()
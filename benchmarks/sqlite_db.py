@@ -0,0 +1,88 @@
+"""SQLite stand-in for the scraper's MariaDB tables.
+
+Lets the bulk-upload path (_upload_batch / _upload) run unchanged without a
+database server: the cursor wrapper rewrites the MariaDB dialect the uploader
+uses (%s placeholders, the Scraper. schema prefix and ON DUPLICATE KEY
+UPDATE ... VALUES(col)) into SQLite's (?, no prefix, ON CONFLICT ... excluded.col).
+
+Timings are for comparing commits against each other, not for predicting
+MariaDB throughput — use bench_scraper.py --mariadb for that.
+"""
+
+import re
+import sqlite3
+from datetime import date, datetime
+
+sqlite3.register_adapter(datetime, lambda v: v.isoformat(sep=' '))
+sqlite3.register_adapter(date, lambda v: v.isoformat())
+
+# MariaDB-compatible DDL (also valid SQLite) for the tables the uploader writes.
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS EBAY (
+        ID BIGINT PRIMARY KEY, Title VARCHAR(300), Price INT, Bids INT,
+        EndTime DATETIME, SoldDate DATE, URL VARCHAR(500))""",
+    """CREATE TABLE IF NOT EXISTS GPU (
+        ID BIGINT PRIMARY KEY, Brand VARCHAR(50), Model VARCHAR(100), VRAM INT)""",
+    """CREATE TABLE IF NOT EXISTS CPU (
+        ID BIGINT PRIMARY KEY, Brand VARCHAR(50), Model VARCHAR(100), Socket VARCHAR(20), Cores INT)""",
+    """CREATE TABLE IF NOT EXISTS HDD (
+        ID BIGINT PRIMARY KEY, Brand VARCHAR(50), CapacityGB INT, Interface VARCHAR(10),
+        FormFactor VARCHAR(10), RPM INT)""",
+    """CREATE TABLE IF NOT EXISTS RAM (
+        ID BIGINT PRIMARY KEY, Brand VARCHAR(50), CapacityGB INT, Type VARCHAR(10), Speed INT)""",
+]
+TABLES = ('GPU', 'CPU', 'HDD', 'RAM', 'EBAY')
+
+_ON_DUPLICATE = re.compile(r'ON DUPLICATE KEY UPDATE(?P<sets>.*?);?\s*$', re.S)
+
+
+def translate(sql: str) -> str:
+    """Rewrite one MariaDB statement from EbayScraper into SQLite syntax."""
+    sql = sql.replace('Scraper.', '').replace('%s', '?')
+    m = _ON_DUPLICATE.search(sql)
+    if m:
+        sets = re.sub(r'VALUES\((\w+)\)', r'excluded.\1', m.group('sets'))
+        sql = sql[:m.start()] + 'ON CONFLICT(ID) DO UPDATE SET' + sets
+    return sql
+
+
+class Cursor:
+    """DB-API cursor facade over sqlite3 accepting EbayScraper's SQL."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._cur = conn.cursor()
+
+    def execute(self, sql, params=()):
+        self._cur.execute(translate(sql), params)
+
+    def executemany(self, sql, rows):
+        self._cur.executemany(translate(sql), rows)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+
+def connect(path: str = ':memory:') -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    for ddl in SCHEMA:
+        conn.execute(ddl)
+    return conn
+
+
+def reset(conn) -> None:
+    """Empty every uploader table (works on sqlite3 and mariadb connections)."""
+    cur = conn.cursor()
+    for table in TABLES:
+        cur.execute(f"DELETE FROM {table}")
+    conn.commit()
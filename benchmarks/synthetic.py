@@ -0,0 +1,142 @@
+"""Synthetic eBay listings and search pages for benchmarks and load tests.
+
+Titles are drawn from per-category pools that exercise the same extractor
+paths as real listings (brand/model/VRAM, socket/cores, capacity/interface,
+DDR type/speed), with a few system listings mixed in so the skip rules run
+too.  Everything is seeded, so a given (category, n, sold, seed) always
+produces the same page.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+CATEGORIES = ('GPU', 'CPU', 'HDD', 'RAM')
+
+_GPU_BRANDS = ['ASUS', 'MSI', 'Gigabyte', 'Zotac', 'EVGA', 'Palit', 'Sapphire', 'PowerColor', 'XFX']
+_GPU_MODELS = [
+    ('GTX', '970', 4), ('GTX', '1060', 6), ('GTX', '1070', 8), ('GTX', '1080 Ti', 11),
+    ('RTX', '2060', 6), ('RTX', '2070 Super', 8), ('RTX', '3060', 12), ('RTX', '3070', 8),
+    ('RTX', '3080', 10), ('RTX', '3090', 24), ('RTX', '4070', 12), ('RTX', '4080', 16),
+    ('RX', '5700 XT', 8), ('RX', '6600', 8), ('RX', '6800 XT', 16), ('RX', '7900 XTX', 24),
+]
+_GPU_SUFFIXES = ['OC', 'Gaming X Trio', 'TUF Gaming', 'Founders Edition', 'Dual Fan', '']
+
+_CPU_MODELS = [
+    ('Intel Core', 'i5-6600K', 'LGA1151', 4), ('Intel Core', 'i7-8700K', 'LGA1151', 6),
+    ('Intel Core', 'i5-12400F', 'LGA1700', 6), ('Intel Core', 'i9-9900K', 'LGA1151', 8),
+    ('Intel Core', 'i3-10100', 'LGA1200', 4), ('AMD Ryzen 5', '3600', 'AM4', 6),
+    ('AMD Ryzen 7', '5800X', 'AM4', 8), ('AMD Ryzen 9', '5950X', 'AM4', 16),
+    ('AMD Ryzen 5', '7600X', 'AM5', 6),
+]
+
+_HDD_BRANDS = ['Seagate', 'WD', 'HGST', 'Toshiba']
+_HDD_SIZES = [1, 2, 3, 4, 6, 8, 10, 12]
+
+_RAM_BRANDS = ['Corsair Vengeance', 'Kingston Fury', 'G.Skill Ripjaws', 'Crucial', 'HyperX']
+_RAM_KITS = [('DDR3', 8, 1600), ('DDR3', 16, 1866), ('DDR4', 8, 2666), ('DDR4', 16, 3200),
+             ('DDR4', 32, 3600), ('DDR5', 16, 4800), ('DDR5', 32, 6000), ('DDR5', 64, 5600)]
+
+_BASE_PRICE = {'GPU': 250.0, 'CPU': 110.0, 'HDD': 45.0, 'RAM': 40.0}
+
+_SYSTEM_TITLES = [
+    'Gaming PC RTX 3070 Ryzen 5 5600X 16GB RAM 1TB SSD',
+    'Dell OptiPlex 7050 i5 Desktop PC 8GB 256GB SSD',
+    'HP EliteDesk 800 G3 Mini PC i7 16GB',
+]
+
+
+def item(category: str, rng: random.Random) -> tuple[str, dict | None]:
+    """One realistic listing: (title, detail-table columns).
+
+    The columns are what the parser would extract into the GPU/CPU/HDD/RAM
+    table for that title; None for a system listing the parser skips.
+    """
+    if rng.random() < 0.03:
+        return rng.choice(_SYSTEM_TITLES), None
+    if category == 'GPU':
+        series, number, vram = rng.choice(_GPU_MODELS)
+        brand = rng.choice(_GPU_BRANDS)
+        maker = 'NVIDIA GeForce' if series in ('GTX', 'RTX') else 'AMD Radeon'
+        return (f"{brand} {maker} {series} {number} {vram}GB {rng.choice(_GPU_SUFFIXES)}".strip(),
+                {'Brand': brand, 'Model': f"{series} {number.upper()}", 'VRAM': vram})
+    if category == 'CPU':
+        family, model, socket, cores = rng.choice(_CPU_MODELS)
+        return (f"{family} {model} {cores} Core {socket} Processor CPU",
+                {'Brand': family.split()[0], 'Model': model if family.startswith('Intel') else f"Ryzen {family[-1]} {model}",
+                 'Socket': socket, 'Cores': cores})
+    if category == 'HDD':
+        brand, size = rng.choice(_HDD_BRANDS), rng.choice(_HDD_SIZES)
+        iface = rng.choice(['SATA', 'SATA', 'SAS'])
+        rpm = rng.choice(['7200RPM', '5400RPM', '7.2K'])
+        return (f"{brand} {size}TB {iface} 3.5\" {rpm} Hard Drive",
+                {'Brand': brand, 'CapacityGB': size * 1000, 'Interface': iface,
+                 'FormFactor': '3.5"', 'RPM': 5400 if rpm == '5400RPM' else 7200})
+    brand = rng.choice(_RAM_BRANDS)
+    ram_type, cap, speed = rng.choice(_RAM_KITS)
+    return (f"{brand} {cap}GB ({cap // 2}GB x2) {ram_type} {speed}MHz Desktop RAM",
+            {'Brand': brand.split()[0], 'CapacityGB': cap, 'Type': ram_type, 'Speed': speed})
+
+
+def title(category: str, rng: random.Random) -> str:
+    """One realistic listing title for `category`."""
+    return item(category, rng)[0]
+
+
+def price(category: str, rng: random.Random) -> float:
+    """Log-normal price around the category's typical level, with rare junk listings."""
+    if rng.random() < 0.02:
+        return rng.choice([0.99, 1.50, 9999.0])
+    return round(_BASE_PRICE[category] * rng.lognormvariate(0, 0.45), 2)
+
+
+def card_html(ebay_id: int, title: str, price: float, *, bids: int = 0,
+              sold_on: datetime | None = None, ends_at: datetime | None = None) -> str:
+    """One su-card-container in the markup shape __ParseCard reads."""
+    extra = ''
+    if sold_on is not None:
+        extra += f'<span class="su-styled-text positive default">Sold {sold_on:%d %b %Y}</span>'
+    if ends_at is not None:
+        extra += (f'<span class="s-card__time-left">{ends_at.hour}h {ends_at.minute}m left</span>'
+                  f'<span class="s-card__time-end">(Today {ends_at:%H:%M})</span>')
+    return (
+        '<div class="su-card-container su-card-container--horizontal">'
+        '<div class="s-card__media"><img src="https://i.ebayimg.com/images/g/x/s-l500.webp" alt=""/></div>'
+        f'<div class="s-card__title"><span>{title}</span></div>'
+        f'<span class="s-card__price">£{price:,.2f}</span>'
+        '<span class="su-styled-text secondary large"><span>+£4.99 postage</span></span>'
+        f'<span class="su-styled-text secondary large">{bids} bids</span>'
+        f'{extra}'
+        f'<a href="https://www.ebay.co.uk/itm/{ebay_id}?hash=item{ebay_id:x}&amp;var=0">link</a>'
+        '</div>'
+    )
+
+
+def listings(category: str, n: int, *, sold: bool, seed: int = 0, id_base: int = 100_000_000_000):
+    """Yield (ebay_id, title, price, bids, sold_on, ends_at) tuples."""
+    rng = random.Random(f"{category}-{sold}-{seed}")
+    today = datetime(2026, 3, 1, 12, 0)
+    for i in range(n):
+        yield (
+            id_base + i,
+            title(category, rng),
+            price(category, rng),
+            rng.randint(0, 30),
+            today - timedelta(days=rng.randint(0, 90)) if sold else None,
+            None if sold else today + timedelta(minutes=rng.randint(1, 600)),
+        )
+
+
+def search_page(category: str, n: int, *, sold: bool, seed: int = 0) -> str:
+    """A full results page with `n` cards plus the leading placeholder card.
+
+    Surrounding markup is padded to roughly the size of the scripts/styles
+    on a real eBay page (~300 KB) so small pages are still realistic.
+    """
+    cards = [card_html(1, 'Shop on eBay', 20.0)]
+    for ebay_id, t, p, bids, sold_on, ends_at in listings(category, n, sold=sold, seed=seed):
+        cards.append(card_html(ebay_id, t, p, bids=bids, sold_on=sold_on, ends_at=ends_at))
+    filler = "<script>var srp={};" + "srp.x='<div>';" * 20_000 + "</script>"
+    return (
+        "<!DOCTYPE html><html><head><title>eBay search</title>" + filler + "</head><body>"
+        + "".join(cards) + "</body></html>"
+    )
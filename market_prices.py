@@ -0,0 +1,240 @@
+"""Market-price estimates per model key, materialised in Scraper.MarketPrices.
+
+The deal queries used to re-aggregate every sold listing twice (a σ pass and
+a filtered-mean pass) on each request.  Instead the scraper refreshes one row
+per model key after each full scrape, and App.py compares active listings
+against a chosen estimator column:
+
+  MeanPrice         mean of sales within ±2σ — the original deal baseline
+  MedianPrice       median of all sales
+  TrimmedMeanPrice  mean after dropping the top and bottom TRIM_FRACTION
+  DecayedPrice      exponentially time-weighted mean (half-life in days)
+
+Refreshes are incremental: only keys with a sale dated within BACKFILL_DAYS
+of the last refresh are recomputed.  A full rebuild runs when the oldest row is older than
+FULL_REFRESH_HOURS, so decayed averages keep ageing and keys that lost their
+history are pruned.
+"""
+
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import price_stats
+
+# Minimum priced sales before a key's estimates are trusted.
+MIN_SOLD = 5
+
+# ±k·σ band for MeanPrice, matching the original ModelStats CTE.
+SIGMA_K = 2
+
+TRIM_FRACTION = 0.1
+
+HALF_LIFE_DAYS = float(os.environ.get('MARKET_HALF_LIFE_DAYS', '30'))
+
+FULL_REFRESH_HOURS = int(os.environ.get('MARKET_FULL_REFRESH_HOURS', '24'))
+
+# Days before the last refresh an incremental pass still looks for sales.
+# SoldDate is the auction's end, not when the row was written: outcome
+# verification resolves auctions up to OUTCOME_GIVE_UP_DAYS (7) after they
+# ended, so a sale can land that far in the past.  One day of slack on top.
+BACKFILL_DAYS = int(os.environ.get('MARKET_BACKFILL_DAYS', '8'))
+
+# Estimator name (MARKET_ESTIMATOR in App.py) → MarketPrices column.
+ESTIMATORS = {
+    'mean':    'MeanPrice',
+    'median':  'MedianPrice',
+    'trimmed': 'TrimmedMeanPrice',
+    'decayed': 'DecayedPrice',
+}
+
+# Category → (detail table, key columns, extra WHERE on the detail table).
+# Key columns mirror the GROUP BY of the original per-category deal queries.
+CATEGORIES = {
+    'GPU': ('GPU', ('Model',),                   'x.Model IS NOT NULL'),
+    'CPU': ('CPU', ('Model',),                   'x.Model IS NOT NULL'),
+    'HDD': ('HDD', ('CapacityGB', 'Interface'),  'x.CapacityGB IS NOT NULL'),
+    'RAM': ('RAM', ('Type', 'CapacityGB'),       'x.Type IS NOT NULL AND x.CapacityGB IS NOT NULL'),
+}
+
+KEY_COLUMNS = ('Model', 'CapacityGB', 'Interface', 'Type')
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS Scraper.MarketPrices (
+        Category         VARCHAR(10)   NOT NULL,
+        ModelKey         VARCHAR(150)  NOT NULL,
+        Model            VARCHAR(100)  NULL,
+        CapacityGB       INT           NULL,
+        Interface        VARCHAR(10)   NULL,
+        Type             VARCHAR(10)   NULL,
+        SoldCount        INT           NOT NULL,
+        MeanPrice        DECIMAL(10,2) NOT NULL,
+        MedianPrice      DECIMAL(10,2) NOT NULL,
+        TrimmedMeanPrice DECIMAL(10,2) NOT NULL,
+        DecayedPrice     DECIMAL(10,2) NOT NULL,
+        MinPrice         DECIMAL(10,2) NOT NULL,
+        MaxPrice         DECIMAL(10,2) NOT NULL,
+        LastSoldDate     DATE          NULL,
+        UpdatedAt        DATETIME      NOT NULL,
+        PRIMARY KEY (Category, ModelKey)
+    )
+"""
+
+_UPSERT = """
+    INSERT INTO Scraper.MarketPrices
+        (Category, ModelKey, Model, CapacityGB, Interface, Type, SoldCount,
+         MeanPrice, MedianPrice, TrimmedMeanPrice, DecayedPrice,
+         MinPrice, MaxPrice, LastSoldDate, UpdatedAt)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        SoldCount        = VALUES(SoldCount),
+        MeanPrice        = VALUES(MeanPrice),
+        MedianPrice      = VALUES(MedianPrice),
+        TrimmedMeanPrice = VALUES(TrimmedMeanPrice),
+        DecayedPrice     = VALUES(DecayedPrice),
+        MinPrice         = VALUES(MinPrice),
+        MaxPrice         = VALUES(MaxPrice),
+        LastSoldDate     = VALUES(LastSoldDate),
+        UpdatedAt        = VALUES(UpdatedAt);
+"""
+
+
+@dataclass(slots=True)
+class MarketEstimate:
+    sold_count: int
+    mean: float
+    median: float
+    trimmed_mean: float
+    decayed: float
+    min_price: float
+    max_price: float
+    last_sold: Optional[date]
+
+
+def _as_date(value) -> Optional[date]:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def estimate(sales: list[tuple[float, date]], today: date,
+             half_life_days: float = HALF_LIFE_DAYS) -> Optional[MarketEstimate]:
+    """Compute every estimator for one model key from (price £, sold date) pairs.
+
+    Returns None when there are fewer than MIN_SOLD sales.
+    """
+    if len(sales) < MIN_SOLD:
+        return None
+    prices = [p for p, _ in sales]
+
+    # Mean / min / max inside ±SIGMA_K·σ (population σ, as SQL STDDEV).
+    avg = price_stats.mean(prices)
+    spread = SIGMA_K * price_stats.stdev(prices, avg, ddof=0)
+    banded = [p for p in prices if avg + spread >= p >= avg - spread]
+
+    ordered = sorted(prices)
+    trim = int(len(ordered) * TRIM_FRACTION)
+    trimmed = ordered[trim:len(ordered) - trim]
+
+    weight_sum = weighted = 0.0
+    last_sold = None
+    for price, sold in sales:
+        sold = _as_date(sold)
+        age = max(0, (today - sold).days) if sold else 0
+        w = 0.5 ** (age / half_life_days)
+        weight_sum += w
+        weighted += w * price
+        if sold and (last_sold is None or sold > last_sold):
+            last_sold = sold
+
+    return MarketEstimate(
+        sold_count=len(prices),
+        mean=round(price_stats.mean(banded), 2),
+        median=round(price_stats.quantile(ordered, 0.5), 2),
+        trimmed_mean=round(sum(trimmed) / len(trimmed), 2),
+        decayed=round(weighted / weight_sum, 2),
+        min_price=round(min(banded), 2),
+        max_price=round(max(banded), 2),
+        last_sold=last_sold,
+    )
+
+
+def model_key(key: tuple) -> str:
+    """Stable string primary key for a tuple of key-column values."""
+    return '|'.join('' if v is None else str(v) for v in key)
+
+
+def _history_sql(category: str, since: Optional[date]) -> str:
+    table, keys, where = CATEGORIES[category]
+    cols = ', '.join(f'x.{k}' for k in keys)
+    sql = f"""
+        SELECT {cols}, e.Price, e.SoldDate
+        FROM   Scraper.{table} x
+        JOIN   Scraper.EBAY e ON e.ID = x.ID
+    """
+    if since is not None:
+        # Restrict to keys with at least one sale since the last refresh.
+        # <=> so a NULL HDD Interface still matches its own key.
+        on = ' AND '.join(f'd.{k} <=> x.{k}' for k in keys)
+        sql += f"""
+        JOIN  (SELECT DISTINCT {cols}
+               FROM   Scraper.{table} x
+               JOIN   Scraper.EBAY e ON e.ID = x.ID
+               WHERE  e.SoldDate >= %s AND {where}) d ON {on}
+        """
+    sql += f"""
+        WHERE  e.SoldDate IS NOT NULL AND e.Price IS NOT NULL AND {where}
+    """
+    return sql
+
+
+def refresh(cur, full: bool = False, now: datetime = None) -> int:
+    """Recompute MarketPrices rows on `cur`; the caller commits.
+
+    Returns the number of keys written.
+    """
+    now = (now or datetime.now()).replace(microsecond=0)
+    cur.execute(CREATE_TABLE)
+
+    since = None
+    if not full:
+        cur.execute("SELECT MIN(UpdatedAt), MAX(UpdatedAt) FROM Scraper.MarketPrices")
+        oldest, newest = cur.fetchone()
+        if newest is not None and oldest >= now - timedelta(hours=FULL_REFRESH_HOURS):
+            # Overlap covers sales written since the last refresh but dated
+            # before it (outcome verification backdates them).
+            since = newest.date() - timedelta(days=BACKFILL_DAYS)
+
+    written = 0
+    for category, (_, keys, _) in CATEGORIES.items():
+        cur.execute(_history_sql(category, since), (since,) if since else ())
+        history: dict[tuple, list] = {}
+        for row in cur.fetchall():
+            history.setdefault(tuple(row[:len(keys)]), []).append(
+                (row[len(keys)] / 100, row[len(keys) + 1])
+            )
+
+        upserts, stale = [], []
+        for key, sales in history.items():
+            est = estimate(sales, now.date())
+            if est is None:
+                stale.append((category, model_key(key)))
+                continue
+            named = dict(zip(keys, key))
+            upserts.append((
+                category, model_key(key), *(named.get(c) for c in KEY_COLUMNS),
+                est.sold_count, est.mean, est.median, est.trimmed_mean, est.decayed,
+                est.min_price, est.max_price, est.last_sold, now,
+            ))
+
+        if upserts:
+            cur.executemany(_UPSERT, upserts)
+        if stale:
+            cur.executemany(
+                "DELETE FROM Scraper.MarketPrices WHERE Category = %s AND ModelKey = %s", stale
+            )
+        written += len(upserts)
+
+    if since is None:
+        # Full rebuild: anything not rewritten above no longer has enough history.
+        cur.execute("DELETE FROM Scraper.MarketPrices WHERE UpdatedAt < %s", (now,))
+    return written
@@ -0,0 +1,272 @@
+"""Price-guide snapshots: the four σ-filtered price-guide aggregations,
+precomputed once per full scrape instead of on every /api/price-guide call.
+
+After each full run the scheduler calls publish(), which runs QUERIES,
+serialises the result as deterministic JSON, gzips it and stores it in
+Scraper.PriceGuideSnapshots keyed by a content hash.  App.py serves the
+newest snapshot as-is (gzip passthrough, ETag = version) and only falls
+back to running QUERIES live when no snapshot exists yet:
+
+    GET /api/price-guide             newest snapshot, short max-age + ETag
+    GET /api/price-guide/<version>   that exact snapshot, cacheable forever
+
+Identical data hashes to the same version, so a run that changed nothing
+leaves the existing snapshot (and every client's cached copy) valid.
+"""
+
+import gzip
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+# Snapshots kept after each publish; older ones are deleted.
+KEEP_SNAPSHOTS = 5
+
+PRICE_GUIDE_GPU_QUERY = """
+WITH RawStats AS (
+    SELECT g.Model,
+           AVG(e.Price / 100)    AS RawAvg,
+           STDDEV(e.Price / 100) AS StdDev,
+           COUNT(*)              AS SoldCount
+    FROM   Scraper.GPU g
+    JOIN   Scraper.EBAY e ON e.ID = g.ID
+    WHERE  e.SoldDate IS NOT NULL AND g.Model IS NOT NULL AND e.Price IS NOT NULL
+    GROUP  BY g.Model
+    HAVING COUNT(*) >= 3
+),
+CleanStats AS (
+    SELECT g.Model,
+           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
+           ROUND(MIN(e.Price / 100), 2) AS MinPrice,
+           ROUND(MAX(e.Price / 100), 2) AS MaxPrice
+    FROM   Scraper.GPU g
+    JOIN   Scraper.EBAY e ON e.ID = g.ID
+    JOIN   RawStats rs ON rs.Model = g.Model
+    WHERE  e.SoldDate IS NOT NULL AND g.Model IS NOT NULL AND e.Price IS NOT NULL
+      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
+                                AND rs.RawAvg + 2 * rs.StdDev
+    GROUP  BY g.Model
+)
+SELECT rs.Model,
+       cs.AvgPrice,
+       cs.MinPrice,
+       cs.MaxPrice,
+       rs.SoldCount
+FROM   RawStats rs
+JOIN   CleanStats cs ON cs.Model = rs.Model
+ORDER  BY cs.AvgPrice DESC;
+"""
+
+PRICE_GUIDE_CPU_QUERY = """
+WITH RawStats AS (
+    SELECT c.Model,
+           AVG(e.Price / 100)    AS RawAvg,
+           STDDEV(e.Price / 100) AS StdDev,
+           COUNT(*)              AS SoldCount
+    FROM   Scraper.CPU c
+    JOIN   Scraper.EBAY e ON e.ID = c.ID
+    WHERE  e.SoldDate IS NOT NULL AND c.Model IS NOT NULL AND e.Price IS NOT NULL
+    GROUP  BY c.Model
+    HAVING COUNT(*) >= 3
+),
+CleanStats AS (
+    SELECT c.Model,
+           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
+           ROUND(MIN(e.Price / 100), 2) AS MinPrice,
+           ROUND(MAX(e.Price / 100), 2) AS MaxPrice
+    FROM   Scraper.CPU c
+    JOIN   Scraper.EBAY e ON e.ID = c.ID
+    JOIN   RawStats rs ON rs.Model = c.Model
+    WHERE  e.SoldDate IS NOT NULL AND c.Model IS NOT NULL AND e.Price IS NOT NULL
+      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
+                                AND rs.RawAvg + 2 * rs.StdDev
+    GROUP  BY c.Model
+)
+SELECT rs.Model,
+       cs.AvgPrice,
+       cs.MinPrice,
+       cs.MaxPrice,
+       rs.SoldCount
+FROM   RawStats rs
+JOIN   CleanStats cs ON cs.Model = rs.Model
+ORDER  BY cs.AvgPrice DESC;
+"""
+
+PRICE_GUIDE_HDD_QUERY = """
+WITH RawStats AS (
+    SELECT h.CapacityGB, h.Interface,
+           AVG(e.Price / 100)    AS RawAvg,
+           STDDEV(e.Price / 100) AS StdDev,
+           COUNT(*)              AS SoldCount
+    FROM   Scraper.HDD h
+    JOIN   Scraper.EBAY e ON e.ID = h.ID
+    WHERE  e.SoldDate IS NOT NULL AND h.CapacityGB IS NOT NULL AND e.Price IS NOT NULL
+    GROUP  BY h.CapacityGB, h.Interface
+    HAVING COUNT(*) >= 3
+),
+CleanStats AS (
+    SELECT h.CapacityGB, h.Interface,
+           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
+           ROUND(MIN(e.Price / 100), 2) AS MinPrice,
+           ROUND(MAX(e.Price / 100), 2) AS MaxPrice
+    FROM   Scraper.HDD h
+    JOIN   Scraper.EBAY e ON e.ID = h.ID
+    JOIN   RawStats rs ON rs.CapacityGB = h.CapacityGB AND rs.Interface <=> h.Interface
+    WHERE  e.SoldDate IS NOT NULL AND h.CapacityGB IS NOT NULL AND e.Price IS NOT NULL
+      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
+                                AND rs.RawAvg + 2 * rs.StdDev
+    GROUP  BY h.CapacityGB, h.Interface
+)
+SELECT rs.CapacityGB, rs.Interface,
+       cs.AvgPrice,
+       cs.MinPrice,
+       cs.MaxPrice,
+       rs.SoldCount
+FROM   RawStats rs
+JOIN   CleanStats cs ON cs.CapacityGB = rs.CapacityGB AND cs.Interface <=> rs.Interface
+ORDER  BY rs.CapacityGB DESC, cs.AvgPrice DESC;
+"""
+
+PRICE_GUIDE_RAM_QUERY = """
+WITH RawStats AS (
+    SELECT r.Type, r.CapacityGB,
+           AVG(e.Price / 100)    AS RawAvg,
+           STDDEV(e.Price / 100) AS StdDev,
+           COUNT(*)              AS SoldCount
+    FROM   Scraper.RAM r
+    JOIN   Scraper.EBAY e ON e.ID = r.ID
+    WHERE  e.SoldDate IS NOT NULL AND r.Type IS NOT NULL AND r.CapacityGB IS NOT NULL
+      AND  e.Price IS NOT NULL
+    GROUP  BY r.Type, r.CapacityGB
+    HAVING COUNT(*) >= 3
+),
+CleanStats AS (
+    SELECT r.Type, r.CapacityGB,
+           ROUND(AVG(e.Price / 100), 2) AS AvgPrice,
+           ROUND(MIN(e.Price / 100), 2) AS MinPrice,
+           ROUND(MAX(e.Price / 100), 2) AS MaxPrice
+    FROM   Scraper.RAM r
+    JOIN   Scraper.EBAY e ON e.ID = r.ID
+    JOIN   RawStats rs ON rs.Type = r.Type AND rs.CapacityGB = r.CapacityGB
+    WHERE  e.SoldDate IS NOT NULL AND r.Type IS NOT NULL AND r.CapacityGB IS NOT NULL
+      AND  e.Price IS NOT NULL
+      AND  (e.Price / 100) BETWEEN rs.RawAvg - 2 * rs.StdDev
+                                AND rs.RawAvg + 2 * rs.StdDev
+    GROUP  BY r.Type, r.CapacityGB
+)
+SELECT rs.Type, rs.CapacityGB,
+       cs.AvgPrice,
+       cs.MinPrice,
+       cs.MaxPrice,
+       rs.SoldCount
+FROM   RawStats rs
+JOIN   CleanStats cs ON cs.Type = rs.Type AND cs.CapacityGB = rs.CapacityGB
+ORDER  BY rs.Type, rs.CapacityGB;
+"""
+
+# Category key in the response → query.
+QUERIES = {
+    'gpu': PRICE_GUIDE_GPU_QUERY,
+    'cpu': PRICE_GUIDE_CPU_QUERY,
+    'hdd': PRICE_GUIDE_HDD_QUERY,
+    'ram': PRICE_GUIDE_RAM_QUERY,
+}
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS Scraper.PriceGuideSnapshots (
+        Version     CHAR(16)   NOT NULL PRIMARY KEY,   -- sha256 prefix of the components JSON
+        GeneratedAt DATETIME   NOT NULL,
+        Payload     MEDIUMBLOB NOT NULL,               -- gzip-compressed response body
+        INDEX idx_generated (GeneratedAt)
+    )
+"""
+
+LATEST_SQL = """
+    SELECT Version, GeneratedAt, Payload FROM Scraper.PriceGuideSnapshots
+    ORDER BY GeneratedAt DESC LIMIT 1
+"""
+
+VERSION_SQL = """
+    SELECT Version, GeneratedAt, Payload FROM Scraper.PriceGuideSnapshots WHERE Version = %s
+"""
+
+
+def json_default(obj):
+    """JSON fallback for DB values — DECIMAL as strings, dates as ISO 8601.
+
+    Shared with App.py's jsonify, so snapshots and live responses match.
+    """
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, default=json_default, sort_keys=True, separators=(',', ':')).encode()
+
+
+def fetch_dicts(cur) -> list[dict]:
+    """fetchall() from a plain (tuple) cursor as a list of column → value dicts."""
+    cols = [d[0] for d in cur.description]
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+def fetch_components(cur) -> dict:
+    """Run every price-guide query on `cur` → {'gpu': [row dict, ...], ...}."""
+    components = {}
+    for key, query in QUERIES.items():
+        cur.execute(query)
+        components[key] = fetch_dicts(cur)
+    return components
+
+
+def build(components: dict, generated_at: datetime) -> tuple[str, bytes]:
+    """Serialise `components` into a snapshot → (version, gzip payload).
+
+    The version hashes only the components, so it is stable across runs
+    that produced the same numbers; gzip's mtime is pinned for the same reason.
+    """
+    version = hashlib.sha256(_dumps(components)).hexdigest()[:16]
+    body = _dumps({
+        'status': 'ok',
+        'version': version,
+        'generated_at': generated_at,
+        'components': components,
+    })
+    return version, gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def publish(cur, now: datetime = None) -> tuple[str, bool]:
+    """Build a snapshot from the live tables and store it; the caller commits.
+
+    Returns (version, created) — created is False when the newest snapshot
+    already has this content.
+    """
+    now = (now or datetime.now()).replace(microsecond=0)
+    cur.execute(CREATE_TABLE)
+    version, payload = build(fetch_components(cur), now)
+
+    cur.execute(LATEST_SQL)
+    latest = cur.fetchone()
+    if latest and latest[0] == version:
+        return version, False
+
+    # Content seen before (A → B → A): re-stamp it as the newest.
+    cur.execute("DELETE FROM Scraper.PriceGuideSnapshots WHERE Version = %s", (version,))
+    cur.execute(
+        "INSERT INTO Scraper.PriceGuideSnapshots (Version, GeneratedAt, Payload) VALUES (%s, %s, %s)",
+        (version, now, payload),
+    )
+    cur.execute(f"""
+        DELETE FROM Scraper.PriceGuideSnapshots
+        WHERE Version NOT IN (
+            SELECT Version FROM (
+                SELECT Version FROM Scraper.PriceGuideSnapshots
+                ORDER BY GeneratedAt DESC LIMIT {KEEP_SNAPSHOTS}
+            ) keep
+        )
+    """)
+    return version, True
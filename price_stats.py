@@ -0,0 +1,123 @@
+"""Price statistics and outlier filtering for scraped listings.
+
+Every function is a single pass (or one sort) over the prices, so large
+result pages stay cheap.  NumPy is used when installed and the list is big
+enough to be worth the array conversion; otherwise plain Python is used and
+results match the original __Average / __StDev / __StDevParse exactly.
+
+Outlier methods (select with PRICE_OUTLIER_METHOD in EbayScraper):
+  stdev — keep mean ± k·σ (sample σ, default k=1; the historical behaviour)
+  iqr   — keep [Q1 − k·IQR, Q3 + k·IQR]  (default k=1.5, Tukey fences)
+  mad   — keep median ± k·1.4826·MAD     (default k=3)
+"""
+
+import math
+
+try:
+    import numpy as np
+except ImportError:  # optional — pure-Python fallback below
+    np = None
+
+# Below this many values the list → array conversion costs more than it saves.
+NUMPY_MIN_SIZE = 256
+
+DEFAULT_K = {'stdev': 1.0, 'iqr': 1.5, 'mad': 3.0}
+METHODS = tuple(DEFAULT_K)
+
+# Scales MAD to a consistent estimator of σ for normally distributed data.
+_MAD_SCALE = 1.4826
+
+
+def _use_numpy(values) -> bool:
+    return np is not None and len(values) >= NUMPY_MIN_SIZE
+
+
+def mean(values) -> float:
+    """Arithmetic mean; 0 for an empty list (matches the old __Average)."""
+    n = len(values)
+    if n == 0:
+        return 0
+    if _use_numpy(values):
+        return float(np.mean(np.asarray(values, dtype=float)))
+    return sum(values) / n
+
+
+def stdev(values, avg: float = None, ddof: int = 1) -> float:
+    """Sample standard deviation (ddof=0 for population σ, as SQL STDDEV);
+    0 for fewer than two values.
+
+    Pass `avg` when the mean is already known to skip recomputing it.
+    """
+    n = len(values)
+    if n <= 1:
+        return 0
+    if _use_numpy(values):
+        return float(np.std(np.asarray(values, dtype=float), ddof=ddof))
+    if avg is None:
+        avg = sum(values) / n
+    return (sum((x - avg) ** 2 for x in values) / (n - ddof)) ** 0.5
+
+
+def quantile(sorted_values, q: float) -> float:
+    """Linear-interpolated quantile of an already sorted list (NumPy's default)."""
+    n = len(sorted_values)
+    if n == 0:
+        return 0
+    pos = (n - 1) * q
+    lo = math.floor(pos)
+    hi = min(lo + 1, n - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def median(values) -> float:
+    """Median; 0 for an empty list."""
+    if not values:
+        return 0
+    if _use_numpy(values):
+        return float(np.median(np.asarray(values, dtype=float)))
+    return quantile(sorted(values), 0.5)
+
+
+def mad(values, med: float = None) -> float:
+    """Median absolute deviation (unscaled)."""
+    if not values:
+        return 0
+    if med is None:
+        med = median(values)
+    if _use_numpy(values):
+        return float(np.median(np.abs(np.asarray(values, dtype=float) - med)))
+    return quantile(sorted(abs(x - med) for x in values), 0.5)
+
+
+def bounds(values, method: str = 'stdev', k: float = None) -> tuple[float, float]:
+    """Return the inclusive (low, high) range of values to keep."""
+    if method not in DEFAULT_K:
+        raise ValueError(f"Unknown outlier method '{method}', use one of: {', '.join(METHODS)}")
+    if k is None:
+        k = DEFAULT_K[method]
+
+    if method == 'stdev':
+        avg = mean(values)
+        spread = stdev(values, avg)
+        return avg - k * spread, avg + k * spread
+
+    if method == 'iqr':
+        if _use_numpy(values):
+            q1, q3 = (float(q) for q in np.quantile(np.asarray(values, dtype=float), [0.25, 0.75]))
+        else:
+            ordered = sorted(values)
+            q1, q3 = quantile(ordered, 0.25), quantile(ordered, 0.75)
+        spread = q3 - q1
+        return q1 - k * spread, q3 + k * spread
+
+    med = median(values)
+    spread = _MAD_SCALE * mad(values, med)
+    return med - k * spread, med + k * spread
+
+
+def filter_outliers(values, method: str = 'stdev', k: float = None) -> list:
+    """Return the values inside bounds(), preserving order."""
+    if not values:
+        return []
+    low, high = bounds(values, method, k)
+    return [x for x in values if high >= x >= low]
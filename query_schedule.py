@@ -0,0 +1,150 @@
+"""Per-query scrape scheduling driven by each query's recent yield.
+
+The full scrape used to fetch every search query at the same hourly cadence,
+so "NVIDIA GTX 9" cost as much as "NVIDIA RTX 30" while turning up a
+fraction of the listings.  Instead every query keeps a smoothed yield score
+built from what its runs found:
+
+  new_ids      listings not already in EBAY
+  deals        active listings ending within DEAL_WINDOW_HOURS priced at
+               least DEAL_DISCOUNT% under their model's market estimate
+  ending_soon  active listings ending within DEAL_WINDOW_HOURS
+
+A global budget of query runs per hour (each run is one sold and one active
+search page) is shared out in proportion to those scores, giving each query
+its own interval between MIN_INTERVAL_MINUTES and MAX_INTERVAL_MINUTES.  A
+token bucket holding one hour of budget caps the actual spend, so clamped
+intervals and startup (when every query is due) can't exceed it.
+"""
+
+import os
+import statistics
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+# Query runs per hour across all categories.  The default matches the old
+# fixed schedule: every query once an hour.
+BUDGET_PER_HOUR = float(os.environ.get('QUERY_BUDGET_PER_HOUR', '26'))
+
+MIN_INTERVAL_MINUTES = int(os.environ.get('QUERY_MIN_INTERVAL_MINUTES', '15'))
+MAX_INTERVAL_MINUTES = int(os.environ.get('QUERY_MAX_INTERVAL_MINUTES', '360'))
+
+# Mirror the dashboard defaults (/api/deals window=2, min_discount=20).
+DEAL_WINDOW_HOURS = 2
+DEAL_DISCOUNT = 20
+
+# Relative worth of each signal in the yield score.  A surfaced deal is what
+# the site exists for; listings ending soon are the pool deals come from.
+WEIGHTS = {'new_ids': 1.0, 'deals': 10.0, 'ending_soon': 0.5}
+
+# Weight of the newest run in the exponentially smoothed score.
+SMOOTHING = 0.3
+
+# Added to every score so a query that found nothing still gets an occasional
+# run — listings come back as cards launch, and prices drop.
+SCORE_FLOOR = 1.0
+
+
+@dataclass
+class QueryYield:
+    """What one run of a query turned up."""
+    new_ids: int = 0
+    deals: int = 0
+    ending_soon: int = 0
+
+    @property
+    def score(self) -> float:
+        return sum(getattr(self, name) * w for name, w in WEIGHTS.items())
+
+
+@dataclass
+class QueryState:
+    category: str
+    query: str
+    score: Optional[float] = None          # None until the query has run once
+    last_run: Optional[datetime] = None
+    interval: timedelta = timedelta(hours=1)
+
+
+class QuerySchedule:
+    """Decides which (category, query) pairs are due and how often each runs."""
+
+    def __init__(self, queries: list[tuple[str, str]], budget_per_hour: float = BUDGET_PER_HOUR,
+                 min_interval: int = MIN_INTERVAL_MINUTES, max_interval: int = MAX_INTERVAL_MINUTES):
+        self.states = {(c, q): QueryState(c, q) for c, q in queries}
+        self.budget = budget_per_hour
+        self.min_interval = timedelta(minutes=min_interval)
+        self.max_interval = timedelta(minutes=max_interval)
+        # Start with a full bucket so the first pass can cover every query.
+        self.tokens = budget_per_hour
+        self._refilled: Optional[datetime] = None
+        self._allot()
+
+    def _allot(self) -> None:
+        """Share the hourly budget across queries in proportion to their scores."""
+        scores = [s.score for s in self.states.values() if s.score is not None]
+        # Queries that haven't run yet are treated as typical until they have.
+        default = statistics.median(scores) if scores else 0.0
+        weights = {k: (default if s.score is None else s.score) + SCORE_FLOOR
+                   for k, s in self.states.items()}
+        total = sum(weights.values())
+        for key, state in self.states.items():
+            runs_per_hour = self.budget * weights[key] / total
+            interval = timedelta(hours=1 / runs_per_hour) if runs_per_hour > 0 else self.max_interval
+            state.interval = min(max(interval, self.min_interval), self.max_interval)
+
+    def _refill(self, now: datetime) -> None:
+        if self._refilled is not None:
+            elapsed = (now - self._refilled).total_seconds() / 3600
+            self.tokens = min(self.budget, self.tokens + self.budget * max(0.0, elapsed))
+        self._refilled = now
+
+    def due(self, now: datetime) -> list[tuple[str, str]]:
+        """Queries whose interval has elapsed, most overdue first, within budget."""
+        self._refill(now)
+        overdue = []
+        for key, s in self.states.items():
+            if s.last_run is None:
+                overdue.append((float('inf'), key))
+            elif now - s.last_run >= s.interval:
+                overdue.append(((now - s.last_run) / s.interval, key))
+        overdue.sort(key=lambda o: o[0], reverse=True)
+        return [key for _, key in overdue[:int(self.tokens)]]
+
+    def record(self, category: str, query: str, result: Optional[QueryYield], now: datetime) -> None:
+        """Charge one run to the budget and fold its yield into the query's score.
+
+        `result` is None when the run failed; the query still waits out its
+        interval, but its score is left alone.
+        """
+        state = self.states[(category, query)]
+        state.last_run = now
+        self.tokens = max(0.0, self.tokens - 1)
+        if result is not None:
+            state.score = result.score if state.score is None \
+                else SMOOTHING * result.score + (1 - SMOOTHING) * state.score
+            self._allot()
+
+    def restore(self, rows: list[tuple[str, str, Optional[float], Optional[datetime]]]) -> int:
+        """Reload (category, query, score, last_run) rows saved by a previous process.
+
+        Rows for queries no longer scheduled are ignored.  Returns the number
+        restored.
+        """
+        restored = 0
+        for category, query, score, last_run in rows:
+            state = self.states.get((category, query))
+            if state is None:
+                continue
+            state.score, state.last_run = score, last_run
+            restored += 1
+        if restored:
+            self._allot()
+        return restored
+
+    def summary(self) -> list[tuple[str, str, float, float]]:
+        """(category, query, interval minutes, score) per query, shortest interval first."""
+        rows = [(s.category, s.query, s.interval.total_seconds() / 60, s.score or 0.0)
+                for s in self.states.values()]
+        return sorted(rows, key=lambda r: r[2])
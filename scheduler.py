@@ -10,6 +10,8 @@ load_dotenv("credentials.env")
 # Add parent dir to path so EbayScraper is importable
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 import EbayScraper
+import query_schedule
+import scrape_metrics
 
 logging.basicConfig(
     level=logging.INFO,
@@ -28,7 +30,9 @@ OUTCOME_VERIFY_HOURS = int(os.environ.get('OUTCOME_VERIFY_HOURS', '6'))
 # marked as gave-up (GaveUp=1) and excluded from future retries.
 OUTCOME_GIVE_UP_DAYS = int(os.environ.get('OUTCOME_GIVE_UP_DAYS', '7'))
 
-# Minutes between full query-list scrapes.
+# Minutes between full runs: the queries due at the time plus outcome
+# verification and the market-price / price-guide refresh.  Individual queries
+# also run between full runs as their own intervals come due (query_schedule).
 FULL_SCRAPE_INTERVAL_MINUTES = int(os.environ.get('FULL_SCRAPE_INTERVAL_MINUTES', '60'))
 
 # Targeted-scrape tiers: (threshold_minutes, interval_minutes)
@@ -41,6 +45,11 @@ _TARGETED_TIERS = [
     (60, 15),  # < 60 min remaining → every 15 min
 ]
 
+# Deals with <= this many minutes remaining are fetched in hedged mode: Zyte is
+# raced against the direct fetch after ZYTE_HEDGE_DELAY seconds rather than
+# only being tried once direct has failed (which can take up to 30 s).
+HEDGE_THRESHOLD_MINUTES = int(os.environ.get('HEDGE_THRESHOLD_MINUTES', '5'))
+
 # ── Query lists ────────────────────────────────────────────────────────────────
 
 GPU_QUERY_LIST = [
@@ -81,34 +90,119 @@ RAM_QUERY_LIST = [
     "64gb ddr5 ram",
 ]
 
+QUERY_LISTS = [
+    ('GPU', GPU_QUERY_LIST),
+    ('CPU', CPU_QUERY_LIST),
+    ('HDD', HDD_QUERY_LIST),
+    ('RAM', RAM_QUERY_LIST),
+]
+
 # ── Scheduler state ────────────────────────────────────────────────────────────
 
 _last_full_scrape: datetime | None = None
 
-# Maps str(ebay_id) → datetime of last targeted scrape for that item.
+# Per-query intervals from recent yield, within QUERY_BUDGET_PER_HOUR.
+_query_schedule = query_schedule.QuerySchedule(
+    [(category, query) for category, queries in QUERY_LISTS for query in queries]
+)
+
+# Maps str(ebay_id) → datetime of last targeted scrape for that item.  Pruned
+# to the currently active deals on every check, so it stays bounded.
 _last_targeted: dict = {}
 
-# ── Scrape functions ───────────────────────────────────────────────────────────
+# ── Persisted state ────────────────────────────────────────────────────────────
 
-def run_full_scrape():
-    """Run the full query-list scrape for all categories + outcome verification."""
+def restore_state():
+    """Resume the schedule saved by a previous process (see scheduler_state).
+
+    Restores the last full scrape time, each query's score and last run, and
+    the targeted-scrape times of deals still live, so a restart doesn't
+    re-crawl everything that ran just before it.
+    """
     global _last_full_scrape
-    log.info("Starting full scrape run...")
-    # Fresh curl-cffi session per full run so Akamai cookies are re-established.
-    EbayScraper.reset_direct_session()
+    state = EbayScraper.LoadSchedulerState()
+    _last_full_scrape = state.last_full_scrape
+    restored = _query_schedule.restore(state.queries)
+    _last_targeted.update(state.targeted)
+    if _last_full_scrape is not None:
+        log.info(
+            "Resumed schedule: last full scrape %s, %d query cursor(s), %d targeted deal(s)",
+            _last_full_scrape.strftime("%Y-%m-%d %H:%M"), restored, len(state.targeted),
+        )
+
+
+def _save_query_state(ran: list[tuple[str, str]]):
+    """Persist the score and last run of the queries that just ran."""
+    if not ran:
+        return
+    states = [_query_schedule.states[key] for key in ran]
+    EbayScraper.SaveSchedulerState(queries=[(s.category, s.query, s.score, s.last_run) for s in states])
+
+
+# ── Scrape functions ───────────────────────────────────────────────────────────
+
+def _finish_metrics_run():
+    """Close the current metrics run, log a one-line summary and persist it."""
+    run = scrape_metrics.finish_run()
+    hits, misses = run.total('title_cache', 'hit'), run.total('title_cache', 'miss')
+    log.info(
+        "Run metrics [%s]: %.1fs, %.1f MB fetched, %d parsed, %d skipped, %d block page(s), "
+        "%.0f%% of titles cached",
+        run.kind, run.duration, run.total('bytes_fetched') / 1e6,
+        run.total('items_parsed'), run.total('items_skipped'), run.total('block_pages'),
+        100 * hits / (hits + misses) if hits + misses else 0,
+    )
+    EbayScraper.RecordScrapeMetrics(run)
+
+
+def _scrape_queries(due: list[tuple[str, str]]):
+    """Scrape the given (category, query) pairs and feed their yield back to the schedule."""
     common = dict(country='uk', condition='used', listing_type='auction', cache=False)
-    for query_list, product_type in [
-        (GPU_QUERY_LIST, 'GPU'),
-        (CPU_QUERY_LIST, 'CPU'),
-        (HDD_QUERY_LIST, 'HDD'),
-        (RAM_QUERY_LIST, 'RAM'),
-    ]:
+    # One dedup set per run, so a listing several queries return is parsed and written once.
+    dedup = EbayScraper.RunDedup()
+    for product_type, _ in QUERY_LISTS:
+        query_list = [q for c, q in due if c == product_type]
+        if not query_list:
+            continue
         try:
-            log.info("Scraping %s...", product_type)
-            EbayScraper.ScrapeAndUpload(query_list, product_type=product_type, **common)
+            log.info("Scraping %s (%d/%d queries due)...", product_type, len(query_list),
+                     sum(c == product_type for c, _ in _query_schedule.states))
+            yields = EbayScraper.ScrapeAndUpload(query_list, product_type=product_type, dedup=dedup, **common)
             log.info("%s scrape complete.", product_type)
         except Exception as e:
             log.error("%s scrape failed: %s", product_type, e)
+            yields = {}
+        now = datetime.now()
+        for query in query_list:
+            _query_schedule.record(product_type, query, yields.get(query), now)
+    _save_query_state(due)
+
+    if dedup.cards:
+        log.info("Dedup: %d/%d card(s) skipped as already parsed this run (%.0f%% overlap)",
+                 dedup.duplicates, dedup.cards, 100 * dedup.duplicates / dedup.cards)
+    log.debug("Query intervals: %s", ", ".join(
+        f"{q} [{c}] {minutes:.0f}m" for c, q, minutes, _ in _query_schedule.summary()))
+
+
+def run_due_queries():
+    """Scrape the queries that have come due between full runs."""
+    due = _query_schedule.due(datetime.now())
+    if not due:
+        return
+    log.info("Adaptive query run: %d query(s) due", len(due))
+    scrape_metrics.start_run('queries')
+    _scrape_queries(due)
+    _finish_metrics_run()
+
+
+def run_full_scrape():
+    """Scrape the due queries, then verify outcomes and refresh market prices."""
+    global _last_full_scrape
+    log.info("Starting full scrape run...")
+    scrape_metrics.start_run('full')
+    # Fresh curl-cffi session per full run so Akamai cookies are re-established.
+    EbayScraper.reset_direct_session()
+    _scrape_queries(_query_schedule.due(datetime.now()))
 
     # Verify outcomes for items past their end time that are still unresolved.
     try:
@@ -116,26 +210,49 @@ def run_full_scrape():
     except Exception as e:
         log.error("Outcome verification failed: %s", e)
 
+    # Update the per-model market-price estimates the deal queries compare against.
+    try:
+        with scrape_metrics.timer('market_refresh'):
+            EbayScraper.RefreshMarketPrices()
+    except Exception as e:
+        log.error("Market price refresh failed: %s", e)
+
+    # Snapshot the price guide so /api/price-guide serves it without re-aggregating.
+    try:
+        with scrape_metrics.timer('price_guide'):
+            EbayScraper.PublishPriceGuide()
+    except Exception as e:
+        log.error("Price guide snapshot failed: %s", e)
+
     _last_full_scrape = datetime.now()
     try:
         EbayScraper.RecordScrapeCompleted()
     except Exception as e:
         log.error("Failed to record scrape timestamp: %s", e)
+    _finish_metrics_run()
     log.info("Full scrape run complete.")
 
 
 def run_targeted_scrapes():
-    """Check active tracked deals and run targeted per-item scrapes as needed."""
+    """Check active tracked deals and run targeted scrapes for those due."""
     global _last_targeted
 
     active_deals = EbayScraper.GetActiveDeals()
+    end_times = {str(deal[0]): deal[3] for deal in active_deals}
+
+    # Forget deals that have ended or sold — including the last one, so the
+    # dict empties out once nothing is tracked.  Their saved rows are evicted
+    # by the next SaveSchedulerState.
+    for key in [k for k in _last_targeted if k not in end_times]:
+        del _last_targeted[key]
     if not active_deals:
         return
 
     now = datetime.now()
     items_to_scrape = []
+    hedged_ids = set()
 
-    for ebay_id, category, title, end_time in active_deals:
+    for ebay_id, category, title, end_time, model in active_deals:
         minutes_remaining = (end_time - now).total_seconds() / 60
 
         if minutes_remaining <= 0:
@@ -157,8 +274,10 @@ def run_targeted_scrapes():
         last_scraped = _last_targeted.get(key)
 
         if last_scraped is None or (now - last_scraped) >= timedelta(minutes=applicable_interval):
-            items_to_scrape.append((ebay_id, category, title))
+            items_to_scrape.append((ebay_id, category, title, model))
             _last_targeted[key] = now
+            if minutes_remaining <= HEDGE_THRESHOLD_MINUTES:
+                hedged_ids.add(key)
 
     if items_to_scrape:
         log.info(
@@ -166,10 +285,22 @@ def run_targeted_scrapes():
             len(items_to_scrape),
             [str(i[0]) for i in items_to_scrape],
         )
-        try:
-            EbayScraper.ScrapeTargeted(items_to_scrape)
-        except Exception as e:
-            log.error("Targeted scrape failed: %s", e)
+        # Final-minutes items first, hedged so a slow direct failure can't
+        # cost the last price update.
+        urgent = [i for i in items_to_scrape if str(i[0]) in hedged_ids]
+        normal = [i for i in items_to_scrape if str(i[0]) not in hedged_ids]
+        scrape_metrics.start_run('targeted')
+        for batch, hedge in ((urgent, True), (normal, False)):
+            if not batch:
+                continue
+            try:
+                EbayScraper.ScrapeTargeted(batch, hedge=hedge)
+            except Exception as e:
+                log.error("Targeted scrape failed: %s", e)
+        _finish_metrics_run()
+        EbayScraper.SaveSchedulerState(targeted=[
+            (str(i[0]), now, end_times[str(i[0])]) for i in items_to_scrape
+        ])
     else:
         log.debug("Targeted scrapes: no items due yet (%d active deal(s) checked)", len(active_deals))
 
@@ -178,22 +309,27 @@ def run_targeted_scrapes():
 
 if __name__ == "__main__":
     log.info(
-        "Scheduler starting — full scrape every %d min; targeted tiers: %s",
+        "Scheduler starting — full scrape every %d min; query budget %.0f/h; targeted tiers: %s",
         FULL_SCRAPE_INTERVAL_MINUTES,
+        query_schedule.BUDGET_PER_HOUR,
         _TARGETED_TIERS,
     )
 
-    # Run full scrape immediately on startup so data is fresh before the first interval.
-    run_full_scrape()
+    # Pick up where the previous process left off.  With nothing on record
+    # (first start, or the DB unreachable) the first tick runs a full scrape,
+    # and every query is due until it has run once.
+    restore_state()
 
     while True:
-        time.sleep(60)
         now = datetime.now()
 
         # Full scrape: due if interval has elapsed since last run.
         if _last_full_scrape is None or \
                 (now - _last_full_scrape) >= timedelta(minutes=FULL_SCRAPE_INTERVAL_MINUTES):
             run_full_scrape()
+        else:
+            run_due_queries()
 
         # Targeted scrapes: checked every loop tick (every 60 s).
         run_targeted_scrapes()
+        time.sleep(60)
@@ -0,0 +1,105 @@
+"""Scheduler state kept in the DB, so a restarted scheduler resumes its schedule.
+
+Without it every container restart or deploy began with a full crawl of
+every query, whatever had run minutes before, and the per-item targeted
+timestamps lived in a dict that only ever grew.  Three things are kept:
+
+  last full scrape   Scraper.ScrapeMeta.LastScrapeAt (already written after
+                     each full run by EbayScraper.RecordScrapeCompleted)
+  query cursors      Scraper.QueryScheduleState — each query's smoothed
+                     yield score and last run (see query_schedule)
+  targeted scrapes   Scraper.TargetedScrapes — when each tracked deal was
+                     last targeted, with its end time so rows for ended
+                     auctions can be evicted
+
+The scheduler loads them once at startup (load) and writes its changes back
+after each run (save_queries / save_targeted); the caller commits.  Times
+are the scheduler's own naive datetime.now() values, except LastScrapeAt,
+which the DB stamps with NOW() and is therefore read back as an age.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+
+CREATE_QUERY_TABLE = """
+    CREATE TABLE IF NOT EXISTS Scraper.QueryScheduleState (
+        Category VARCHAR(10)  NOT NULL,
+        Query    VARCHAR(100) NOT NULL,
+        Score    DOUBLE       NULL,
+        LastRun  DATETIME     NULL,
+        PRIMARY KEY (Category, Query)
+    )
+"""
+
+CREATE_TARGETED_TABLE = """
+    CREATE TABLE IF NOT EXISTS Scraper.TargetedScrapes (
+        EbayID         BIGINT   NOT NULL PRIMARY KEY,
+        LastTargetedAt DATETIME NOT NULL,
+        EndTime        DATETIME NOT NULL,
+        INDEX idx_end (EndTime)
+    )
+"""
+
+
+@dataclass
+class SchedulerState:
+    last_full_scrape: Optional[datetime] = None
+    # (category, query, score, last_run) per query that has run.
+    queries: list[tuple[str, str, Optional[float], Optional[datetime]]] = field(default_factory=list)
+    # str(ebay_id) → last targeted scrape, for auctions that haven't ended.
+    targeted: dict[str, datetime] = field(default_factory=dict)
+
+
+def load(cur, now: datetime = None) -> SchedulerState:
+    """Read the persisted scheduler state on `cur`, creating its tables if missing."""
+    now = now or datetime.now()
+    cur.execute(CREATE_QUERY_TABLE)
+    cur.execute(CREATE_TARGETED_TABLE)
+    state = SchedulerState()
+
+    try:
+        cur.execute("SELECT TIMESTAMPDIFF(SECOND, LastScrapeAt, NOW()) FROM Scraper.ScrapeMeta WHERE id = 1")
+        row = cur.fetchone()
+    except Exception:
+        row = None      # ScrapeMeta not created yet — no full scrape on record
+    if row and row[0] is not None:
+        state.last_full_scrape = now - timedelta(seconds=max(0, row[0]))
+
+    cur.execute("SELECT Category, Query, Score, LastRun FROM Scraper.QueryScheduleState")
+    state.queries = [tuple(r) for r in cur.fetchall()]
+
+    cur.execute("SELECT EbayID, LastTargetedAt FROM Scraper.TargetedScrapes WHERE EndTime > %s", (now,))
+    state.targeted = {str(ebay_id): last for ebay_id, last in cur.fetchall()}
+    return state
+
+
+def save_queries(cur, rows: list[tuple[str, str, Optional[float], Optional[datetime]]]) -> None:
+    """Upsert (category, query, score, last_run) rows into QueryScheduleState."""
+    if not rows:
+        return
+    cur.execute(CREATE_QUERY_TABLE)
+    cur.executemany("""
+        INSERT INTO Scraper.QueryScheduleState (Category, Query, Score, LastRun)
+        VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE Score = VALUES(Score), LastRun = VALUES(LastRun)
+    """, [(c, q[:100], score, last_run and last_run.replace(microsecond=0))
+          for c, q, score, last_run in rows])
+
+
+def save_targeted(cur, rows: list[tuple[str, datetime, datetime]], now: datetime = None) -> int:
+    """Upsert (ebay_id, last_targeted, end_time) rows and evict ended auctions.
+
+    Returns the number of rows evicted.
+    """
+    now = now or datetime.now()
+    cur.execute(CREATE_TARGETED_TABLE)
+    if rows:
+        cur.executemany("""
+            INSERT INTO Scraper.TargetedScrapes (EbayID, LastTargetedAt, EndTime)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE LastTargetedAt = VALUES(LastTargetedAt), EndTime = VALUES(EndTime)
+        """, [(int(ebay_id), last.replace(microsecond=0), end_time)
+              for ebay_id, last, end_time in rows])
+    cur.execute("DELETE FROM Scraper.TargetedScrapes WHERE EndTime <= %s", (now,))
+    return cur.rowcount
@@ -0,0 +1,233 @@
+"""Per-run pipeline metrics for the scraper: stage timings and counters.
+
+The scheduler opens a run with start_run() and closes it with finish_run();
+EbayScraper records into whatever run is current:
+
+    with scrape_metrics.scope(category='GPU', query='NVIDIA RTX 30'):
+        with scrape_metrics.timer('upload'):
+            ...
+        scrape_metrics.incr('items_skipped', detail='price')
+
+Stages:   fetch_direct, fetch_zyte, parse, upload, commit, market_refresh,
+          price_guide
+Counters: bytes_fetched (detail = direct/zyte), items_parsed,
+          items_skipped (detail = reason), items_duplicate (cards skipped
+          because an earlier query in the run already parsed that ID),
+          block_pages, fetch_failures, items_inserted, items_updated,
+          title_cache (detail = hit/miss; see title_cache)
+
+Finished runs are written to ScrapeRuns / ScrapeStageMetrics by persist()
+and exposed by App.py at /metrics.  Recording is thread-safe; labels are
+carried in a contextvar, so hedged-fetch threads must be started with
+contextvars.copy_context().run to keep them.  Parse-pool worker processes
+record into a run of their own and hand its stages and counters back to be
+merge()d into the scheduler's.  Work that may be thrown away (a streamed
+page that turns out to be blocked half-way) records under deferred(), and
+is merged only if its result is kept.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+
+_labels: contextvars.ContextVar[tuple[str, str]] = contextvars.ContextVar(
+    'scrape_metric_labels', default=('', '')
+)
+
+# (names, buffer) while inside deferred(): those names record into the buffer.
+_deferred: contextvars.ContextVar[tuple | None] = contextvars.ContextVar(
+    'scrape_metric_deferred', default=None
+)
+
+
+@dataclass(slots=True)
+class StageStat:
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+@dataclass
+class RunMetrics:
+    kind: str = 'adhoc'
+    started_at: datetime = field(default_factory=datetime.now)
+    finished_at: datetime | None = None
+    # (category, query, stage) → StageStat
+    stages: dict = field(default_factory=dict)
+    # (category, query, name, detail) → int
+    counters: dict = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        key = (*_labels.get(), stage)
+        with self._lock:
+            stat = self.stages.get(key)
+            if stat is None:
+                stat = self.stages[key] = StageStat()
+            stat.count += 1
+            stat.seconds += seconds
+            stat.max_seconds = max(stat.max_seconds, seconds)
+
+    def incr(self, name: str, n: int = 1, detail: str = '') -> None:
+        key = (*_labels.get(), name, detail)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def merge(self, stages: dict, counters: dict) -> None:
+        """Add stage timings and counters recorded elsewhere (a parse worker's run)."""
+        with self._lock:
+            for key, other in stages.items():
+                stat = self.stages.get(key)
+                if stat is None:
+                    stat = self.stages[key] = StageStat()
+                stat.count += other.count
+                stat.seconds += other.seconds
+                stat.max_seconds = max(stat.max_seconds, other.max_seconds)
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def total(self, name: str, detail: str = None) -> int:
+        """Sum a counter across all categories/queries (and details unless given)."""
+        with self._lock:
+            return sum(v for (_, _, n, d), v in self.counters.items()
+                       if n == name and (detail is None or d == detail))
+
+    @property
+    def duration(self) -> float:
+        end = self.finished_at or datetime.now()
+        return (end - self.started_at).total_seconds()
+
+
+_current = RunMetrics()
+
+
+def current() -> RunMetrics:
+    return _current
+
+
+def start_run(kind: str) -> RunMetrics:
+    """Begin a new run; anything recorded before this is discarded."""
+    global _current
+    _current = RunMetrics(kind=kind)
+    return _current
+
+
+def finish_run() -> RunMetrics:
+    """Close the current run and return it (recording continues into a fresh ad-hoc run)."""
+    global _current
+    run = _current
+    run.finished_at = datetime.now()
+    _current = RunMetrics()
+    return run
+
+
+@contextmanager
+def scope(category: str = '', query: str = ''):
+    """Label everything recorded inside the block with category/query."""
+    token = _labels.set((category or '', query or ''))
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+@contextmanager
+def deferred(*names: str):
+    """Hold the named stages / counters recorded inside the block in a buffer.
+
+    Yields the buffer (a RunMetrics); the caller merge()s its stages and
+    counters if the work is kept and simply drops it otherwise.  Anything
+    not named still goes straight to the current run.
+    """
+    buffer = RunMetrics(kind='deferred')
+    token = _deferred.set((frozenset(names), buffer))
+    try:
+        yield buffer
+    finally:
+        _deferred.reset(token)
+
+
+def _run_for(name: str) -> RunMetrics:
+    held = _deferred.get()
+    return held[1] if held is not None and name in held[0] else _current
+
+
+@contextmanager
+def timer(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _run_for(stage).observe(stage, time.perf_counter() - start)
+
+
+def observe(stage: str, seconds: float) -> None:
+    _run_for(stage).observe(stage, seconds)
+
+
+def incr(name: str, n: int = 1, detail: str = '') -> None:
+    _run_for(name).incr(name, n, detail)
+
+
+def merge(stages: dict, counters: dict) -> None:
+    _current.merge(stages, counters)
+
+
+# ── Persistence ───────────────────────────────────────────────────────────────
+
+CREATE_RUNS_TABLE = """
+    CREATE TABLE IF NOT EXISTS Scraper.ScrapeRuns (
+        RunID       BIGINT       NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        Kind        VARCHAR(10)  NOT NULL,
+        StartedAt   DATETIME     NOT NULL,
+        FinishedAt  DATETIME     NOT NULL,
+        DurationSec DOUBLE       NOT NULL,
+        INDEX idx_kind_started (Kind, StartedAt)
+    )
+"""
+
+CREATE_STAGE_TABLE = """
+    CREATE TABLE IF NOT EXISTS Scraper.ScrapeStageMetrics (
+        RunID      BIGINT       NOT NULL,
+        Category   VARCHAR(10)  NOT NULL,
+        Query      VARCHAR(100) NOT NULL,
+        Metric     VARCHAR(30)  NOT NULL,
+        Detail     VARCHAR(30)  NOT NULL DEFAULT '',
+        Count      BIGINT       NOT NULL,
+        Seconds    DOUBLE       NULL,       -- NULL for plain counters
+        MaxSeconds DOUBLE       NULL,
+        INDEX idx_run (RunID)
+    )
+"""
+
+
+def persist(cur, run: RunMetrics) -> int:
+    """Write `run` to ScrapeRuns / ScrapeStageMetrics on `cur`; the caller commits.
+
+    Returns the new RunID.
+    """
+    cur.execute(CREATE_RUNS_TABLE)
+    cur.execute(CREATE_STAGE_TABLE)
+    finished = run.finished_at or datetime.now()
+    cur.execute(
+        "INSERT INTO Scraper.ScrapeRuns (Kind, StartedAt, FinishedAt, DurationSec) VALUES (%s, %s, %s, %s)",
+        (run.kind, run.started_at.replace(microsecond=0), finished.replace(microsecond=0), run.duration),
+    )
+    run_id = cur.lastrowid
+    rows = [
+        (run_id, category, query[:100], stage, '', stat.count, stat.seconds, stat.max_seconds)
+        for (category, query, stage), stat in run.stages.items()
+    ] + [
+        (run_id, category, query[:100], name, detail, value, None, None)
+        for (category, query, name, detail), value in run.counters.items()
+    ]
+    if rows:
+        cur.executemany("""
+            INSERT INTO Scraper.ScrapeStageMetrics
+                (RunID, Category, Query, Metric, Detail, Count, Seconds, MaxSeconds)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, rows)
+    return run_id
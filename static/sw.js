@@ -1,4 +1,14 @@
-const CACHE = 'pcd-v1';
+const CACHE     = 'pcd-v1';
+const API_CACHE = 'pcd-api-v1';
+
+// API responses served stale-while-revalidate: the last good copy renders
+// instantly and the network refreshes it in the background.  Paged outcome
+// requests (?cursor=) always go to the network.
+const SWR_PATHS = ['/api/deals', '/api/outcomes', '/api/price-guide'];
+
+// A cached copy younger than this is served without revalidating, so quick
+// re-opens and tab switches don't hit the server at all.
+const FRESH_MS = 60 * 1000;
 
 self.addEventListener('install', e => {
     e.waitUntil(caches.open(CACHE).then(c => c.add('/')));
@@ -8,15 +18,58 @@ self.addEventListener('install', e => {
 self.addEventListener('activate', e => {
     e.waitUntil(
         caches.keys().then(keys =>
-            Promise.all(keys.filter(k => k !== CACHE).map(k => caches.delete(k)))
+            Promise.all(keys.filter(k => k !== CACHE && k !== API_CACHE).map(k => caches.delete(k)))
         )
     );
     self.clients.claim();
 });
 
+// Copy of `resp` with an X-Cached-At header (ms since epoch) for the page's staleness indicator.
+async function stamp(resp) {
+    const headers = new Headers(resp.headers);
+    headers.set('X-Cached-At', String(Date.now()));
+    return new Response(await resp.blob(), { status: resp.status, statusText: resp.statusText, headers });
+}
+
+async function notifyClients(url, changed) {
+    const clients = await self.clients.matchAll({ type: 'window' });
+    clients.forEach(c => c.postMessage({ type: 'api-updated', url, changed }));
+}
+
+// Fetch from the network and store a good response; resolves to the network response.
+async function revalidate(request, cached) {
+    const resp = await fetch(request);
+    if (resp.ok) {
+        const cache = await caches.open(API_CACHE);
+        await cache.put(request, await stamp(resp.clone()));
+        if (cached) {
+            const etag = resp.headers.get('ETag');
+            notifyClients(request.url, !(etag && etag === cached.headers.get('ETag')));
+        }
+    }
+    return resp;
+}
+
+async function staleWhileRevalidate(e) {
+    const cached = await caches.match(e.request, { cacheName: API_CACHE });
+    if (!cached) return revalidate(e.request, null);
+
+    const age = Date.now() - Number(cached.headers.get('X-Cached-At') || 0);
+    if (age >= FRESH_MS) {
+        e.waitUntil(revalidate(e.request, cached).catch(() => {}));
+    }
+    return cached;
+}
+
 self.addEventListener('fetch', e => {
-    // API calls always go to the network — never serve stale deal data
-    if (new URL(e.request.url).pathname.startsWith('/api/')) return;
+    const url = new URL(e.request.url);
+    if (url.pathname.startsWith('/api/')) {
+        if (e.request.method === 'GET' && SWR_PATHS.includes(url.pathname) && !url.searchParams.has('cursor')) {
+            e.respondWith(staleWhileRevalidate(e));
+        }
+        // Everything else under /api/ (counts, stats, paging) always goes to the network.
+        return;
+    }
 
     // Everything else: network-first, fall back to cache
     e.respondWith(
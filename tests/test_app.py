@@ -0,0 +1,131 @@
+"""
+Tests for App.py
+
+    pytest tests/test_app.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# App creates its tables at import; point it at a closed local port so that
+# fails fast (and is logged) instead of needing credentials.env.
+for _key, _value in (("DB_USER", "test"), ("DB_PASSWORD", "test"), ("DB_HOST", "127.0.0.1"),
+                     ("DB_PORT", "1"), ("DB_NAME", "Scraper")):
+    os.environ.setdefault(_key, _value)
+
+import gzip
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import App
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1. Accept-Encoding negotiation
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestAcceptedEncoding:
+    @pytest.mark.parametrize("header, expected", [
+        ("gzip;q=0.8, deflate", "gzip"),
+        ("br;q=0.9, gzip;q=0.5", "br"),
+        ("br;q=0.4, gzip;q=0.9", "gzip"),
+        ("gzip; q=0.05", "gzip"),
+        ("gzip;q=0", None),
+        ("gzip;q=0.0, br;q=0.000", None),
+        ("deflate, identity", None),
+        ("", None),
+    ])
+    def test_weights(self, header, expected):
+        with patch.object(App, "brotli", object()):
+            assert App._accepted_encoding(header) == expected
+
+    def test_brotli_preferred_on_tie(self):
+        with patch.object(App, "brotli", object()):
+            assert App._accepted_encoding("gzip, br") == "br"
+
+    def test_no_brotli_installed(self):
+        with patch.object(App, "brotli", None):
+            assert App._accepted_encoding("br;q=1, gzip;q=0.5") == "gzip"
+            assert App._accepted_encoding("br") is None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2. Price-guide snapshot responses
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSnapshotResponse:
+    BODY = b'{"status":"ok"}'
+
+    def _get(self, accept_encoding):
+        payload = gzip.compress(self.BODY)
+        with App.app.test_request_context(headers={"Accept-Encoding": accept_encoding}):
+            return App._snapshot_response("abc123", None, payload, "no-cache"), payload
+
+    def test_gzip_accepted_passes_payload_through(self):
+        resp, payload = self._get("gzip;q=0.5")
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert resp.get_data() == payload
+
+    def test_gzip_refused_is_decompressed(self):
+        resp, _ = self._get("gzip;q=0, identity")
+        assert "Content-Encoding" not in resp.headers
+        assert resp.get_data() == self.BODY
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 3. Deal queries — MarketPrices estimates
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestDealsQuery:
+    @pytest.mark.parametrize("product_type", ["gpu", "cpu", "hdd", "ram"])
+    def test_compares_against_market_prices(self, product_type):
+        sql = App.get_deals_query(product_type, estimator="median")
+        assert "Scraper.MarketPrices" in sql and "MedianPrice" in sql
+        assert "RawStats" not in sql
+
+    def test_estimators_shared_with_market_prices(self):
+        assert App.MARKET_ESTIMATORS is App.market_prices.ESTIMATORS
+
+    def test_unknown_product_type_raises(self):
+        with pytest.raises(ValueError):
+            App.get_deals_query("psu")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 4. Table creation at startup
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestEnsureTables:
+    def test_scrape_metrics_tables_use_shared_ddl(self):
+        conn = MagicMock()
+        with patch.object(App, "get_connection", return_value=conn):
+            App.ensure_scrape_metrics_tables()
+        executed = [c[0][0] for c in conn.cursor().execute.call_args_list]
+        assert executed == [App.scrape_metrics.CREATE_RUNS_TABLE, App.scrape_metrics.CREATE_STAGE_TABLE]
+        conn.commit.assert_called_once()
+
+    def test_ddl_failure_is_logged(self, caplog):
+        with patch.object(App, "get_connection", side_effect=App.mariadb.OperationalError("down")):
+            App.ensure_scrape_metrics_tables()
+            App.ensure_market_prices_table()
+        assert "Could not create scrape metrics tables: down" in caplog.text
+        assert "Could not create MarketPrices table: down" in caplog.text
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 5. JSON encoding — shared with price-guide snapshots
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestJSON:
+    def test_db_values_match_snapshot_format(self):
+        row = {"AvgPrice": Decimal("123.45"), "EndTime": datetime(2026, 3, 1, 12, 0), "Sold": date(2026, 3, 1)}
+        with App.app.app_context():
+            body = App.jsonify(row).get_data()
+        assert json.loads(body) == json.loads(App.price_guide._dumps(row))
+        assert json.loads(body)["AvgPrice"] == "123.45"
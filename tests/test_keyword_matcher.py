@@ -0,0 +1,63 @@
+"""
+Tests for keyword_matcher.py
+
+    pytest tests/test_keyword_matcher.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from keyword_matcher import KeywordMatcher, _trie_pattern
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1. scan() — same answers as the `in` loops it replaces
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestScan:
+    def test_priority_is_list_order_not_position(self):
+        m = KeywordMatcher({'brand': {'GIGABYTE': 'Gigabyte', 'AORUS': 'Aorus'}})
+        assert m.scan("AORUS by Gigabyte RTX 3080") == {'brand': 'Gigabyte'}
+
+    def test_groups_are_independent(self):
+        m = KeywordMatcher({
+            'system': ['mini pc', 'laptop'],
+            'brand':  {'AMD': 'AMD', 'INTEL': 'Intel'},
+        })
+        assert m.scan("Intel i5 laptop") == {'system': True, 'brand': 'Intel'}
+        assert m.scan("Ryzen 5 5600X") == {}
+
+    def test_case_insensitive_substrings(self):
+        m = KeywordMatcher({'sas': ['SAS']})
+        assert m.scan("Seagate 4TB sas 3.5") == {'sas': True}
+        assert m.scan("Kansas stock") == {"sas": True}   # substring, as before
+
+    def test_overlapping_and_nested_keywords(self):
+        """'deca' inside 'dodeca' and 'XT' inside 'XTX' are still reported."""
+        cores = KeywordMatcher({'cores': {'deca': 10, 'dodeca': 12}})
+        assert cores.scan("Dodeca-core") == {'cores': 10}
+        amd = KeywordMatcher({'amd': ['XTX'], 'any': ['XT']})
+        assert amd.scan("RX 7900 XTX") == {'amd': True, 'any': True}
+
+    def test_leading_space_keyword(self):
+        m = KeywordMatcher({'system': [' nuc']})
+        assert m.scan("Intel NUC kit") == {'system': True}
+        assert m.scan("NUC kit") == {}
+
+    def test_keyword_shared_across_groups(self):
+        m = KeywordMatcher({'a': ['pny'], 'b': {'PNY': 'PNY'}})
+        assert m.scan("PNY XLR8") == {'a': True, 'b': 'PNY'}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2. _trie_pattern() — shared prefixes factored out
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestTriePattern:
+    def test_factors_prefixes(self):
+        assert _trie_pattern(['deca', 'desktop pc', 'dual']) == r'd(?:e(?:ca|sktop\ pc)|ual)'
+
+    def test_keyword_that_prefixes_another(self):
+        assert _trie_pattern(['xt', 'xtx']) == 'xt(?:x)?'
@@ -0,0 +1,121 @@
+"""
+Tests for market_prices.py
+
+    pytest tests/test_market_prices.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import MagicMock
+
+import market_prices
+
+TODAY = date(2026, 3, 1)
+
+
+def _sales(prices, days_ago=0):
+    return [(p, TODAY - timedelta(days=days_ago)) for p in prices]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1. estimate() — per-key estimators
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestEstimate:
+    def test_too_few_sales(self):
+        assert market_prices.estimate(_sales([100, 110, 120, 130]), TODAY) is None
+
+    def test_mean_matches_sql_two_sigma_band(self):
+        """MeanPrice = AVG over sales within ±2·STDDEV_POP, as the old ModelStats CTE."""
+        prices = [300, 310, 290, 305, 295, 300, 2000]
+        avg = sum(prices) / len(prices)
+        sd = (sum((p - avg) ** 2 for p in prices) / len(prices)) ** 0.5
+        banded = [p for p in prices if avg - 2 * sd <= p <= avg + 2 * sd]
+        est = market_prices.estimate(_sales(prices), TODAY)
+        assert est.mean == round(sum(banded) / len(banded), 2)
+        assert est.max_price == max(banded)
+        assert est.sold_count == 7
+
+    def test_median_and_trimmed_resist_bad_sales(self):
+        prices = [300] * 9 + [5]   # one boxes-only sale
+        est = market_prices.estimate(_sales(prices), TODAY)
+        assert est.median == 300
+        assert est.trimmed_mean == 300
+
+    def test_decayed_weights_recent_sales(self):
+        sales = _sales([200] * 5, days_ago=60) + _sales([300] * 5, days_ago=0)
+        est = market_prices.estimate(sales, TODAY, half_life_days=30)
+        # 60 days = two half-lives → old sales weigh 1/4 of recent ones.
+        assert est.decayed == pytest.approx((200 * 0.25 + 300) / 1.25, abs=0.01)
+        assert est.last_sold == TODAY
+
+    def test_accepts_datetime_sold_dates(self):
+        sales = [(100.0, datetime(2026, 2, 28, 12, 0))] * 5
+        assert market_prices.estimate(sales, TODAY).last_sold == date(2026, 2, 28)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2. refresh() — mocked cursor
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestRefresh:
+    NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+    def _cursor(self, watermark, rows_by_category):
+        cur = MagicMock()
+        cur.fetchone.return_value = watermark
+        cur.fetchall.side_effect = [rows_by_category.get(c, []) for c in market_prices.CATEGORIES]
+        return cur
+
+    def test_full_refresh_when_empty(self):
+        gpu_rows = [('RTX 3080', 40000 + i, TODAY) for i in range(5)]
+        hdd_rows = [(4000, None, 3000, TODAY)] * 5
+        cur = self._cursor((None, None), {'GPU': gpu_rows, 'HDD': hdd_rows})
+        assert market_prices.refresh(cur, now=self.NOW) == 2
+
+        upserts = [c[0][1] for c in cur.executemany.call_args_list]
+        gpu, hdd = upserts[0][0], upserts[1][0]
+        assert gpu[:7] == ('GPU', 'RTX 3080', 'RTX 3080', None, None, None, 5)
+        assert hdd[:7] == ('HDD', '4000|', None, 4000, None, None, 5)
+        # History queries are unrestricted and stale keys are pruned.
+        assert all('%s' not in c[0][0] for c in cur.execute.call_args_list if 'SELECT x.' in c[0][0])
+        assert 'UpdatedAt <' in cur.execute.call_args_list[-1][0][0]
+
+    def test_incremental_only_queries_dirty_keys(self):
+        newest = self.NOW - timedelta(hours=1)
+        cur = self._cursor((self.NOW - timedelta(hours=2), newest), {})
+        market_prices.refresh(cur, now=self.NOW)
+        history = [c for c in cur.execute.call_args_list if 'SELECT x.' in c[0][0]]
+        assert len(history) == 4
+        for call in history:
+            assert 'SELECT DISTINCT' in call[0][0]
+            assert call[0][1] == (newest.date() - timedelta(days=market_prices.BACKFILL_DAYS),)
+        assert not any('UpdatedAt <' in c[0][0] for c in cur.execute.call_args_list)
+
+    def test_incremental_picks_up_backdated_sale(self):
+        """Outcome verification writes a SoldDate days in the past; its key must still refresh."""
+        newest = self.NOW - timedelta(hours=1)
+        backdated = (self.NOW - timedelta(days=6)).date()
+        gpu_rows = [('RTX 3080', 40000 + i, backdated) for i in range(5)]
+        cur = self._cursor((self.NOW - timedelta(hours=2), newest), {'GPU': gpu_rows})
+        assert market_prices.refresh(cur, now=self.NOW) == 1
+        gpu_history = next(c for c in cur.execute.call_args_list if 'Scraper.GPU' in c[0][0])
+        since, = gpu_history[0][1]
+        assert since <= backdated
+
+    def test_stale_table_triggers_full_rebuild(self):
+        cur = self._cursor((self.NOW - timedelta(days=2), self.NOW - timedelta(hours=1)), {})
+        market_prices.refresh(cur, now=self.NOW)
+        assert 'UpdatedAt <' in cur.execute.call_args_list[-1][0][0]
+
+    def test_key_below_threshold_is_deleted(self):
+        cur = self._cursor((None, None), {'CPU': [('i7-8700K', 9000, TODAY)] * 3})
+        assert market_prices.refresh(cur, now=self.NOW) == 0
+        sql, params = cur.executemany.call_args[0]
+        assert sql.startswith('DELETE')
+        assert params == [('CPU', 'i7-8700K')]
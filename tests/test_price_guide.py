@@ -0,0 +1,85 @@
+"""
+Tests for price_guide.py
+
+    pytest tests/test_price_guide.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import gzip
+import json
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import price_guide
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+COMPONENTS = {
+    'gpu': [{'Model': 'RTX 3080', 'AvgPrice': Decimal('412.50'), 'MinPrice': Decimal('350.00'),
+             'MaxPrice': Decimal('480.00'), 'SoldCount': 14}],
+    'cpu': [], 'hdd': [], 'ram': [],
+}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1. build() — deterministic, content-addressed payloads
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestBuild:
+    def test_payload_is_gzipped_api_response(self):
+        version, payload = price_guide.build(COMPONENTS, NOW)
+        body = json.loads(gzip.decompress(payload))
+        assert body['status'] == 'ok'
+        assert body['version'] == version
+        assert body['generated_at'] == '2026-03-01T12:00:00'
+        # Same wire format as jsonify: DECIMAL columns as strings
+        assert body['components']['gpu'][0]['AvgPrice'] == '412.50'
+
+    def test_version_depends_only_on_components(self):
+        v1, p1 = price_guide.build(COMPONENTS, NOW)
+        v2, p2 = price_guide.build(dict(reversed(list(COMPONENTS.items()))), datetime(2026, 3, 2))
+        assert v1 == v2
+        assert p1 != p2          # generated_at differs
+        assert price_guide.build(COMPONENTS, NOW)[1] == p1   # gzip mtime pinned
+
+    def test_version_changes_with_data(self):
+        changed = {**COMPONENTS, 'cpu': [{'Model': 'i7-8700K', 'AvgPrice': Decimal('90.00')}]}
+        assert price_guide.build(changed, NOW)[0] != price_guide.build(COMPONENTS, NOW)[0]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2. publish() — skips unchanged content, prunes old snapshots
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestPublish:
+    def _cursor(self, latest_version):
+        cur = MagicMock()
+        cur.description = [('Model',), ('AvgPrice',), ('MinPrice',), ('MaxPrice',), ('SoldCount',)]
+        cur.fetchall.return_value = []
+        cur.fetchone.return_value = (latest_version, NOW, b'') if latest_version else None
+        return cur
+
+    def _sql(self, cur):
+        return [' '.join(c[0][0].split()) for c in cur.execute.call_args_list]
+
+    def test_inserts_new_snapshot(self):
+        cur = self._cursor(None)
+        version, created = price_guide.publish(cur, now=NOW)
+        assert created
+        sql = self._sql(cur)
+        assert sum(q.startswith('INSERT INTO Scraper.PriceGuideSnapshots') for q in sql) == 1
+        assert any('LIMIT 5' in q and q.startswith('DELETE') for q in sql)
+        insert = next(c for c in cur.execute.call_args_list if c[0][0].startswith('INSERT'))
+        assert insert[0][1][0] == version
+
+    def test_unchanged_content_is_not_rewritten(self):
+        expected, _ = price_guide.build({k: [] for k in price_guide.QUERIES}, NOW)
+        cur = self._cursor(expected)
+        version, created = price_guide.publish(cur, now=NOW)
+        assert (version, created) == (expected, False)
+        assert not any(q.startswith(('INSERT', 'DELETE')) for q in self._sql(cur))
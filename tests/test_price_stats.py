@@ -0,0 +1,124 @@
+"""
+Tests for price_stats.py
+
+    pytest tests/test_price_stats.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+from unittest.mock import patch
+
+import price_stats
+import EbayScraper
+
+_stdev_parse = vars(EbayScraper)["__StDevParse"]
+
+
+def _legacy_stdev_parse(numberList):
+    """The original O(n²) __StDevParse, used as a reference oracle."""
+    if not numberList:
+        return []
+    avg = sum(numberList) / len(numberList)
+    stdev = 0
+    if len(numberList) > 1:
+        stdev = (sum((x - avg) ** 2 for x in numberList) / (len(numberList) - 1)) ** 0.5
+    return [n for n in numberList if avg + stdev >= n >= avg - stdev]
+
+
+PAGE = [310.0, 295.5, 305.0, 320.0, 299.99, 1.5, 4999.0, 301.0, 288.0, 315.0]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1. Summary statistics
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSummaryStats:
+    def test_mean_and_stdev(self):
+        assert price_stats.mean([2, 4, 6]) == 4
+        assert price_stats.stdev([2, 4, 6]) == 2.0
+
+    def test_empty_and_single(self):
+        assert price_stats.mean([]) == 0
+        assert price_stats.stdev([7]) == 0
+        assert price_stats.median([]) == 0
+
+    def test_median_even_and_odd(self):
+        assert price_stats.median([3, 1, 2]) == 2
+        assert price_stats.median([4, 1, 3, 2]) == 2.5
+
+    def test_mad(self):
+        assert price_stats.mad([1, 1, 2, 2, 4, 6, 9]) == 1
+
+    def test_quantile_interpolates(self):
+        assert price_stats.quantile([1, 2, 3, 4], 0.25) == 1.75
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2. Outlier filters
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestFilterOutliers:
+    def test_stdev_matches_legacy(self):
+        assert price_stats.filter_outliers(PAGE, 'stdev') == _legacy_stdev_parse(PAGE)
+        assert _stdev_parse(PAGE) == _legacy_stdev_parse(PAGE)
+
+    def test_stdev_drops_the_extreme_listing(self):
+        kept = price_stats.filter_outliers(PAGE, 'stdev')
+        assert 4999.0 not in kept and 305.0 in kept
+
+    @pytest.mark.parametrize("method", ['iqr', 'mad'])
+    def test_robust_methods_drop_both_junk_listings(self, method):
+        kept = price_stats.filter_outliers(PAGE, method)
+        assert 1.5 not in kept and 4999.0 not in kept
+        assert 305.0 in kept
+
+    def test_robust_methods_keep_more_of_the_body(self):
+        """One extreme value inflates σ; IQR and MAD are not pulled by it."""
+        prices = [100, 102, 98, 101, 99, 103, 97, 10_000]
+        assert len(price_stats.filter_outliers(prices, 'iqr')) == 7
+        assert len(price_stats.filter_outliers(prices, 'mad')) == 7
+
+    def test_preserves_order(self):
+        assert price_stats.filter_outliers([5, 3, 4], 'iqr') == [5, 3, 4]
+
+    def test_unknown_method_raises(self):
+        with pytest.raises(ValueError, match="Unknown outlier method"):
+            price_stats.bounds([1, 2], 'zscore')
+
+    @pytest.mark.skipif(price_stats.np is None, reason="numpy not installed")
+    @pytest.mark.parametrize("method", price_stats.METHODS)
+    def test_numpy_backend_agrees(self, method):
+        prices = PAGE * 40
+        with patch.object(price_stats, "NUMPY_MIN_SIZE", float("inf")):
+            expected = price_stats.bounds(prices, method)
+        with patch.object(price_stats, "NUMPY_MIN_SIZE", 0):
+            assert price_stats.bounds(prices, method) == pytest.approx(expected)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 3. EbayScraper integration — PRICE_OUTLIER_METHOD
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestDropPriceOutliers:
+    def _items(self, prices):
+        return [EbayScraper.Product(
+            id=i, title='x', price=p, shipping=0, time_left=None, time_end=None,
+            sold_date=None, bid_count=0, reviews_count=0, url='', brand=None,
+            model=None, vram=None,
+        ) for i, p in enumerate(prices)]
+
+    def test_duplicate_prices_all_kept(self):
+        """Filtering is by bounds, so repeated in-range prices all survive."""
+        drop = vars(EbayScraper)["__DropPriceOutliers"]
+        kept = drop(self._items([300, 300, 300, 305, 295, 4999]))
+        assert [i.price for i in kept] == [300, 300, 300, 305, 295]
+
+    def test_method_is_configurable(self):
+        drop = vars(EbayScraper)["__DropPriceOutliers"]
+        prices = [100, 102, 98, 101, 99, 103, 97, 10_000]
+        with patch.object(EbayScraper, "PRICE_OUTLIER_METHOD", "mad"):
+            assert len(drop(self._items(prices))) == 7
@@ -0,0 +1,106 @@
+"""
+Tests for query_schedule.py
+
+    pytest tests/test_query_schedule.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from query_schedule import QuerySchedule, QueryYield
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+QUERIES = [('GPU', 'NVIDIA RTX 30'), ('GPU', 'NVIDIA GTX 9'), ('RAM', '16gb ddr4 ram')]
+
+
+def _schedule(budget=6, **kw):
+    return QuerySchedule(QUERIES, budget_per_hour=budget, min_interval=5, max_interval=600, **kw)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1. QueryYield — weighted score
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestQueryYield:
+    def test_deals_outweigh_new_ids(self):
+        assert QueryYield(deals=1).score > QueryYield(new_ids=5).score
+
+    def test_empty_run_scores_zero(self):
+        assert QueryYield().score == 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2. QuerySchedule — intervals from yield, spend within budget
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestQuerySchedule:
+    def test_every_query_due_on_first_pass(self):
+        assert sorted(_schedule().due(NOW)) == sorted(QUERIES)
+
+    def test_first_pass_is_capped_by_budget(self):
+        assert len(_schedule(budget=2).due(NOW)) == 2
+
+    def test_high_yield_query_gets_shorter_interval(self):
+        sched = _schedule()
+        sched.record('GPU', 'NVIDIA RTX 30', QueryYield(new_ids=40, deals=2, ending_soon=10), NOW)
+        sched.record('GPU', 'NVIDIA GTX 9', QueryYield(), NOW)
+        sched.record('RAM', '16gb ddr4 ram', QueryYield(new_ids=5), NOW)
+        busy = sched.states[('GPU', 'NVIDIA RTX 30')].interval
+        dead = sched.states[('GPU', 'NVIDIA GTX 9')].interval
+        assert busy < sched.states[('RAM', '16gb ddr4 ram')].interval < dead
+
+    def test_intervals_spend_the_budget(self):
+        sched = _schedule()
+        for c, q in QUERIES:
+            sched.record(c, q, QueryYield(new_ids=10), NOW)
+        runs_per_hour = sum(timedelta(hours=1) / s.interval for s in sched.states.values())
+        assert runs_per_hour == pytest.approx(6)
+
+    def test_interval_clamped(self):
+        sched = QuerySchedule(QUERIES, budget_per_hour=1000, min_interval=15, max_interval=360)
+        assert all(s.interval == timedelta(minutes=15) for s in sched.states.values())
+
+    def test_due_after_interval_most_overdue_first(self):
+        sched = _schedule()
+        for c, q in QUERIES:
+            sched.record(c, q, QueryYield(new_ids=10), NOW)
+        assert sched.due(NOW + timedelta(minutes=1)) == []
+        sched.states[('GPU', 'NVIDIA GTX 9')].last_run = NOW - timedelta(hours=2)
+        due = sched.due(NOW + timedelta(minutes=31))
+        assert due[0] == ('GPU', 'NVIDIA GTX 9')
+        assert len(due) == 3
+
+    def test_budget_refills_over_time(self):
+        sched = _schedule(budget=2)
+        for key in sched.due(NOW):
+            sched.record(*key, QueryYield(), NOW)
+        assert sched.due(NOW) == []
+        # One run's worth of budget back after half an hour at 2/h
+        assert len(sched.due(NOW + timedelta(minutes=30))) == 1
+
+    def test_failed_run_keeps_score(self):
+        sched = _schedule()
+        sched.record('GPU', 'NVIDIA RTX 30', QueryYield(new_ids=10), NOW)
+        sched.record('GPU', 'NVIDIA RTX 30', None, NOW + timedelta(hours=1))
+        state = sched.states[('GPU', 'NVIDIA RTX 30')]
+        assert state.score == 10
+        assert state.last_run == NOW + timedelta(hours=1)
+
+    def test_restore_carries_scores_and_last_runs(self):
+        sched = _schedule()
+        for c, q in QUERIES:
+            sched.record(c, q, QueryYield(new_ids=10 if c == 'GPU' else 1), NOW)
+        saved = [(s.category, s.query, s.score, s.last_run) for s in sched.states.values()]
+
+        restarted = _schedule()
+        assert restarted.restore(saved + [('GPU', 'retired', 3.0, NOW)]) == len(QUERIES)
+        assert restarted.due(NOW + timedelta(minutes=1)) == []
+        assert {k: s.interval for k, s in restarted.states.items()} == \
+               {k: s.interval for k, s in sched.states.items()}
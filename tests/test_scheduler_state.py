@@ -0,0 +1,132 @@
+"""
+Tests for scheduler_state.py and the scheduler's warm restart
+
+    pytest tests/test_scheduler_state.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import scheduler
+import scheduler_state
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+def _sql(cur, method='execute'):
+    return [' '.join(c[0][0].split()) for c in getattr(cur, method).call_args_list]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1. load / save — mocked cursor
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestLoad:
+    def test_reads_all_three_parts(self):
+        cur = MagicMock()
+        cur.fetchone.return_value = (600,)      # last full scrape 10 min ago, by the DB clock
+        cur.fetchall.side_effect = [
+            [('GPU', 'NVIDIA RTX 30', 12.5, NOW - timedelta(minutes=20))],
+            [(123, NOW - timedelta(minutes=3))],
+        ]
+        state = scheduler_state.load(cur, now=NOW)
+        assert state.last_full_scrape == NOW - timedelta(minutes=10)
+        assert state.queries == [('GPU', 'NVIDIA RTX 30', 12.5, NOW - timedelta(minutes=20))]
+        assert state.targeted == {'123': NOW - timedelta(minutes=3)}
+        targeted = next(c for c in cur.execute.call_args_list if 'TargetedScrapes WHERE' in c[0][0])
+        assert targeted[0][1] == (NOW,)         # ended auctions are not loaded
+
+    def test_no_full_scrape_on_record(self):
+        cur = MagicMock()
+        cur.fetchone.return_value = None
+        cur.fetchall.return_value = []
+        assert scheduler_state.load(cur, now=NOW) == scheduler_state.SchedulerState()
+
+
+class TestSave:
+    def test_queries_upserted(self):
+        cur = MagicMock()
+        scheduler_state.save_queries(cur, [('GPU', 'NVIDIA RTX 30', None, NOW.replace(microsecond=5))])
+        assert _sql(cur, 'executemany')[0].startswith('INSERT INTO Scraper.QueryScheduleState')
+        assert cur.executemany.call_args[0][1] == [('GPU', 'NVIDIA RTX 30', None, NOW)]
+
+    def test_nothing_to_save_touches_nothing(self):
+        cur = MagicMock()
+        scheduler_state.save_queries(cur, [])
+        cur.execute.assert_not_called()
+
+    def test_targeted_upserted_and_ended_evicted(self):
+        cur = MagicMock(rowcount=4)
+        evicted = scheduler_state.save_targeted(cur, [('123', NOW, NOW + timedelta(minutes=4))], now=NOW)
+        assert evicted == 4
+        assert cur.executemany.call_args[0][1] == [(123, NOW, NOW + timedelta(minutes=4))]
+        delete = next(c for c in cur.execute.call_args_list if c[0][0].startswith('DELETE'))
+        assert delete[0][1] == (NOW,)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2. scheduler — restore on startup, bounded targeted state
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@pytest.fixture
+def fresh_scheduler(monkeypatch):
+    monkeypatch.setattr(scheduler, '_last_full_scrape', None)
+    monkeypatch.setattr(scheduler, '_last_targeted', {})
+    monkeypatch.setattr(scheduler, '_query_schedule', scheduler.query_schedule.QuerySchedule(
+        [(c, q) for c, queries in scheduler.QUERY_LISTS for q in queries]))
+    return scheduler
+
+
+class TestWarmRestart:
+    def test_restore_resumes_schedule(self, fresh_scheduler):
+        now = datetime.now()
+        state = scheduler_state.SchedulerState(
+            last_full_scrape=now - timedelta(minutes=10),
+            queries=[('GPU', q, 5.0, now - timedelta(minutes=10)) for q in scheduler.GPU_QUERY_LIST]
+                    + [('GPU', 'retired query', 1.0, now)],
+            targeted={'123': now},
+        )
+        with patch.object(scheduler.EbayScraper, 'LoadSchedulerState', return_value=state):
+            fresh_scheduler.restore_state()
+        assert fresh_scheduler._last_full_scrape == state.last_full_scrape
+        assert fresh_scheduler._last_targeted == {'123': now}
+        due = fresh_scheduler._query_schedule.due(now)
+        assert due and not any(c == 'GPU' for c, _ in due)     # GPU queries ran 10 min ago
+
+    def test_ended_deals_are_forgotten(self, fresh_scheduler):
+        now = datetime.now()
+        fresh_scheduler._last_targeted.update({'1': now - timedelta(minutes=2), '2': now})
+        deals = [(1, 'GPU', 'RTX 3080', now + timedelta(minutes=3), 'RTX 3080')]
+        with patch.object(scheduler.EbayScraper, 'GetActiveDeals', return_value=deals), \
+             patch.object(scheduler.EbayScraper, 'ScrapeTargeted') as scrape, \
+             patch.object(scheduler.EbayScraper, 'SaveSchedulerState') as save, \
+             patch.object(scheduler, '_finish_metrics_run'):
+            fresh_scheduler.run_targeted_scrapes()
+        assert list(fresh_scheduler._last_targeted) == ['1']
+        scrape.assert_called_once()
+        (ebay_id, _, end_time), = save.call_args.kwargs['targeted']
+        assert (ebay_id, end_time) == ('1', deals[0][3])
+
+    def test_last_deal_ending_empties_targeted_state(self, fresh_scheduler):
+        fresh_scheduler._last_targeted.update({'1': datetime.now(), '2': datetime.now()})
+        with patch.object(scheduler.EbayScraper, 'GetActiveDeals', return_value=[]), \
+             patch.object(scheduler.EbayScraper, 'ScrapeTargeted') as scrape:
+            fresh_scheduler.run_targeted_scrapes()
+        assert fresh_scheduler._last_targeted == {}
+        scrape.assert_not_called()
+
+    def test_every_save_evicts_ended_auctions(self):
+        conn = MagicMock()
+        with patch("EbayScraper._get_connection", return_value=conn):
+            assert scheduler.EbayScraper.SaveSchedulerState(queries=[('GPU', 'NVIDIA RTX 30', 1.0, NOW)])
+        cur = conn.cursor()
+        assert any(q.startswith('DELETE FROM Scraper.TargetedScrapes') for q in _sql(cur))
+        assert cur.executemany.call_count == 1      # the query upsert; no targeted rows
+        conn.commit.assert_called_once()
@@ -0,0 +1,184 @@
+"""
+Tests for scrape_metrics.py and its use in EbayScraper
+
+    pytest tests/test_scrape_metrics.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import concurrent.futures
+import contextvars
+import pytest
+from unittest.mock import MagicMock, patch
+
+import scrape_metrics
+import EbayScraper
+
+
+@pytest.fixture(autouse=True)
+def fresh_run():
+    run = scrape_metrics.start_run('test')
+    yield run
+    scrape_metrics.finish_run()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1. Collector
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestCollector:
+    def test_timer_and_counters_use_scope_labels(self, fresh_run):
+        with scrape_metrics.scope(category='GPU', query='RTX 30'):
+            with scrape_metrics.timer('upload'):
+                pass
+            scrape_metrics.incr('items_skipped', 2, detail='price')
+        scrape_metrics.incr('items_skipped', detail='price')
+
+        stat = fresh_run.stages[('GPU', 'RTX 30', 'upload')]
+        assert stat.count == 1 and stat.seconds >= 0
+        assert fresh_run.counters[('GPU', 'RTX 30', 'items_skipped', 'price')] == 2
+        assert fresh_run.counters[('', '', 'items_skipped', 'price')] == 1
+        assert fresh_run.total('items_skipped') == 3
+
+    def test_observe_tracks_max(self, fresh_run):
+        scrape_metrics.observe('parse', 0.5)
+        scrape_metrics.observe('parse', 0.25)
+        stat = fresh_run.stages[('', '', 'parse')]
+        assert (stat.count, stat.seconds, stat.max_seconds) == (2, 0.75, 0.5)
+
+    def test_finish_run_detaches(self, fresh_run):
+        finished = scrape_metrics.finish_run()
+        scrape_metrics.incr('block_pages')
+        assert finished is fresh_run and finished.finished_at is not None
+        assert finished.total('block_pages') == 0
+
+    def test_deferred_buffers_only_named_metrics(self, fresh_run):
+        with scrape_metrics.deferred('items_parsed', 'parse') as held:
+            scrape_metrics.incr('items_parsed', 3)
+            scrape_metrics.observe('parse', 0.5)
+            scrape_metrics.incr('block_pages')
+        assert fresh_run.total('items_parsed') == 0 and ('', '', 'parse') not in fresh_run.stages
+        assert fresh_run.total('block_pages') == 1
+        scrape_metrics.merge(held.stages, held.counters)
+        assert fresh_run.total('items_parsed') == 3
+        assert fresh_run.stages[('', '', 'parse')].count == 1
+
+    def test_labels_follow_copied_context_into_threads(self, fresh_run):
+        with scrape_metrics.scope(category='CPU', query='targeted'), \
+             concurrent.futures.ThreadPoolExecutor(1) as pool:
+            pool.submit(contextvars.copy_context().run, scrape_metrics.incr, 'block_pages').result()
+        assert fresh_run.counters[('CPU', 'targeted', 'block_pages', '')] == 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2. persist() — mocked cursor
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestPersist:
+    def test_writes_run_and_rows(self, fresh_run):
+        with scrape_metrics.scope(category='HDD', query='SAS'):
+            scrape_metrics.observe('fetch_direct', 1.5)
+            scrape_metrics.incr('bytes_fetched', 1000, detail='direct')
+        run = scrape_metrics.finish_run()
+
+        cur = MagicMock()
+        cur.lastrowid = 42
+        assert scrape_metrics.persist(cur, run) == 42
+        rows = cur.executemany.call_args[0][1]
+        assert (42, 'HDD', 'SAS', 'fetch_direct', '', 1, 1.5, 1.5) in rows
+        assert (42, 'HDD', 'SAS', 'bytes_fetched', 'direct', 1000, None, None) in rows
+
+    def test_record_never_raises(self):
+        with patch.object(EbayScraper, '_get_connection', side_effect=Exception("down")):
+            assert EbayScraper.RecordScrapeMetrics(scrape_metrics.finish_run()) is None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 3. EbayScraper instrumentation
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestScraperInstrumentation:
+    def test_parse_counts_and_skip_reasons(self, fresh_run):
+        cards = "".join(
+            '<div class="su-card-container su-card-container--horizontal">'
+            f'<div class="s-card__title"><span>{title}</span></div>'
+            f'<span class="s-card__price">{price}</span>'
+            f'<a class="su-link" href="https://www.ebay.co.uk/itm/{i}"></a>'
+            '</div>'
+            for i, (title, price) in enumerate([
+                ("placeholder", "£1"), ("Corsair 16GB DDR4 3200", "£40"),
+                ("Mystery memory stick", "£10"), ("Kingston 8GB DDR4", "no price"),
+            ], start=100)
+        )
+        stream = vars(EbayScraper)["__StreamItems"]
+        items = list(stream(["<html>" + cards + "</html>"], "ram", "RAM"))
+        assert [i.id for i in items] == [101]
+        assert fresh_run.total('items_parsed') == 1
+        assert fresh_run.total('items_skipped', 'ram_type') == 1
+        assert fresh_run.total('items_skipped', 'price') == 1
+        assert ('', '', 'parse') in fresh_run.stages
+
+    def test_cached_titles_count_hits_and_skips(self, fresh_run):
+        card = ('<div class="su-card-container su-card-container--horizontal">'
+                '<div class="s-card__title"><span>{}</span></div>'
+                '<span class="s-card__price">£40</span>'
+                '<a class="su-link" href="https://www.ebay.co.uk/itm/{}"></a></div>')
+        page = "<html>" + card.format("placeholder", 1) + card.format("Crucial 8GB stick", 2) + "</html>"
+        stream = vars(EbayScraper)["__StreamItems"]
+        EbayScraper._get_title_cache().clear()
+        list(stream([page], "ram", "RAM"))
+        list(stream([page], "ram", "RAM"))
+        assert fresh_run.total('title_cache', 'miss') == 1
+        assert fresh_run.total('title_cache', 'hit') == 1
+        # A skip served from the cache is still counted under its reason.
+        assert fresh_run.total('items_skipped', 'ram_type') == 2
+
+    def test_stream_direct_records_bytes_and_time(self, fresh_run):
+        body = ("<html>" + "x" * 60_000 + "</html>").encode()
+        session = MagicMock()
+        resp = MagicMock(status_code=200, encoding="utf-8", headers={}, url="https://example.com")
+        resp.iter_content.return_value = iter([body[:30_000], body[30_000:]])
+        session.get.return_value = resp
+        with patch.object(EbayScraper, "_get_direct_session", return_value=session):
+            list(EbayScraper._stream_direct("https://example.com"))
+        assert fresh_run.total('bytes_fetched', 'direct') == len(body)
+        assert fresh_run.stages[('', '', 'fetch_direct')].count == 1
+        assert fresh_run.total('fetch_failures') == 0
+
+    def test_block_page_counted(self, fresh_run):
+        session = MagicMock()
+        resp = MagicMock(status_code=200, encoding="utf-8", headers={}, url="https://example.com")
+        resp.iter_content.return_value = iter([b"<html>captcha</html>"])
+        session.get.return_value = resp
+        with patch.object(EbayScraper, "_get_direct_session", return_value=session):
+            with pytest.raises(RuntimeError):
+                list(EbayScraper._stream_direct("https://example.com"))
+        assert fresh_run.total('block_pages') == 1
+        assert fresh_run.total('fetch_failures', 'direct') == 1
+
+    def test_abandoned_stream_parse_not_counted_twice(self, fresh_run):
+        """Cards parsed before a stream fails are dropped with their metrics; only the Zyte refetch counts."""
+        card = ('<div class="su-card-container su-card-container--horizontal">'
+                '<div class="s-card__title"><span>{}</span></div>'
+                '<span class="s-card__price">£40</span>'
+                '<a class="su-link" href="https://www.ebay.co.uk/itm/{}"></a></div>')
+        cards = [card.format("placeholder", 1)] + [card.format(f"Corsair {n}GB DDR4 3200", 100 + n)
+                                                     for n in (8, 16, 32)]
+        page = "<html>" + "".join(cards) + "</html>"
+
+        def stream(url):
+            yield "<html>" + "".join(cards[:3])
+            scrape_metrics.incr('block_pages', detail='direct')
+            raise RuntimeError("Direct fetch failed mid-stream: reset")
+
+        fetch_items = vars(EbayScraper)["__FetchItems"]
+        with patch.object(EbayScraper, "_stream_direct", side_effect=stream), \
+             patch.object(EbayScraper, "_fetch_zyte", return_value=page.encode()):
+            items = fetch_items("ram", "uk", "used", "auction", "RAM", dedup=EbayScraper.RunDedup())
+        assert len(items) == 3
+        assert fresh_run.total('items_parsed') == 3
+        assert fresh_run.stages[('', '', 'parse')].count == 1
+        assert fresh_run.total('block_pages') == 1
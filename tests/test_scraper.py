@@ -16,11 +16,16 @@ import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+import concurrent.futures
+import multiprocessing
+import pickle
+
 import pytest
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 
 import EbayScraper
+import scrape_metrics
 
 # ── Access private module helpers ────────────────────────────────────────────
 # Module-level double-underscore names have no name mangling (that only
@@ -147,6 +152,7 @@ class TestParseSoldDate:
 # ═══════════════════════════════════════════════════════════════════════════════
 
 LARGE_HTML = "<html>" + "x" * 60_000 + "</html>"   # passes the 50 KB sanity check
+LARGE_BODY = LARGE_HTML.encode()                    # what the fetchers return
 
 
 class TestFetchDirect:
@@ -154,20 +160,28 @@ class TestFetchDirect:
         # Each test gets a clean module-level session so tests don't bleed into each other.
         EbayScraper.reset_direct_session()
 
-    def _mock_session(self, status=200, text=LARGE_HTML):
+    def _mock_session(self, status=200, body=LARGE_BODY):
         """Return a mock curl_cffi Session whose .get() yields the given response."""
         session = MagicMock()
         session.cookies = {}
         resp = MagicMock()
         resp.status_code = status
-        resp.text = text
+        resp.headers = {}
+        resp.url = "https://example.com"
+        resp.iter_content.return_value = iter([body[:20_000], body[20_000:]])
         session.get.return_value = resp
         return session
 
-    def test_success_returns_html(self):
+    def test_success_returns_body_bytes(self):
         with patch("curl_cffi.requests.Session", return_value=self._mock_session()):
             result = EbayScraper._fetch_direct("https://example.com")
-        assert result == LARGE_HTML
+        assert result == LARGE_BODY
+
+    def test_block_check_counts_bytes_not_chars(self):
+        """20k three-byte characters are 60 KB on the wire — a real page, not a block page."""
+        body = ("<html>" + "€" * 20_000 + "</html>").encode()
+        with patch("curl_cffi.requests.Session", return_value=self._mock_session(body=body)):
+            assert EbayScraper._fetch_direct("https://example.com") == body
 
     def test_http_403_returns_none(self):
         with patch("curl_cffi.requests.Session", return_value=self._mock_session(status=403)):
@@ -176,10 +190,15 @@ class TestFetchDirect:
 
     def test_response_too_small_returns_none(self):
         with patch("curl_cffi.requests.Session",
-                   return_value=self._mock_session(text="<html>blocked</html>")):
+                   return_value=self._mock_session(body=b"<html>blocked</html>")):
             result = EbayScraper._fetch_direct("https://example.com")
         assert result is None
 
+    def test_captcha_page_returns_none(self):
+        body = b"<html>" + b"<div>Please verify yourself to continue</div>" + b"x" * 60_000
+        with patch("curl_cffi.requests.Session", return_value=self._mock_session(body=body)):
+            assert EbayScraper._fetch_direct("https://example.com") is None
+
     def test_connection_error_returns_none(self):
         session = MagicMock()
         session.cookies = {}
@@ -194,6 +213,27 @@ class TestFetchDirect:
         assert result is None
 
 
+class TestPageEncoding:
+    def test_declared_meta_charset(self):
+        body = '<html><head><meta charset="ISO-8859-1"></head><body>£5</body></html>'.encode('latin-1')
+        assert EbayScraper._page_encoding(body) == 'iso8859-1'
+        assert '£5' in EbayScraper._page_text(body)
+
+    def test_http_equiv_content_type(self):
+        body = b'<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">'
+        assert EbayScraper._page_encoding(body) == 'cp1252'
+
+    def test_defaults_to_utf8(self):
+        assert EbayScraper._page_encoding(LARGE_BODY) == 'utf-8'
+        assert EbayScraper._page_encoding(b'<meta charset="no-such-codec">') == 'utf-8'
+
+    def test_get_html_parses_bytes(self):
+        body = ('<html><head><meta charset="utf-8"></head><body><p>£420</p></body></html>').encode()
+        with patch.object(EbayScraper, "_fetch_direct", return_value=body):
+            soup = vars(EbayScraper)["__GetHTML"]("q", "uk", "all", "all")
+        assert soup.p.get_text() == "£420"
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # 5. _fetch_zyte — mocked, no network
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -210,11 +250,11 @@ class TestFetchZyte:
         r.raise_for_status = MagicMock()
         return r
 
-    def test_success_returns_html(self):
+    def test_success_returns_body_bytes(self):
         with patch.dict(os.environ, self.ZYTE_CREDS):
-            with patch("requests.post", return_value=self._mock_resp()):
+            with patch("requests.Session.post", return_value=self._mock_resp()):
                 result = EbayScraper._fetch_zyte("https://example.com")
-        assert result == LARGE_HTML
+        assert result == LARGE_BODY
 
     def test_missing_key_returns_none(self):
         clean_env = {k: v for k, v in os.environ.items() if k != "ZYTE_API_KEY"}
@@ -223,15 +263,21 @@ class TestFetchZyte:
         assert result is None
 
     def test_small_response_returns_none(self):
-        """Zyte returning <50k chars should be treated as a block page."""
+        """Zyte returning <50 KB should be treated as a block page."""
         with patch.dict(os.environ, self.ZYTE_CREDS):
-            with patch("requests.post", return_value=self._mock_resp("<html>tiny</html>")):
+            with patch("requests.Session.post", return_value=self._mock_resp("<html>tiny</html>")):
                 result = EbayScraper._fetch_zyte("https://example.com")
         assert result is None
 
+    def test_captcha_page_returns_none(self):
+        html = "<html><title>Access Denied</title>" + "x" * 60_000 + "</html>"
+        with patch.dict(os.environ, self.ZYTE_CREDS):
+            with patch("requests.Session.post", return_value=self._mock_resp(html)):
+                assert EbayScraper._fetch_zyte("https://example.com") is None
+
     def test_request_exception_returns_none(self):
         with patch.dict(os.environ, self.ZYTE_CREDS):
-            with patch("requests.post", side_effect=Exception("connection refused")):
+            with patch("requests.Session.post", side_effect=Exception("connection refused")):
                 result = EbayScraper._fetch_zyte("https://example.com")
         assert result is None
 
@@ -239,7 +285,7 @@ class TestFetchZyte:
         bad_resp = MagicMock()
         bad_resp.raise_for_status.side_effect = Exception("403 Forbidden")
         with patch.dict(os.environ, self.ZYTE_CREDS):
-            with patch("requests.post", return_value=bad_resp):
+            with patch("requests.Session.post", return_value=bad_resp):
                 result = EbayScraper._fetch_zyte("https://example.com")
         assert result is None
 
@@ -253,17 +299,17 @@ class TestFetchZyte:
         """First call returns 520; second succeeds — result is HTML, sleep called once with 2s."""
         env = {**self.ZYTE_CREDS, "ZYTE_MAX_RETRIES": "3"}
         with patch.dict(os.environ, env):
-            with patch("requests.post", side_effect=[self._mock_520(), self._mock_resp()]):
+            with patch("requests.Session.post", side_effect=[self._mock_520(), self._mock_resp()]):
                 with patch("time.sleep") as mock_sleep:
                     result = EbayScraper._fetch_zyte("https://example.com")
-        assert result == LARGE_HTML
+        assert result == LARGE_BODY
         mock_sleep.assert_called_once_with(2)
 
     def test_520_exhausts_retries_returns_none(self):
         """All 3 attempts return 520 — gives up, returns None; sleep called twice (not after last)."""
         env = {**self.ZYTE_CREDS, "ZYTE_MAX_RETRIES": "3"}
         with patch.dict(os.environ, env):
-            with patch("requests.post", return_value=self._mock_520()):
+            with patch("requests.Session.post", return_value=self._mock_520()):
                 with patch("time.sleep") as mock_sleep:
                     result = EbayScraper._fetch_zyte("https://example.com")
         assert result is None
@@ -275,10 +321,10 @@ class TestFetchZyte:
 # ═══════════════════════════════════════════════════════════════════════════════
 
 class TestFetchFallback:
-    """Verify __GetHTML tries direct first and only calls Zyte on failure."""
+    """Verify Scrape streams the direct fetch first and only calls Zyte on failure."""
 
     def test_direct_used_when_available(self):
-        with patch.object(EbayScraper, "_fetch_direct", return_value=LARGE_HTML) as mock_direct, \
+        with patch.object(EbayScraper, "_stream_direct", return_value=iter([LARGE_HTML])) as mock_direct, \
              patch.object(EbayScraper, "_fetch_zyte") as mock_zyte:
             try:
                 EbayScraper.Scrape("test query", "GPU", country="uk",
@@ -289,8 +335,9 @@ class TestFetchFallback:
             mock_zyte.assert_not_called()
 
     def test_zyte_called_when_direct_fails(self):
-        with patch.object(EbayScraper, "_fetch_direct", return_value=None) as mock_direct, \
-             patch.object(EbayScraper, "_fetch_zyte", return_value=LARGE_HTML) as mock_zyte:
+        with patch.object(EbayScraper, "_stream_direct",
+                          side_effect=RuntimeError("blocked")) as mock_direct, \
+             patch.object(EbayScraper, "_fetch_zyte", return_value=LARGE_BODY) as mock_zyte:
             try:
                 EbayScraper.Scrape("test query", "GPU", country="uk",
                                    condition="used", listing_type="auction", cache=False)
@@ -300,7 +347,7 @@ class TestFetchFallback:
             mock_zyte.assert_called()
 
     def test_raises_when_both_fail(self):
-        with patch.object(EbayScraper, "_fetch_direct", return_value=None), \
+        with patch.object(EbayScraper, "_stream_direct", side_effect=RuntimeError("blocked")), \
              patch.object(EbayScraper, "_fetch_zyte", return_value=None):
             with pytest.raises(RuntimeError, match="All fetch methods failed"):
                 EbayScraper.Scrape("test query", "GPU", country="uk",
@@ -314,22 +361,14 @@ class TestFetchFallback:
 class TestScrapeItemById:
     """Unit tests for _scrape_item_by_id — __GetHTML and __ParseItems mocked via patch.dict."""
 
-    def _make_item(self, ebay_id: str, sold_date=None) -> dict:
-        return {
-            'id': ebay_id,
-            'title': 'Test GPU',
-            'price': 500.0,
-            'shipping': 0,
-            'time-left': '',
-            'time-end': None,
-            'sold-date': sold_date,
-            'bid-count': 5,
-            'reviews-count': 0,
-            'url': f'https://www.ebay.co.uk/itm/{ebay_id}',
-            'brand': 'Test', 'model': 'RTX 9000', 'vram': 16,
-            'socket': None, 'cores': None,
-            'capacity-gb': None, 'interface': None, 'form-factor': None, 'rpm': None,
-        }
+    def _make_item(self, ebay_id: str, sold_date=None) -> EbayScraper.Product:
+        return EbayScraper.Product(
+            id=int(ebay_id), title='Test GPU', price=500.0, shipping=0,
+            time_left='', time_end=None, sold_date=sold_date,
+            bid_count=5, reviews_count=0,
+            url=f'https://www.ebay.co.uk/itm/{ebay_id}',
+            brand='Test', model='RTX 9000', vram=16,
+        )
 
     def _patch_internals(self, parse_return):
         """Return a patch.dict context that replaces __GetHTML and __ParseItems."""
@@ -340,20 +379,20 @@ class TestScrapeItemById:
         })
 
     def test_sold_returns_matching_item(self):
-        """sold=True: returns item dict when the ID matches a sold result."""
+        """sold=True: returns the Product when the ID matches a sold result."""
         item = self._make_item('123456789', sold_date=datetime(2026, 2, 27))
         with self._patch_internals([item]):
             result = EbayScraper._scrape_item_by_id(123456789, 'GPU', sold=True)
         assert result is not None
-        assert result['id'] == '123456789'
+        assert result.id == 123456789
 
     def test_active_returns_matching_item(self):
-        """sold=False: returns item dict when the ID matches an active result."""
+        """sold=False: returns the Product when the ID matches an active result."""
         item = self._make_item('987654321')
         with self._patch_internals([item]):
             result = EbayScraper._scrape_item_by_id(987654321, 'GPU', sold=False)
         assert result is not None
-        assert result['id'] == '987654321'
+        assert result.id == 987654321
 
     def test_no_match_returns_none(self):
         """Returns None when ParseItems returns results but none match the target ID."""
@@ -416,21 +455,13 @@ class TestVerifyPendingOutcomes:
         conn, cur = self._make_conn([pending_row])
         cur.rowcount = 0  # Phase 1: no items gave up
 
-        matching_item = {
-            'id': '123456789',
-            'title': 'ASUS RTX 4090 24GB OC Gaming',
-            'price': 750.00,
-            'shipping': 0,
-            'time-left': '',
-            'time-end': None,
-            'sold-date': sold_dt,
-            'bid-count': 12,
-            'reviews-count': 0,
-            'url': 'https://www.ebay.co.uk/itm/123456789',
-            'brand': 'ASUS', 'model': 'RTX 4090', 'vram': 24,
-            'socket': None, 'cores': None,
-            'capacity-gb': None, 'interface': None, 'form-factor': None, 'rpm': None,
-        }
+        matching_item = EbayScraper.Product(
+            id=123456789, title='ASUS RTX 4090 24GB OC Gaming',
+            price=750.00, shipping=0, time_left='', time_end=None,
+            sold_date=sold_dt, bid_count=12, reviews_count=0,
+            url='https://www.ebay.co.uk/itm/123456789',
+            brand='ASUS', model='RTX 4090', vram=24,
+        )
 
         with patch.object(EbayScraper, '_get_connection', return_value=conn), \
              patch.object(EbayScraper, '_scrape_item_by_id', return_value=matching_item):
@@ -472,21 +503,14 @@ class TestVerifyPendingOutcomes:
         cur.rowcount = 0  # Phase 1: no items gave up
 
         # Item appears in all-completed results (ended unsold) but not in sold-only
-        completed_item = {
-            'id': '777888999',
-            'title': 'MSI RTX 3080 Gaming X Trio',
-            'price': 320.00,
-            'shipping': 0,
-            'time-left': '',
-            'time-end': end_time,
-            'sold-date': None,   # no sold-date — it ended without a sale
-            'bid-count': 3,
-            'reviews-count': 0,
-            'url': 'https://www.ebay.co.uk/itm/777888999',
-            'brand': 'MSI', 'model': 'RTX 3080', 'vram': 10,
-            'socket': None, 'cores': None,
-            'capacity-gb': None, 'interface': None, 'form-factor': None, 'rpm': None,
-        }
+        completed_item = EbayScraper.Product(
+            id=777888999, title='MSI RTX 3080 Gaming X Trio',
+            price=320.00, shipping=0, time_left='', time_end=end_time,
+            sold_date=None,   # no sold-date — it ended without a sale
+            bid_count=3, reviews_count=0,
+            url='https://www.ebay.co.uk/itm/777888999',
+            brand='MSI', model='RTX 3080', vram=10,
+        )
 
         with patch.object(EbayScraper, '_get_connection', return_value=conn), \
              patch.object(EbayScraper, '_scrape_item_by_id', return_value=None), \
@@ -527,6 +551,40 @@ class TestVerifyPendingOutcomes:
         phase1_sql = cur.execute.call_args_list[0][0][0]
         assert 'GaveUp' in phase1_sql
 
+    def test_backfills_final_price_even_when_nothing_pending(self):
+        """FinalPrice is locked in for sold outcomes on every run, so App.py never writes."""
+        conn, cur = self._make_conn([])
+        cur.rowcount = 0
+
+        with patch.object(EbayScraper, '_get_connection', return_value=conn):
+            EbayScraper.VerifyPendingOutcomes(hours_after=6, give_up_days=7)
+
+        sql_calls = [call[0][0] for call in cur.execute.call_args_list]
+        backfill = [s for s in sql_calls if 'SET    d.FinalPrice = e.Price' in s]
+        assert len(backfill) == 1
+        assert 'd.FinalPrice IS NULL' in backfill[0]
+        conn.commit.assert_called_once()
+
+    def test_verified_sale_records_final_price(self):
+        """A sale found by ID also writes DealOutcomes.FinalPrice in pence."""
+        end_time = datetime(2026, 2, 27, 8, 0, 0)
+        conn, cur = self._make_conn([(123456789, 'GPU', 'ASUS RTX 4090 24GB', end_time)])
+        cur.rowcount = 0
+        item = EbayScraper.Product(
+            id=123456789, title='ASUS RTX 4090 24GB', price=750.00, shipping=0,
+            time_left='', time_end=None, sold_date=datetime(2026, 2, 27, 10, 0, 0),
+            bid_count=12, reviews_count=0, url='https://www.ebay.co.uk/itm/123456789',
+            brand='ASUS', model='RTX 4090', vram=24,
+        )
+
+        with patch.object(EbayScraper, '_get_connection', return_value=conn), \
+             patch.object(EbayScraper, '_scrape_item_by_id', return_value=item):
+            EbayScraper.VerifyPendingOutcomes(hours_after=6, give_up_days=7)
+
+        final = next(c for c in cur.execute.call_args_list
+                     if 'SET    FinalPrice = %s' in c[0][0])
+        assert final[0][1] == (75000, 123456789)
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 9. GetActiveDeals — mocked DB
@@ -585,23 +643,15 @@ class TestScrapeTargeted:
         conn.cursor.return_value = cur
         return conn, cur
 
-    def _make_item(self, ebay_id: str) -> dict:
-        return {
-            'id': ebay_id,
-            'title': 'GIGABYTE RTX 3070 8GB Gaming OC',
-            'price': 290.00,
-            'shipping': 0,
-            'time-left': '2h 15m',
-            'time-end': datetime(2026, 3, 1, 15, 0, 0),
-            'sold-date': None,
-            'bid-count': 3,
-            'reviews-count': 0,
-            'url': f'https://www.ebay.co.uk/itm/{ebay_id}',
-            'brand': 'GIGABYTE', 'model': 'RTX 3070', 'vram': 8,
-            'socket': None, 'cores': None,
-            'capacity-gb': None, 'interface': None,
-            'form-factor': None, 'rpm': None,
-        }
+    def _make_item(self, ebay_id: str) -> EbayScraper.Product:
+        return EbayScraper.Product(
+            id=int(ebay_id), title='GIGABYTE RTX 3070 8GB Gaming OC',
+            price=290.00, shipping=0, time_left='2h 15m',
+            time_end=datetime(2026, 3, 1, 15, 0, 0), sold_date=None,
+            bid_count=3, reviews_count=0,
+            url=f'https://www.ebay.co.uk/itm/{ebay_id}',
+            brand='GIGABYTE', model='RTX 3070', vram=8,
+        )
 
     def test_empty_list_returns_zero_without_db(self):
         """Passing an empty items list returns 0 and never opens a DB connection."""
@@ -637,6 +687,54 @@ class TestScrapeTargeted:
         mock_upload.assert_not_called()
         conn.commit.assert_called_once()   # commit still called even with 0 updates
 
+    def test_same_model_items_share_one_search(self):
+        """Tracked deals of one model are refreshed from a single model-level search."""
+        conn, cur = self._make_conn()
+        a, b = self._make_item('111'), self._make_item('222')
+
+        with patch.object(EbayScraper, '_get_connection', return_value=conn), \
+             patch.object(EbayScraper, '_search_active', return_value={'111': a, '222': b}) as mock_search, \
+             patch.object(EbayScraper, '_scrape_item_by_id') as mock_by_id, \
+             patch.object(EbayScraper, '_upload') as mock_upload:
+            result = EbayScraper.ScrapeTargeted([
+                (111, 'GPU', 'GIGABYTE RTX 3070 8GB', 'RTX 3070'),
+                (222, 'GPU', 'MSI RTX 3070 Ventus', 'rtx  3070'),
+            ])
+
+        assert result == 2
+        mock_search.assert_called_once()
+        assert mock_search.call_args[0][:2] == ('RTX 3070', 'GPU')
+        mock_by_id.assert_not_called()
+        assert [c[0][1] for c in mock_upload.call_args_list] == [a, b]
+
+    def test_misses_fall_back_to_id_search(self):
+        """Items absent from the model search (or alone in their group) are searched by ID."""
+        conn, cur = self._make_conn()
+        a, c = self._make_item('111'), self._make_item('333')
+
+        with patch.object(EbayScraper, '_get_connection', return_value=conn), \
+             patch.object(EbayScraper, '_search_active', return_value={'111': a}) as mock_search, \
+             patch.object(EbayScraper, '_scrape_item_by_id', return_value=c) as mock_by_id, \
+             patch.object(EbayScraper, '_upload'):
+            result = EbayScraper.ScrapeTargeted([
+                (111, 'GPU', 'GIGABYTE RTX 3070 8GB', 'RTX 3070'),
+                (222, 'GPU', 'MSI RTX 3070 Ventus', 'RTX 3070'),
+                (333, 'CPU', 'Intel i7-8700K', 'i7-8700K'),
+            ])
+
+        assert result == 3
+        mock_search.assert_called_once()
+        assert [c[0][0] for c in mock_by_id.call_args_list] == [222, 333]
+
+    def test_planner_groups_by_category_and_model(self):
+        groups, singles = EbayScraper._targeted_groups([
+            (1, 'GPU', 't', 'RTX 3080'), (2, 'GPU', 't', 'rtx 3080 '),
+            (3, 'CPU', 't', 'RTX 3080'), (4, 'GPU', 't', None), (5, 'GPU', 't'),
+        ])
+        assert list(groups) == [('GPU', 'rtx 3080')]
+        assert [i[0] for i in groups[('GPU', 'rtx 3080')]] == [1, 2]
+        assert sorted(i[0] for i in singles) == [3, 4, 5]
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 10. Live data-quality tests  (require internet — skipped unless -m live)
@@ -673,11 +771,11 @@ class TestLiveDataQuality:
             listing_type="auction", cache=True,
         )
         for item in items:
-            assert item["price"] is not None and item["price"] > 0, \
-                f"Bad price for item {item.get('id')}: {item['price']}"
-            assert item["url"] and "/itm/" in item["url"], \
-                f"Bad URL: {item['url']}"
-            assert item["id"], "Missing item ID"
+            assert item.price is not None and item.price > 0, \
+                f"Bad price for item {item.id}: {item.price}"
+            assert item.url and "/itm/" in item.url, \
+                f"Bad URL: {item.url}"
+            assert item.id, "Missing item ID"
 
     def test_gpu_model_extraction_rate(self):
         items = EbayScraper.Scrape(
@@ -686,7 +784,7 @@ class TestLiveDataQuality:
         )
         if not items:
             pytest.skip("No GPU items scraped")
-        parsed = [i for i in items if i.get("model")]
+        parsed = [i for i in items if i.model]
         rate = len(parsed) / len(items)
         assert rate >= 0.7, f"GPU model extraction rate too low: {rate:.0%} ({len(parsed)}/{len(items)})"
 
@@ -705,8 +803,8 @@ class TestLiveDataQuality:
             listing_type="auction", cache=True,
         )
         for item in items:
-            assert item["price"] > 0
-            assert "/itm/" in item["url"]
+            assert item.price > 0
+            assert "/itm/" in item.url
 
     def test_cpu_model_extraction_rate(self):
         items = EbayScraper.Scrape(
@@ -716,8 +814,8 @@ class TestLiveDataQuality:
         if not items:
             pytest.skip("No CPU items scraped")
         # Filter out system listings (mini PCs etc.) — they're intentionally skipped
-        cpu_items = [i for i in items if i.get("brand") in ("Intel", "AMD", "")]
-        parsed = [i for i in cpu_items if i.get("model")]
+        cpu_items = [i for i in items if i.brand in ("Intel", "AMD", "")]
+        parsed = [i for i in cpu_items if i.model]
         rate = len(parsed) / len(cpu_items) if cpu_items else 0
         assert rate >= 0.6, f"CPU model extraction rate too low: {rate:.0%} ({len(parsed)}/{len(cpu_items)})"
 
@@ -737,7 +835,7 @@ class TestLiveDataQuality:
         )
         if not items:
             pytest.skip("No HDD items scraped")
-        parsed = [i for i in items if i.get("capacity-gb") is not None]
+        parsed = [i for i in items if i.capacity_gb is not None]
         rate = len(parsed) / len(items)
         assert rate >= 0.8, f"HDD capacity extraction rate too low: {rate:.0%}"
 
@@ -747,5 +845,546 @@ class TestLiveDataQuality:
             listing_type="auction", cache=True,
         )
         for item in items:
-            assert item.get("interface") in ("SATA", "SAS"), \
-                f"Unexpected interface: {item.get('interface')}"
+            assert item.interface in ("SATA", "SAS"), \
+                f"Unexpected interface: {item.interface}"
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 11. _fetch_hedged — mocked fetchers, no network
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestFetchHedged:
+    """Direct starts first; Zyte is raced in after the hedge delay or a direct failure."""
+
+    def setup_method(self):
+        EbayScraper.reset_direct_session()
+
+    def test_fast_direct_skips_zyte(self):
+        with patch.object(EbayScraper, "_fetch_direct", return_value=LARGE_BODY), \
+             patch.object(EbayScraper, "_fetch_zyte") as mock_zyte:
+            result = EbayScraper._fetch_hedged("https://example.com", delay=1.0)
+        assert result == LARGE_BODY
+        mock_zyte.assert_not_called()
+
+    def test_slow_direct_loses_to_zyte(self):
+        import time as _time
+        zyte_html = LARGE_BODY + b"<!-- zyte -->"
+
+        def slow_direct(url, cancel=None):
+            _time.sleep(0.5)
+            return LARGE_BODY
+
+        with patch.object(EbayScraper, "_fetch_direct", side_effect=slow_direct), \
+             patch.object(EbayScraper, "_fetch_zyte", return_value=zyte_html) as mock_zyte:
+            start = _time.monotonic()
+            result = EbayScraper._fetch_hedged("https://example.com", delay=0.05)
+            elapsed = _time.monotonic() - start
+        assert result == zyte_html
+        mock_zyte.assert_called_once()
+        assert elapsed < 0.5, "hedged fetch should not wait for the slow direct leg"
+
+    def test_direct_failure_starts_zyte_immediately(self):
+        with patch.object(EbayScraper, "_fetch_direct", return_value=None), \
+             patch.object(EbayScraper, "_fetch_zyte", return_value=LARGE_BODY) as mock_zyte:
+            result = EbayScraper._fetch_hedged("https://example.com", delay=10.0)
+        assert result == LARGE_BODY
+        mock_zyte.assert_called_once()
+
+    def test_slow_direct_wins_when_zyte_fails(self):
+        import time as _time
+
+        def slow_direct(url, cancel=None):
+            _time.sleep(0.2)
+            return LARGE_BODY
+
+        with patch.object(EbayScraper, "_fetch_direct", side_effect=slow_direct), \
+             patch.object(EbayScraper, "_fetch_zyte", return_value=None):
+            result = EbayScraper._fetch_hedged("https://example.com", delay=0.05)
+        assert result == LARGE_BODY
+
+    def test_losing_direct_leg_is_cancelled(self):
+        import threading
+        stopped = threading.Event()
+
+        def hanging_direct(url, cancel):
+            assert cancel.wait(2), "the losing leg should be told to stop"
+            stopped.set()
+            return None
+
+        with patch.object(EbayScraper, "_fetch_direct", side_effect=hanging_direct), \
+             patch.object(EbayScraper, "_fetch_zyte", return_value=LARGE_BODY):
+            assert EbayScraper._fetch_hedged("https://example.com", delay=0.01) == LARGE_BODY
+        assert stopped.wait(2)
+
+    def test_one_shared_pool(self):
+        with patch.object(EbayScraper, "_fetch_direct", return_value=LARGE_BODY), \
+             patch("concurrent.futures.ThreadPoolExecutor", wraps=concurrent.futures.ThreadPoolExecutor) as make:
+            EbayScraper._hedge_pool = None
+            for _ in range(3):
+                EbayScraper._fetch_hedged("https://example.com", delay=1.0)
+        assert make.call_count == 1
+
+    def test_both_fail_returns_none(self):
+        with patch.object(EbayScraper, "_fetch_direct", return_value=None), \
+             patch.object(EbayScraper, "_fetch_zyte", side_effect=Exception("boom")):
+            result = EbayScraper._fetch_hedged("https://example.com", delay=0.05)
+        assert result is None
+
+    def test_get_html_uses_hedge_when_requested(self):
+        get_html = vars(EbayScraper)["__GetHTML"]
+        with patch.object(EbayScraper, "_fetch_hedged", return_value=LARGE_BODY) as mock_hedged, \
+             patch.object(EbayScraper, "_fetch_direct") as mock_direct:
+            get_html("123", "uk", "all", "all", alreadySold=False, hedge=True)
+        mock_hedged.assert_called_once()
+        mock_direct.assert_not_called()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 12. Streaming parse — __StreamItems / _stream_direct
+# ═══════════════════════════════════════════════════════════════════════════════
+
+_parse_items  = vars(EbayScraper)["__ParseItems"]
+_stream_items = vars(EbayScraper)["__StreamItems"]
+_drop_outliers = vars(EbayScraper)["__DropPriceOutliers"]
+
+
+def _card_html(ebay_id, title, price, bids=0, sold=None):
+    """Minimal su-card-container in the markup shape __ParseCard expects."""
+    sold_html = f'<span class="su-styled-text positive default">Sold {sold}</span>' if sold else ''
+    return (
+        '<div class="su-card-container su-card-container--horizontal">'
+        '<div class="s-card__media"><img src="x.jpg" alt=""/></div>'
+        f'<div class="s-card__title"><span>{title}</span></div>'
+        f'<span class="s-card__price">£{price:,.2f}</span>'
+        f'<span class="su-styled-text secondary large">{bids} bids</span>'
+        f'{sold_html}'
+        f'<a href="https://www.ebay.co.uk/itm/{ebay_id}?hash=item">link</a>'
+        '</div>'
+    )
+
+
+def _search_page(cards):
+    """Wrap cards in a page padded past the 50 KB block-page threshold."""
+    placeholder = _card_html(1, "Shop on eBay", 20.0)
+    return (
+        "<html><head><script>var x = '<div>';</script></head><body>"
+        + "<!-- " + "p" * 60_000 + " -->"
+        + placeholder + "".join(cards)
+        + "</body></html>"
+    )
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestStreamItems:
+    CARDS = [
+        _card_html(101, "ASUS RTX 3080 10GB TUF", 420.0, bids=3),
+        _card_html(102, "MSI RTX 3070 Ti 8GB &amp; box", 310.0, bids=1),
+        _card_html(103, "Gigabyte RTX 3060 12GB", 205.5),
+        _card_html(104, "Palit RTX 3090 24GB", 1740.7, bids=12),
+    ]
+
+    def test_matches_full_page_parse(self):
+        """Streaming in small chunks yields the same items as parsing the whole page."""
+        page = _search_page(self.CARDS)
+        from bs4 import BeautifulSoup
+        expected = _parse_items(BeautifulSoup(page, "html.parser"), "q", "GPU")
+        streamed = _drop_outliers(list(_stream_items(_chunks(page, 97), "q", "GPU")))
+        assert streamed == expected
+        assert len(streamed) > 0
+
+    def test_skips_placeholder_card(self):
+        items = list(_stream_items([_search_page(self.CARDS)], "q", "GPU"))
+        assert [i.id for i in items] == [101, 102, 103, 104]
+
+    def test_entities_and_thousands_survive_rebuild(self):
+        items = {i.id: i for i in _stream_items(_chunks(_search_page(self.CARDS), 50), "q", "GPU")}
+        assert items[102].title == "MSI RTX 3070 Ti 8GB & box"
+        assert items[104].price == 1740.70
+        assert items[101].bid_count == 3
+
+    def test_yields_before_stream_finishes(self):
+        """The first item is produced before the remaining chunks are consumed."""
+        page = _search_page(self.CARDS)
+        cut = page.index("ASUS RTX 3080") + 400
+        consumed = []
+
+        def chunks():
+            for part in (page[:cut], page[cut:]):
+                consumed.append(part)
+                yield part
+
+        first = next(_stream_items(chunks(), "q", "GPU"))
+        assert first.id == 101
+        assert len(consumed) == 1
+
+    def test_no_cards_logs_warning(self):
+        with patch.object(EbayScraper, "log") as mock_log:
+            assert list(_stream_items(["<html>" + "x" * 60_000 + "</html>"], "q", "GPU")) == []
+        mock_log.warning.assert_called_once()
+
+
+class TestRunDedup:
+    CARDS = TestStreamItems.CARDS
+
+    def test_later_query_skips_claimed_ids(self):
+        dedup = EbayScraper.RunDedup()
+        first = dedup.claim(list(_stream_items([_search_page(self.CARDS[:3])], "a", "GPU", dedup=dedup)))
+        second = dedup.claim(list(_stream_items([_search_page(self.CARDS[1:])], "b", "GPU", dedup=dedup)))
+        assert [i.id for i in first] == [101, 102, 103]
+        assert [i.id for i in second] == [104]
+        assert (dedup.cards, dedup.duplicates) == (6, 2)
+
+    def test_parsing_alone_claims_nothing(self):
+        dedup = EbayScraper.RunDedup()
+        list(_stream_items([_search_page(self.CARDS)], "q", "GPU", dedup=dedup))
+        assert dedup.ids == set()
+        assert len(list(_stream_items([_search_page(self.CARDS)], "q", "GPU", dedup=dedup))) == 4
+
+    def test_full_page_parse_dedups_too(self):
+        from bs4 import BeautifulSoup
+        dedup = EbayScraper.RunDedup()
+        dedup.claim([_product(103)])
+        items = _parse_items(BeautifulSoup(_search_page(self.CARDS), "html.parser"), "q", "GPU", dedup=dedup)
+        assert 103 not in [i.id for i in items]
+
+    def test_claim_drops_repeats_on_one_page(self):
+        dedup = EbayScraper.RunDedup()
+        kept = dedup.claim([_product(1), _product(2), _product(1)])
+        assert [p.id for p in kept] == [1, 2]
+        assert dedup.duplicates == 1
+
+    def test_rollback_resets_counts(self):
+        """A discarded (blocked) page's cards are counted again by the refetch, not twice."""
+        dedup = EbayScraper.RunDedup()
+        mark = dedup.mark()
+        list(_stream_items([_search_page(self.CARDS)], "q", "GPU", dedup=dedup))
+        dedup.rollback(mark)
+        assert (dedup.cards, dedup.duplicates) == (0, 0)
+
+    def test_outlier_in_one_query_is_kept_by_the_next(self):
+        """A 32GB kit is a price outlier among "16gb ddr4 ram" results; the
+        "32gb ddr4 ram" query must still keep and upload it."""
+        sticks = [_card_html(100 + i, f"Crucial 16GB DDR4 3200MHz Desktop RAM {i}", 30.0 + i) for i in range(8)]
+        kit = _card_html(999, "Corsair Vengeance 32GB (2x16GB) DDR4 3200MHz", 120.0)
+        kits = [_card_html(900 + i, f"Kingston Fury 32GB (2x16GB) DDR4 3600MHz {i}", 110.0 + 5 * i) for i in range(6)]
+        pages = {"16gb": _search_page(sticks + [kit]), "32gb": _search_page(kits + [kit])}
+
+        def stream(url):
+            active = "LH_Sold" not in url
+            query = "16gb" if "16gb" in url else "32gb"
+            return iter([pages[query] if active else _search_page([])])
+
+        for workers in (0, 2):
+            dedup = EbayScraper.RunDedup()
+            with patch.object(EbayScraper, "PARSE_WORKERS", workers), \
+                 patch.object(EbayScraper, "_get_parse_pool", return_value=_InlinePool()), \
+                 patch.object(EbayScraper, "_fetch_direct", side_effect=lambda url: next(stream(url)).encode()), \
+                 patch.object(EbayScraper, "_stream_direct", side_effect=stream):
+                results = {q: [i.id for i in items] for q, items, _, _ in EbayScraper._scrape_pages(
+                    ["16gb ddr4 ram", "32gb ddr4 ram"], "RAM", "uk", "used", "auction", False, dedup)}
+            assert 999 not in results["16gb ddr4 ram"]
+            assert 999 in results["32gb ddr4 ram"]
+
+
+class TestStreamDirect:
+    def setup_method(self):
+        EbayScraper.reset_direct_session()
+
+    def _mock_session(self, chunks, status=200, headers=None, url="https://example.com"):
+        session = MagicMock()
+        session.cookies = {}
+        resp = MagicMock()
+        resp.status_code = status
+        resp.encoding = "utf-8"
+        resp.headers = headers or {}
+        resp.url = url
+        resp.iter_content.return_value = iter(chunks)
+        session.get.return_value = resp
+        return session, resp
+
+    def test_yields_decoded_chunks(self):
+        body = LARGE_HTML.encode()
+        # Split a multi-byte character across chunks to exercise the incremental decoder.
+        pound = "£".encode()
+        chunks = [body[:100] + pound[:1], pound[1:] + body[100:]]
+        session, resp = self._mock_session(chunks)
+        with patch("curl_cffi.requests.Session", return_value=session):
+            text = "".join(EbayScraper._stream_direct("https://example.com"))
+        assert text == LARGE_HTML[:100] + "£" + LARGE_HTML[100:]
+        resp.close.assert_called_once()
+
+    def test_small_body_raises(self):
+        session, _ = self._mock_session([b"<html>blocked</html>"])
+        with patch("curl_cffi.requests.Session", return_value=session):
+            with pytest.raises(RuntimeError, match="too small"):
+                list(EbayScraper._stream_direct("https://example.com"))
+
+    def test_http_error_raises(self):
+        session, _ = self._mock_session([], status=403)
+        with patch("curl_cffi.requests.Session", return_value=session):
+            with pytest.raises(RuntimeError, match="HTTP 403"):
+                list(EbayScraper._stream_direct("https://example.com"))
+
+    def test_captcha_marker_aborts_after_first_chunk(self):
+        """A marker in the opening KB stops the download — later chunks are never read."""
+        head = b"<html><title>Pardon Our Interruption...</title>" + b" " * 20_000
+        chunks = iter([head] + [b"x" * 64_000] * 3)
+        session, resp = self._mock_session(chunks)
+        with patch("curl_cffi.requests.Session", return_value=session):
+            with pytest.raises(RuntimeError, match="pardon our interruption"):
+                list(EbayScraper._stream_direct("https://example.com"))
+        assert len(list(chunks)) == 3
+        resp.close.assert_called_once()
+
+    def test_akamai_403_is_a_block_before_body(self):
+        session, resp = self._mock_session([], status=403, headers={"Server": "AkamaiGHost"})
+        with patch("curl_cffi.requests.Session", return_value=session):
+            with pytest.raises(RuntimeError, match="Akamai.*block page"):
+                list(EbayScraper._stream_direct("https://example.com"))
+        resp.iter_content.assert_not_called()
+        assert EbayScraper._direct_session is None
+
+    def test_captcha_redirect_is_a_block(self):
+        session, resp = self._mock_session(
+            [LARGE_HTML.encode()], url="https://www.ebay.co.uk/splashui/captcha?ap=1")
+        with patch("curl_cffi.requests.Session", return_value=session):
+            with pytest.raises(RuntimeError, match="redirected"):
+                list(EbayScraper._stream_direct("https://example.com"))
+        resp.iter_content.assert_not_called()
+
+    def test_small_content_length_is_a_block(self):
+        session, resp = self._mock_session([b"<html></html>"], headers={"Content-Length": "2048"})
+        with patch("curl_cffi.requests.Session", return_value=session):
+            with pytest.raises(RuntimeError, match="Content-Length 2048"):
+                list(EbayScraper._stream_direct("https://example.com"))
+        resp.iter_content.assert_not_called()
+
+    def test_compressed_content_length_is_not_judged(self):
+        headers = {"Content-Length": "2048", "Content-Encoding": "br", "Content-Type": "text/html"}
+        session, _ = self._mock_session([LARGE_HTML.encode()], headers=headers)
+        with patch("curl_cffi.requests.Session", return_value=session):
+            assert "".join(EbayScraper._stream_direct("https://example.com")) == LARGE_HTML
+
+    def test_cancel_closes_stream_without_counting_a_failure(self):
+        import threading
+        cancel = threading.Event()
+        chunks = iter([b"<html>" + b"x" * 20_000, b"y" * 64_000, b"z" * 64_000])
+        session, resp = self._mock_session(chunks)
+        run = scrape_metrics.start_run('test')
+        try:
+            with patch("curl_cffi.requests.Session", return_value=session):
+                stream = EbayScraper._stream_direct("https://example.com", decode=False, cancel=cancel)
+                next(stream)
+                cancel.set()
+                with pytest.raises(RuntimeError, match="cancelled"):
+                    next(stream)
+        finally:
+            scrape_metrics.finish_run()
+        resp.close.assert_called_once()
+        assert len(list(chunks)) == 1
+        assert run.total('fetch_failures') == 0
+
+    def test_raw_chunks_without_decode(self):
+        body = LARGE_HTML.encode()
+        session, _ = self._mock_session([body[:100], body[100:]])
+        with patch("curl_cffi.requests.Session", return_value=session):
+            assert b"".join(EbayScraper._stream_direct("https://example.com", decode=False)) == body
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 13. Bulk upload — ProductBatch / _upload_batch, mocked cursor
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _product(ebay_id: int, price: float = 100.0, **kw) -> EbayScraper.Product:
+    base = dict(
+        id=ebay_id, title=f'Item {ebay_id}', price=price, shipping=0,
+        time_left='', time_end=None, sold_date=None, bid_count=1,
+        reviews_count=0, url=f'https://www.ebay.co.uk/itm/{ebay_id}',
+        brand='Kingston', model=None, vram=None,
+    )
+    base.update(kw)
+    return EbayScraper.Product(**base)
+
+
+class TestProductBatch:
+    def test_columns_and_pence(self):
+        batch = EbayScraper.ProductBatch([_product(1, 12.5), _product(2, 99.99)])
+        assert len(batch) == 2
+        assert batch.columns['id'] == [1, 2]
+        assert batch.rows('id', 'price_pence') == [(1, 1250.0), (2, 99.99 * 100)]
+
+    def test_empty_batch(self):
+        batch = EbayScraper.ProductBatch([])
+        assert len(batch) == 0
+        assert batch.rows('id', 'title') == []
+
+    def test_product_has_no_instance_dict(self):
+        assert not hasattr(_product(1), '__dict__')
+
+
+class TestUploadBatch:
+    def _cursor(self, existing=(), rowcount=0):
+        cur = MagicMock()
+        cur.fetchall.return_value = [(i,) for i in existing]
+        cur.rowcount = rowcount
+        return cur
+
+    def test_one_executemany_per_table(self):
+        """RAM items (the old 'ram-type' KeyError) go through EBAY + RAM upserts."""
+        products = [_product(1, capacity_gb=16, ram_type='DDR4', speed=3200),
+                    _product(2, capacity_gb=32, ram_type='DDR5', speed=5600)]
+        cur = self._cursor(existing=[2], rowcount=3)   # 1 insert + 1 changed update
+        assert EbayScraper._upload_batch(cur, products, 'RAM') == (1, 1)
+        assert cur.executemany.call_count == 2
+        ram_sql, ram_rows = cur.executemany.call_args_list[1][0]
+        assert 'INSERT INTO RAM' in ram_sql
+        assert ram_rows == [(1, 'Kingston', 16, 'DDR4', 3200), (2, 'Kingston', 32, 'DDR5', 5600)]
+
+    def test_unknown_category_only_writes_ebay(self):
+        cur = self._cursor(rowcount=1)
+        assert EbayScraper._upload_batch(cur, [_product(1)], 'PSU') == (1, 0)
+        cur.executemany.assert_called_once()
+
+    def test_empty_list_touches_nothing(self):
+        cur = self._cursor()
+        assert EbayScraper._upload_batch(cur, [], 'GPU') == (0, 0)
+        cur.execute.assert_not_called()
+
+    def test_batch_error_falls_back_per_item(self):
+        cur = self._cursor()
+        cur.executemany.side_effect = EbayScraper.mariadb.Error("bad row")
+        with patch.object(EbayScraper, '_upload', side_effect=[1, EbayScraper.mariadb.Error("x"), 2]) as up, \
+             patch.object(EbayScraper, 'log') as mock_log:
+            result = EbayScraper._upload_batch(cur, [_product(1), _product(2), _product(3)], 'GPU')
+        assert result == (1, 1)
+        assert up.call_count == 3
+        mock_log.error.assert_called_once()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 14. Query yield — feeds the adaptive query schedule
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestQueryYield:
+    NOW = datetime(2026, 3, 1, 12, 0)
+
+    def _gpu(self, id, price, ends_in, sold=False, model='RTX 3080'):
+        return _product(id, price, model=model, time_end=self.NOW + ends_in,
+                        sold_date=self.NOW.date() if sold else None)
+
+    def test_counts_ending_soon_and_deals(self):
+        market = {'RTX 3080': 400.0}
+        items = [
+            self._gpu(1, 250, timedelta(minutes=30)),                    # deal
+            self._gpu(2, 390, timedelta(hours=1)),                       # ending, fair price
+            self._gpu(3, 250, timedelta(hours=5)),                       # cheap but not ending soon
+            self._gpu(4, 250, timedelta(minutes=30), sold=True),         # sold listing
+            self._gpu(5, 100, timedelta(minutes=30), model='RTX 9999'),  # no market estimate
+        ]
+        y = EbayScraper._query_yield(items, 3, 'GPU', market, self.NOW)
+        assert (y.new_ids, y.deals, y.ending_soon) == (3, 1, 3)
+
+    def test_market_keys_match_market_prices(self):
+        p = _product(1, 20, capacity_gb=16, ram_type='DDR4', time_end=self.NOW + timedelta(minutes=10))
+        y = EbayScraper._query_yield([p], 0, 'RAM', {'DDR4|16': 50.0}, self.NOW)
+        assert y.deals == 1
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 15. Parse pool — _parse_page / RunDedup.adopt / pipelined _scrape_pages
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class _InlinePool:
+    """Runs each parse synchronously, through pickle, as a worker process would."""
+
+    def submit(self, fn, *args):
+        run = scrape_metrics.current()
+        try:
+            result = pickle.loads(pickle.dumps(fn(*pickle.loads(pickle.dumps(args)))))
+        finally:
+            scrape_metrics._current = run   # the worker's own run must not replace ours
+        future = concurrent.futures.Future()
+        future.set_result(result)
+        return future
+
+
+class TestParsePool:
+    CARDS = TestStreamItems.CARDS
+
+    def test_parse_page_skips_seen_ids(self):
+        page = EbayScraper._parse_page(_search_page(self.CARDS).encode(), "q", "GPU", frozenset({'102'}))
+        assert [EbayScraper.Product(*row).id for row in page.rows] == [101, 103, 104]
+        assert (page.cards, page.duplicates) == (4, 1)
+        assert sum(v for (_, _, name, _), v in page.counters.items() if name == 'items_parsed') == 3
+
+    def test_parse_page_in_spawned_worker(self):
+        """A real spawn-started worker, as _get_parse_pool builds: arguments and
+        _ParsedPage must survive the trip across processes."""
+        body = _search_page(self.CARDS).encode()
+        with concurrent.futures.ProcessPoolExecutor(
+                1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            page = pool.submit(EbayScraper._parse_page, body, "q", "GPU", frozenset({'102'})).result(timeout=60)
+        assert isinstance(page, EbayScraper._ParsedPage)
+        assert [EbayScraper.Product(*row).id for row in page.rows] == [101, 103, 104]
+
+    def test_adopt_drops_ids_claimed_since_snapshot(self):
+        dedup = EbayScraper.RunDedup()
+        dedup.claim([_product(103)])    # claimed by another page after this one was submitted
+        kept = dedup.adopt([_product(101), _product(103)], cards=3, duplicates=0)
+        assert [p.id for p in kept] == [101]
+        assert dedup.ids == {'103'}     # claiming waits for the outlier filter
+        assert (dedup.cards, dedup.duplicates) == (3, 1)
+
+    def _pages(self):
+        """One distinct page per search URL, with overlapping IDs across queries."""
+        pages = {}
+
+        def page(url):
+            if url not in pages:
+                n = len(pages)
+                pages[url] = _search_page([_card_html(200 + n + i, f"MSI RTX 30{n}0 {i}GB", 300.0 + i)
+                                           for i in range(4)]).encode()
+            return pages[url]
+        return page
+
+    def _scrape(self, workers, fetched=None):
+        page = self._pages()
+
+        def fetch(url):
+            if fetched is not None:
+                fetched.append(url)
+            return page(url)
+
+        dedup = EbayScraper.RunDedup()
+        with patch.object(EbayScraper, "PARSE_WORKERS", workers), \
+             patch.object(EbayScraper, "_get_parse_pool", return_value=_InlinePool()), \
+             patch.object(EbayScraper, "_fetch_direct", side_effect=fetch), \
+             patch.object(EbayScraper, "_stream_direct", side_effect=lambda url: iter([fetch(url).decode()])):
+            pages = EbayScraper._scrape_pages(["a", "b", "c"], "GPU", "uk", "used", "auction", False, dedup)
+            for query, items, cards, duplicates in pages:
+                yield query, [i.id for i in items], cards, duplicates, len(fetched or [])
+
+    def test_pool_matches_in_process(self):
+        in_process = [r[:4] for r in self._scrape(0)]
+        pooled = [r[:4] for r in self._scrape(2)]
+        assert pooled == in_process
+        assert sum(r[3] for r in pooled) > 0     # the overlapping IDs were deduplicated
+
+    def test_query_yielded_after_next_is_fetched(self):
+        """Each query is handed back (to upload) once the next query's pages are submitted."""
+        fetched = []
+        seen_at = [r[4] for r in self._scrape(2, fetched)]
+        assert seen_at == [4, 6, 6]
+
+    def test_worker_metrics_merged(self):
+        run = scrape_metrics.start_run('test')
+        try:
+            results = list(self._scrape(2))
+        finally:
+            scrape_metrics.finish_run()
+        assert run.stages[('GPU', 'a', 'parse')].count == 2      # one per page, from the workers
+        assert run.total('items_duplicate') == sum(r[3] for r in results)
+        assert run.total('title_cache') == run.total('items_parsed') > 0
@@ -0,0 +1,79 @@
+"""
+Tests for title_cache.py
+
+    pytest tests/test_title_cache.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pytest
+
+import scrape_metrics
+from title_cache import TitleCache
+
+
+@pytest.fixture(autouse=True)
+def fresh_run():
+    run = scrape_metrics.start_run('test')
+    yield run
+    scrape_metrics.finish_run()
+
+
+class Classifier:
+    """Stand-in for EbayScraper._classify_title that records its calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, category, title):
+        self.calls.append((category, title))
+        return (None, title.split()[0], len(title))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1. In-memory LRU
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestLookup:
+    def test_second_lookup_skips_classification(self, fresh_run):
+        cache, classify = TitleCache(), Classifier()
+        first = cache.get('GPU', 'MSI RTX 3080', classify)
+        second = cache.get('GPU', 'MSI RTX 3080', classify)
+        assert first == second == (None, 'MSI', 12)
+        assert classify.calls == [('GPU', 'MSI RTX 3080')]
+        assert fresh_run.total('title_cache', 'hit') == 1
+        assert fresh_run.total('title_cache', 'miss') == 1
+
+    def test_category_is_part_of_the_key(self):
+        cache, classify = TitleCache(), Classifier()
+        cache.get('CPU', 'Samsung 16GB DDR4', classify)
+        cache.get('RAM', 'Samsung 16GB DDR4', classify)
+        assert len(classify.calls) == 2
+
+    def test_evicts_least_recently_used(self):
+        cache, classify = TitleCache(maxsize=2), Classifier()
+        cache.get('GPU', 'a', classify)
+        cache.get('GPU', 'b', classify)
+        cache.get('GPU', 'a', classify)      # 'a' is now the most recent
+        cache.get('GPU', 'c', classify)      # evicts 'b'
+        assert len(cache) == 2
+        cache.get('GPU', 'a', classify)
+        cache.get('GPU', 'b', classify)
+        assert classify.calls == [('GPU', 'a'), ('GPU', 'b'), ('GPU', 'c'), ('GPU', 'b')]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2. Configuration
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestConfig:
+    def test_size_read_when_built(self, monkeypatch):
+        monkeypatch.setenv('TITLE_CACHE_SIZE', '3')
+        assert TitleCache().maxsize == 3
+
+    def test_explicit_size_wins(self, monkeypatch):
+        monkeypatch.setenv('TITLE_CACHE_SIZE', '3')
+        assert TitleCache(maxsize=10).maxsize == 10
@@ -0,0 +1,167 @@
+"""
+Tests for zyte_client.py
+
+    pytest tests/test_zyte_client.py
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import base64
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+import EbayScraper
+from zyte_client import RetryPolicy, ZyteCancelled, ZyteClient, ZyteError
+
+
+def _resp(status=200, body=b"<html>page</html>"):
+    r = MagicMock()
+    r.status_code = status
+    r.json.return_value = {"httpResponseBody": base64.b64encode(body).decode()}
+    if status >= 400:
+        r.raise_for_status.side_effect = requests.HTTPError(f"{status} error")
+    return r
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 1. RetryPolicy
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestRetryPolicy:
+    def test_exponential_delays(self):
+        policy = RetryPolicy()
+        assert [policy.delay(a) for a in range(3)] == [2, 4, 8]
+
+    def test_no_retry_on_last_attempt_or_other_status(self):
+        policy = RetryPolicy(max_attempts=3)
+        assert policy.should_retry(520, 0) and policy.should_retry(429, 1)
+        assert not policy.should_retry(520, 2)
+        assert not policy.should_retry(403, 0)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 2. ZyteClient — mocked session
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestZyteClient:
+    def test_reuses_one_session(self):
+        client = ZyteClient("key")
+        with patch.object(client.session, "post", return_value=_resp()) as post:
+            assert client.fetch_body("https://a") == b"<html>page</html>"
+            client.fetch_body("https://b")
+        assert post.call_count == 2
+        assert client.session.auth == ("key", "")
+        assert post.call_args.kwargs["json"] == {"url": "https://b", "httpResponseBody": True, "geolocation": "GB"}
+
+    def test_rate_limited_then_succeeds(self):
+        client = ZyteClient("key")
+        with patch.object(client.session, "post", side_effect=[_resp(429), _resp()]), \
+             patch("time.sleep") as sleep:
+            assert client.fetch_body("https://a") == b"<html>page</html>"
+        sleep.assert_called_once_with(2)
+
+    def test_retries_exhausted_raises(self):
+        client = ZyteClient("key", retry=RetryPolicy(max_attempts=2))
+        with patch.object(client.session, "post", return_value=_resp(520)), patch("time.sleep"):
+            with pytest.raises(ZyteError, match="520 persisted after 2"):
+                client.fetch_body("https://a")
+
+    def test_other_http_errors_not_retried(self):
+        client = ZyteClient("key")
+        with patch.object(client.session, "post", return_value=_resp(401)) as post:
+            with pytest.raises(requests.HTTPError):
+                client.fetch_body("https://a")
+        assert post.call_count == 1
+
+    def test_cancel_stops_retries(self):
+        client = ZyteClient("key")
+        cancel = threading.Event()
+
+        def post(*args, **kwargs):
+            cancel.set()        # the other hedged leg won while this one was in flight
+            return _resp(520)
+
+        with patch.object(client.session, "post", side_effect=post) as mock_post, patch("time.sleep"):
+            with pytest.raises(ZyteCancelled):
+                client.fetch_body("https://a", cancel=cancel)
+        assert mock_post.call_count == 1
+
+    def test_cancel_during_backoff_returns_promptly(self):
+        client = ZyteClient("key", retry=RetryPolicy(base_delay=30))
+        cancel = threading.Event()
+        threading.Timer(0.05, cancel.set).start()
+        with patch.object(client.session, "post", return_value=_resp(520)) as post:
+            start = time.monotonic()
+            with pytest.raises(ZyteCancelled, match="back-off"):
+                client.fetch_body("https://a", cancel=cancel)
+        assert time.monotonic() - start < 2
+        assert post.call_count == 1
+
+    def test_concurrency_is_bounded(self):
+        client = ZyteClient("key", concurrency=2)
+        lock = threading.Lock()
+        in_flight, peak = 0, 0
+
+        def post(*args, **kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return _resp()
+
+        with patch.object(client.session, "post", side_effect=post):
+            threads = [threading.Thread(target=client.fetch_body, args=(f"https://{i}",)) for i in range(6)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        assert peak == 2
+
+    def test_backoff_does_not_hold_a_slot(self):
+        """With one slot, a request waiting out a 520 back-off doesn't block another."""
+        client = ZyteClient("key", concurrency=1)
+        backing_off, other_done = threading.Event(), threading.Event()
+        responses = iter([_resp(520), _resp(), _resp()])
+
+        def sleep(_):
+            backing_off.set()
+            assert other_done.wait(2)
+
+        with patch.object(client.session, "post", side_effect=lambda *a, **k: next(responses)), \
+             patch("time.sleep", side_effect=sleep):
+            retrying = threading.Thread(target=client.fetch_body, args=("https://a",))
+            retrying.start()
+            assert backing_off.wait(2)
+            client.fetch_body("https://b")
+            other_done.set()
+            retrying.join(2)
+        assert not retrying.is_alive()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 3. EbayScraper's shared client
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class TestSharedClient:
+    def test_same_client_until_settings_change(self):
+        with patch.dict(os.environ, {"ZYTE_API_KEY": "k1", "ZYTE_CONCURRENCY": "3"}):
+            first = EbayScraper._get_zyte_client()
+            assert EbayScraper._get_zyte_client() is first
+            assert first.concurrency == 3
+        with patch.dict(os.environ, {"ZYTE_API_KEY": "k2"}):
+            assert EbayScraper._get_zyte_client() is not first
+
+    def test_no_key_no_client(self):
+        env = {k: v for k, v in os.environ.items() if k != "ZYTE_API_KEY"}
+        with patch.dict(os.environ, env, clear=True):
+            assert EbayScraper._get_zyte_client() is None
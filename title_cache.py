@@ -0,0 +1,64 @@
+"""In-memory LRU cache of listing-title classifications.
+
+Active auctions are re-scraped every hour, and every few minutes in their
+final hour, so the same titles go through the GPU / CPU / HDD / RAM
+extractors over and over.  TitleCache maps (category, title) to whatever the
+extractor returned for it, so a title already seen is classified by one dict
+lookup:
+
+    cache = TitleCache()
+    attrs = cache.get('GPU', title, classify)   # classify(category, title) on a miss
+
+Entries are evicted least-recently-used beyond `maxsize`.  Classification is
+only a few percent of a card's parse time (BeautifulSoup extraction is the
+rest), so the cache is kept in memory and deliberately small in scope.
+
+Lookups are counted into the current scrape_metrics run as title_cache
+(detail = hit / miss).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import scrape_metrics
+
+
+class TitleCache:
+    """(category, title) → classification tuple, least-recently-used evicted."""
+
+    def __init__(self, maxsize: Optional[int] = None):
+        # Read here rather than at import, so credentials.env (loaded by
+        # EbayScraper) is honoured.  A full run sees a few thousand titles.
+        if maxsize is None:
+            maxsize = int(os.environ.get('TITLE_CACHE_SIZE', '50000'))
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, str], tuple] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, category: str, title: str, compute: Callable[[str, str], tuple]) -> tuple:
+        """Cached classification of `title`, computing and storing it on a miss."""
+        key = (category, title)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        if value is not None:
+            scrape_metrics.incr('title_cache', detail='hit')
+            return value
+
+        value = compute(category, title)
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        scrape_metrics.incr('title_cache', detail='miss')
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
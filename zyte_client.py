@@ -0,0 +1,105 @@
+"""Pooled keep-alive client for the Zyte API extract endpoint.
+
+Zyte is the scraper's pay-per-use fallback when curl-cffi is blocked.  When
+Akamai is blocking, every page goes through it, so each call paying its own
+TCP + TLS handshake to api.zyte.com adds up.  ZyteClient keeps one
+requests.Session whose connection pool holds up to `concurrency` keep-alive
+connections, and a semaphore keeps concurrent callers (hedged-fetch legs,
+parallel scrapes) within the same limit, which should be set no higher than
+the Zyte plan's concurrency:
+
+    client = ZyteClient(api_key, concurrency=4)
+    body = client.fetch_body(url)     # raw page bytes; raises ZyteError
+
+Transient failures are retried under one RetryPolicy shared by every call:
+HTTP 520 (Zyte's "website ban / temporary error") and 429 (over the plan's
+rate limit) back off exponentially, 2 s / 4 s / 8 s...  A slot is not held
+while backing off, so a retrying call doesn't block the others.
+"""
+
+import base64
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+import requests
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger(__name__)
+
+EXTRACT_URL = "https://api.zyte.com/v1/extract"
+
+
+class ZyteError(Exception):
+    """A Zyte request failed for good (non-retryable error, or retries exhausted)."""
+
+
+class ZyteCancelled(ZyteError):
+    """The caller cancelled the request (e.g. the other leg of a hedged fetch won)."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = 3
+    retry_statuses: frozenset = frozenset({429, 520})
+    base_delay: float = 2.0
+
+    def should_retry(self, status: int, attempt: int) -> bool:
+        """True if a response with `status` on 0-based `attempt` is worth another try."""
+        return status in self.retry_statuses and attempt < self.max_attempts - 1
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after 0-based `attempt` failed."""
+        return self.base_delay * 2 ** attempt
+
+
+class ZyteClient:
+    def __init__(self, api_key: str, concurrency: int = 4, retry: RetryPolicy = RetryPolicy(),
+                 timeout: float = 60):
+        self.retry = retry
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self.session = requests.Session()
+        self.session.auth = (api_key, "")
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=concurrency))
+
+    def extract(self, payload: dict, cancel: threading.Event | None = None) -> dict:
+        """POST `payload` to the extract endpoint, retrying per the policy; returns the JSON.
+
+        Once `cancel` is set no further attempt is made and ZyteCancelled is
+        raised, including part-way through a back-off; a request already sent
+        is not interrupted.
+        """
+        for attempt in range(self.retry.max_attempts):
+            if cancel is not None and cancel.is_set():
+                raise ZyteCancelled(f"cancelled before attempt {attempt + 1}")
+            with self._slots:
+                resp = self.session.post(EXTRACT_URL, json=payload, timeout=self.timeout)
+            if self.retry.should_retry(resp.status_code, attempt):
+                backoff = self.retry.delay(attempt)
+                log.warning(
+                    "Zyte HTTP %d (attempt %d/%d) — backing off %gs before retry",
+                    resp.status_code, attempt + 1, self.retry.max_attempts, backoff,
+                )
+                if cancel is None:
+                    time.sleep(backoff)
+                elif cancel.wait(backoff):
+                    raise ZyteCancelled(f"cancelled during back-off after attempt {attempt + 1}")
+                continue
+            if resp.status_code in self.retry.retry_statuses:
+                raise ZyteError(
+                    f"HTTP {resp.status_code} persisted after {self.retry.max_attempts} attempt(s)"
+                )
+            resp.raise_for_status()
+            return resp.json()
+        raise ZyteError("no attempts made (max_attempts < 1)")
+
+    def fetch_body(self, url: str, cancel: threading.Event | None = None) -> bytes:
+        """Raw HTTP response body of `url`, fetched from a GB exit (no JS rendering)."""
+        data = self.extract({"url": url, "httpResponseBody": True, "geolocation": "GB"}, cancel=cancel)
+        return base64.b64decode(data["httpResponseBody"])
+
+    def close(self) -> None:
+        self.session.close()